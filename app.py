@@ -4,33 +4,53 @@ import cv2
 import threading
 import time
 import configparser
+import io
+import math
 import os
+import sqlite3
+import subprocess
 import sys
 from pathlib import Path
-from PIL import Image, ImageTk, ImageDraw, ImageFont
+from PIL import Image, ImageTk
 import ipaddress
 from queue import Queue
-import winsound  # Только для Windows
+from nexora.alerts import DEFAULT_ALERT_COOLDOWN, AlertBus, QueueSink, SoundSink
+from nexora.background import (
+    BACKGROUND_MODEL_NAMES, DEFAULT_BACKGROUND_MODEL, DEFAULT_LEARNING_RATE
+)
+from nexora.capture import CAPTURE_BACKEND_NAMES, DEFAULT_CAPTURE_BACKEND, RTSP_TRANSPORT_NAMES
+from nexora.display import DEFAULT_DISPLAY_FPS, TileRenderer
+from nexora.eventstore import EventStore
+from nexora.heatmap import heatmap_path, load_heatmap, overlay_heatmap
+from nexora.events import DEFAULT_EVENT_COOLDOWN, DEFAULT_EVENT_GAP, DEFAULT_MIN_DURATION, DEFAULT_TRIGGER_FRAMES
+from nexora.recorder import DEFAULT_POST_ROLL, DEFAULT_PRE_ROLL
+from nexora.engine import (
+    CameraManager, DEFAULT_ANALYSIS_WIDTH, DEFAULT_DETECTION_FPS, DEFAULT_IDLE_DETECTION_FPS,
+    DEFAULT_PRECHECK_THRESHOLD, MOTION_DEFAULT_SENSITIVITY, get_camera_url, open_capture
+)
+from nexora.profiles import PROFILE_POLL_INTERVAL, ProfileStore
+from nexora.thumbnails import KEYFRAME_WIDTH, THUMBNAIL_WIDTH, ThumbnailCache
 
 # Константы
-MOTION_DEFAULT_SENSITIVITY = 500
 CONFIG_SECTION = 'Camera'
-CONFIG_KEY_CONNECTION_MODE = 'connection_mode'
-CONFIG_KEY_URL = 'url'
-CONFIG_KEY_IP = 'ip'
-CONFIG_KEY_PORT = 'port'
-CONFIG_KEY_USERNAME = 'username'
-CONFIG_KEY_PASSWORD = 'password'
-CONFIG_KEY_MOTION_SENSITIVITY = 'motion_sensitivity'
-CONFIG_KEY_STREAM_PATH = 'stream_path'
-CONFIG_KEY_IGNORE_MASK = 'ignore_mask'  # Зоны игнорирования
-CONFIG_KEY_DETECTION_MASK = 'detection_mask'  # Зоны детекции
-CONFIG_KEY_SOUND_FILE = 'sound_file'  # Звуковой файл
+ANALYSIS_WIDTH_CHOICES = ('0', '320', '480', '640', '960', '1280')
 SECRET_CONFIG_SECTION = 'SecretPaths'
 SECRET_CONFIG_KEY_PATH = 'secret_path'
 HIDE_LOG_KEY = 'hide_log'
+CLIPS_DIR_KEY = 'clips_dir'  # Папка для клипов с движением
+DISPLAY_FPS_KEY = 'display_fps'  # Частота обновления видео в окне
+WORKER_PROCESSES_KEY = 'worker_processes'  # Захват и детекция каждой камеры в отдельном процессе
 APP_VERSION = "v0.2"
 AUTHOR = "Разин Г.В."
+STATUS_REFRESH_MS = 1000  # Период обновления статуса камер в интерфейсе
+EVENTS_DB_NAME = "events.db"  # Журнал событий движения в каталоге программы
+EVENT_TIME_FORMAT = '%Y-%m-%d %H:%M'
+ALL_CAMERAS = "Все камеры"
+THUMBNAILS_DIR_NAME = "thumbnails"  # Ключевые кадры и миниатюры событий в каталоге программы
+HEATMAPS_DIR_NAME = "heatmaps"  # Тепловые карты активности камер в каталоге программы
+EVENTS_PAGE_SIZE = 100
+EVENT_THUMBNAIL_WIDTH = THUMBNAIL_WIDTH  # Размер миниатюры в строке списка событий
+EVENT_THUMBNAIL_HEIGHT = THUMBNAIL_WIDTH * 9 // 16
 
 
 class CameraApp:
@@ -57,6 +77,9 @@ class CameraApp:
         self.main_settings_path = os.path.join(self.app_dir, "settings.ini")
         self.secret_settings_path = None
         self.hide_log = False  # По умолчанию журнал отображается
+        self.clips_dir = os.path.join(self.app_dir, "clips")
+        self.display_fps = DEFAULT_DISPLAY_FPS
+        self.worker_processes = False
 
         # --- Новые атрибуты для профилей ---
         self.profiles = {}
@@ -74,14 +97,54 @@ class CameraApp:
         self.motion_sensitivity = MOTION_DEFAULT_SENSITIVITY
         self.ignore_mask_rects = []  # [(x1, y1, x2, y2), ...] — в координатах оригинального кадра
         self.detection_mask_rects = []  # [(x1, y1, x2, y2), ...] — в координатах оригинального кадра
+        self.ignore_polygons = []  # [[(x, y), ...], ...] — в координатах оригинального кадра
+        self.detection_polygons = []  # [[(x, y), ...], ...] — в координатах оригинального кадра
         self.sound_file = ""
+        self.substream_url = ""
+        self.substream_path = ""
+        self.capture_backend = DEFAULT_CAPTURE_BACKEND
+        self.rtsp_transport = ""
+        self.capture_options = ""
+        self.background_model = DEFAULT_BACKGROUND_MODEL
+        self.learning_rate = DEFAULT_LEARNING_RATE
+        self.analysis_width = DEFAULT_ANALYSIS_WIDTH
+        self.detection_fps = DEFAULT_DETECTION_FPS
+        self.idle_detection_fps = DEFAULT_IDLE_DETECTION_FPS
+        self.precheck_threshold = DEFAULT_PRECHECK_THRESHOLD
+        self.event_trigger_frames = DEFAULT_TRIGGER_FRAMES
+        self.event_min_duration = DEFAULT_MIN_DURATION
+        self.event_gap = DEFAULT_EVENT_GAP
+        self.event_cooldown = DEFAULT_EVENT_COOLDOWN
+        self.record_clips = False
+        self.pre_roll = DEFAULT_PRE_ROLL
+        self.post_roll = DEFAULT_POST_ROLL
         # ------------------------------------
 
         self.alert_window = None
+        self.stats_window = None
+        self.events_window = None
         self.is_running = False
-        self.cap = None
         self.last_frame = None
         self.message_queue = Queue()
+        # Окно и звук оповещения обрабатываются в своих потоках шины и не задерживают детекцию
+        self.alert_bus = AlertBus([
+            QueueSink(self.message_queue, cooldown=DEFAULT_ALERT_COOLDOWN),
+            SoundSink(self.get_alert_sound, cooldown=DEFAULT_ALERT_COOLDOWN),
+        ])
+        try:
+            self.event_store = self.alert_bus.add_sink(EventStore(os.path.join(self.app_dir, EVENTS_DB_NAME)))
+        except (OSError, sqlite3.Error) as e:
+            self.event_store = None
+            print(f"Предупреждение: журнал событий недоступен: {e}")
+        try:
+            self.thumbnails = ThumbnailCache(os.path.join(self.app_dir, THUMBNAILS_DIR_NAME))
+        except OSError as e:
+            self.thumbnails = None
+            print(f"Предупреждение: миниатюры событий недоступны: {e}")
+        self.heatmaps_dir = os.path.join(self.app_dir, HEATMAPS_DIR_NAME)
+        self.manager = CameraManager(self.message_queue, on_frame=self.on_camera_frame, alert_bus=self.alert_bus,
+                                     thumbnails=self.thumbnails, heatmaps_dir=self.heatmaps_dir)
+        self.camera_tiles = {}  # {имя профиля: {'frame', 'label', 'caption', 'renderer'}}
 
         # Загружаем основные настройки и профили
         self.load_main_settings()
@@ -95,6 +158,7 @@ class CameraApp:
 
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.root.after(100, self.process_messages)
+        self.root.after(int(PROFILE_POLL_INTERVAL * 1000), self.watch_profiles)
 
     def load_main_settings(self):
         config = configparser.ConfigParser()
@@ -104,6 +168,9 @@ class CameraApp:
                 self.secret_settings_path = config[SECRET_CONFIG_SECTION].get(SECRET_CONFIG_KEY_PATH, '')
                 self.current_profile_name = config[SECRET_CONFIG_SECTION].get('current_profile', 'Default')
                 self.hide_log = config[SECRET_CONFIG_SECTION].getboolean(HIDE_LOG_KEY, fallback=False)
+                self.clips_dir = config[SECRET_CONFIG_SECTION].get(CLIPS_DIR_KEY, self.clips_dir)
+                self.display_fps = config[SECRET_CONFIG_SECTION].getint(DISPLAY_FPS_KEY, DEFAULT_DISPLAY_FPS)
+                self.worker_processes = config[SECRET_CONFIG_SECTION].getboolean(WORKER_PROCESSES_KEY, fallback=False)
 
         if not self.secret_settings_path or not os.path.exists(self.secret_settings_path):
             self.open_settings_file_dialog()
@@ -117,7 +184,10 @@ class CameraApp:
         config[SECRET_CONFIG_SECTION] = {
             SECRET_CONFIG_KEY_PATH: self.secret_settings_path,
             'current_profile': self.current_profile_name,
-            HIDE_LOG_KEY: str(self.hide_log)
+            HIDE_LOG_KEY: str(self.hide_log),
+            CLIPS_DIR_KEY: self.clips_dir,
+            DISPLAY_FPS_KEY: str(self.display_fps),
+            WORKER_PROCESSES_KEY: str(self.worker_processes)
         }
         try:
             with open(self.main_settings_path, 'w', encoding='utf-8') as f:
@@ -129,7 +199,7 @@ class CameraApp:
         """Открывает диалог для выбора файла настроек и настройки отображения журнала."""
         dialog = Toplevel(self.root)
         dialog.title("Настройки")
-        dialog.geometry("500x250")
+        dialog.geometry("500x450")
         dialog.resizable(False, False)
         dialog.transient(self.root)
         dialog.grab_set()
@@ -153,11 +223,32 @@ class CameraApp:
 
         tk.Button(dialog, text="Обзор...", command=browse_file).pack(pady=5)
 
+        clips_dir_label = tk.Label(dialog, text=f"Папка клипов: {self.clips_dir}", fg="blue", wraplength=450)
+        clips_dir_label.pack(pady=(10, 0))
+
+        def browse_clips_dir():
+            path = filedialog.askdirectory(title="Папка для клипов с движением", initialdir=self.clips_dir)
+            if path:
+                self.clips_dir = path
+                clips_dir_label.config(text=f"Папка клипов: {self.clips_dir}")
+
+        tk.Button(dialog, text="Выбрать папку клипов...", command=browse_clips_dir).pack(pady=5)
+
+        display_fps_var = tk.IntVar(value=self.display_fps)
+        tk.Label(dialog, text="Частота обновления видео в окне, кадров/с:").pack(pady=(10, 0))
+        tk.Scale(dialog, from_=1, to=30, orient=tk.HORIZONTAL, variable=display_fps_var, length=300).pack()
+
+        worker_processes_var = tk.BooleanVar(value=self.worker_processes)
+        tk.Checkbutton(dialog, text="Каждая камера в отдельном процессе (со следующего запуска)",
+                       variable=worker_processes_var).pack(pady=(10, 0))
+
         hide_log_var = tk.BooleanVar(value=self.hide_log)
         tk.Checkbutton(dialog, text="Скрыть журнал событий в главном окне", variable=hide_log_var).pack(pady=10)
 
         def confirm_and_close():
             self.hide_log = hide_log_var.get()
+            self.display_fps = display_fps_var.get()
+            self.worker_processes = worker_processes_var.get()
             if not self.secret_settings_path:
                 self.secret_settings_path = os.path.expanduser("~/nexora_secret_settings.ini")
             self.save_main_settings()
@@ -177,76 +268,60 @@ class CameraApp:
 
     def load_profiles(self):
         """Загружает профили из секретного файла."""
-        config = configparser.ConfigParser()
-        if os.path.exists(self.secret_settings_path):
-            config.read(self.secret_settings_path, encoding='utf-8')
-            for section_name in config.sections():
-                if section_name.startswith('Profile_'):
-                    profile_name = section_name[8:]
-                    self.profiles[profile_name] = {
-                        'connection_mode': config[section_name].get(CONFIG_KEY_CONNECTION_MODE, 'url'),
-                        'camera_url': config[section_name].get(CONFIG_KEY_URL, '0'),
-                        'ip': config[section_name].get(CONFIG_KEY_IP, '192.168.1.64'),
-                        'port': config[section_name].get(CONFIG_KEY_PORT, '554'),
-                        'username': config[section_name].get(CONFIG_KEY_USERNAME, 'admin'),
-                        'password': config[section_name].get(CONFIG_KEY_PASSWORD, ''),
-                        'stream_path': config[section_name].get(CONFIG_KEY_STREAM_PATH, '/stream1'),
-                        'motion_sensitivity': config[section_name].getint(
-                            CONFIG_KEY_MOTION_SENSITIVITY, MOTION_DEFAULT_SENSITIVITY
-                        ),
-                        'sound_file': config[section_name].get(CONFIG_KEY_SOUND_FILE, ''),
-                        'ignore_mask': self._parse_mask(config[section_name].get(CONFIG_KEY_IGNORE_MASK, '')),
-                        'detection_mask': self._parse_mask(config[section_name].get(CONFIG_KEY_DETECTION_MASK, ''))
-                    }
-
-    def save_profiles(self):
-        """Сохраняет все профили в секретный файл."""
-        config = configparser.ConfigParser()
-        if os.path.exists(self.secret_settings_path):
-            config.read(self.secret_settings_path, encoding='utf-8')
-
-        for profile_name, settings in self.profiles.items():
-            section_name = f'Profile_{profile_name}'
-            config[section_name] = {
-                CONFIG_KEY_CONNECTION_MODE: settings['connection_mode'],
-                CONFIG_KEY_URL: str(settings['camera_url']),
-                CONFIG_KEY_IP: str(settings['ip']),
-                CONFIG_KEY_PORT: str(settings['port']),
-                CONFIG_KEY_USERNAME: str(settings['username']),
-                CONFIG_KEY_PASSWORD: str(settings['password']),
-                CONFIG_KEY_STREAM_PATH: str(settings['stream_path']),
-                CONFIG_KEY_MOTION_SENSITIVITY: str(settings['motion_sensitivity']),
-                CONFIG_KEY_SOUND_FILE: str(settings['sound_file']),
-                CONFIG_KEY_IGNORE_MASK: self._serialize_mask(settings['ignore_mask']),
-                CONFIG_KEY_DETECTION_MASK: self._serialize_mask(settings['detection_mask'])
-            }
+        self.profile_store = ProfileStore(self.secret_settings_path)
+        self.profiles.update(self.profile_store.load())
 
+    def save_profiles(self, names=None, removed=()):
+        """Сохраняет профили names (по умолчанию все) и удаляет из файла профили removed.
+
+        Неизмененные профили не записываются; остальные профили файла,
+        в том числе измененные извне, не затрагиваются.
+        """
         try:
-            secret_dir = os.path.dirname(self.secret_settings_path)
-            if secret_dir:
-                os.makedirs(secret_dir, exist_ok=True)
-            with open(self.secret_settings_path, 'w', encoding='utf-8') as f:
-                config.write(f)
+            if self.profile_store.path != self.secret_settings_path:
+                # Выбран другой файл профилей — в него переносятся все профили
+                self.profile_store = ProfileStore(self.secret_settings_path)
+                self.profile_store.load()
+                names = None
+            if names is None:
+                names = list(self.profiles)
+            self.profile_store.update({name: self.profiles[name] for name in names if name in self.profiles})
+            if removed:
+                self.profile_store.remove(removed)
         except Exception as e:
             self.message_queue.put(("error", f"Не удалось сохранить файл профилей:\n{e}"))
 
-    def _parse_mask(self, mask_str):
-        """Парсит строку маски в список прямоугольников."""
-        rects = []
-        if mask_str:
-            try:
-                for part in mask_str.split(';'):
-                    if part.strip():
-                        coords = list(map(int, part.strip().split(',')))
-                        if len(coords) == 4:
-                            rects.append(tuple(coords))
-            except Exception as e:
-                print(f"Ошибка загрузки маски: {e}")
-        return rects
-
-    def _serialize_mask(self, mask_list):
-        """Преобразует список прямоугольников в строку маски."""
-        return ';'.join(f"{x1},{y1},{x2},{y2}" for (x1, y1, x2, y2) in mask_list)
+    def watch_profiles(self):
+        """Применяет к запущенным камерам профили, измененные в файле извне (другой программой, скриптом)."""
+        try:
+            changes = self.profile_store.poll()
+        except (OSError, configparser.Error) as e:
+            changes = {}
+            self.log_message(f"Не удалось перечитать файл профилей: {e}")
+        for name, settings in changes.items():
+            if settings is None:
+                if name == self.current_profile_name or name not in self.profiles:
+                    continue  # Активный профиль остается в программе и будет записан заново при сохранении
+                result = self.manager.apply_profile(name, dict(self.profiles.pop(name), enabled=False))
+                self.update_camera_tile(name, result)
+                self.log_message(f"Профиль '{name}' удален из файла профилей.")
+                continue
+            self.profiles[name] = settings
+            result = self.manager.apply_profile(name, settings)
+            self.update_camera_tile(name, result)
+            if name == self.current_profile_name:
+                self.apply_profile(name)
+            if result == 'applied':
+                self.log_message(f"Профиль '{name}' изменен в файле, новые параметры применены без перезапуска камеры.")
+            elif result == 'restarted':
+                self.log_message(f"Профиль '{name}' изменен в файле, камера перезапущена.")
+            elif result == 'started':
+                self.log_message(f"Профиль '{name}' добавлен или включен в файле, камера запущена.")
+            elif result == 'stopped':
+                self.log_message(f"Профиль '{name}' выключен в файле, камера остановлена.")
+            else:
+                self.log_message(f"Профиль '{name}' изменен в файле профилей.")
+        self.root.after(int(PROFILE_POLL_INTERVAL * 1000), self.watch_profiles)
 
     def apply_profile(self, profile_name):
         """Применяет настройки из указанного профиля."""
@@ -261,8 +336,28 @@ class CameraApp:
             self.stream_path = settings['stream_path']
             self.motion_sensitivity = settings['motion_sensitivity']
             self.sound_file = settings['sound_file']
+            self.substream_url = settings.get('substream_url', '')
+            self.substream_path = settings.get('substream_path', '')
+            self.capture_backend = settings.get('capture_backend', DEFAULT_CAPTURE_BACKEND)
+            self.rtsp_transport = settings.get('rtsp_transport', '')
+            self.capture_options = settings.get('capture_options', '')
+            self.background_model = settings.get('background_model', DEFAULT_BACKGROUND_MODEL)
+            self.learning_rate = settings.get('learning_rate', DEFAULT_LEARNING_RATE)
+            self.analysis_width = settings.get('analysis_width', DEFAULT_ANALYSIS_WIDTH)
+            self.detection_fps = settings.get('detection_fps', DEFAULT_DETECTION_FPS)
+            self.idle_detection_fps = settings.get('idle_detection_fps', DEFAULT_IDLE_DETECTION_FPS)
+            self.precheck_threshold = settings.get('precheck_threshold', DEFAULT_PRECHECK_THRESHOLD)
+            self.event_trigger_frames = settings.get('event_trigger_frames', DEFAULT_TRIGGER_FRAMES)
+            self.event_min_duration = settings.get('event_min_duration', DEFAULT_MIN_DURATION)
+            self.event_gap = settings.get('event_gap', DEFAULT_EVENT_GAP)
+            self.event_cooldown = settings.get('event_cooldown', DEFAULT_EVENT_COOLDOWN)
+            self.record_clips = settings.get('record_clips', False)
+            self.pre_roll = settings.get('pre_roll', DEFAULT_PRE_ROLL)
+            self.post_roll = settings.get('post_roll', DEFAULT_POST_ROLL)
             self.ignore_mask_rects = settings['ignore_mask']
             self.detection_mask_rects = settings['detection_mask']
+            self.ignore_polygons = settings.get('ignore_polygons', [])
+            self.detection_polygons = settings.get('detection_polygons', [])
             self.current_profile_name = profile_name
 
             # Обновляем заголовок окна
@@ -283,11 +378,32 @@ class CameraApp:
             'stream_path': self.stream_path,
             'motion_sensitivity': self.motion_sensitivity,
             'sound_file': self.sound_file,
+            'substream_url': self.substream_url,
+            'substream_path': self.substream_path,
+            'capture_backend': self.capture_backend,
+            'rtsp_transport': self.rtsp_transport,
+            'capture_options': self.capture_options,
+            'enabled': True,
+            'background_model': self.background_model,
+            'learning_rate': self.learning_rate,
+            'analysis_width': self.analysis_width,
+            'detection_fps': self.detection_fps,
+            'idle_detection_fps': self.idle_detection_fps,
+            'precheck_threshold': self.precheck_threshold,
+            'event_trigger_frames': self.event_trigger_frames,
+            'event_min_duration': self.event_min_duration,
+            'event_gap': self.event_gap,
+            'event_cooldown': self.event_cooldown,
+            'record_clips': self.record_clips,
+            'pre_roll': self.pre_roll,
+            'post_roll': self.post_roll,
             'ignore_mask': self.ignore_mask_rects[:],
-            'detection_mask': self.detection_mask_rects[:]
+            'detection_mask': self.detection_mask_rects[:],
+            'ignore_polygons': [polygon[:] for polygon in self.ignore_polygons],
+            'detection_polygons': [polygon[:] for polygon in self.detection_polygons]
         }
         self.current_profile_name = profile_name
-        self.save_profiles()
+        self.save_profiles([profile_name])
         self.root.title(f"Nexora – {self.current_profile_name}")
         self.log_message(f"Создан новый профиль '{profile_name}'.")
 
@@ -319,6 +435,18 @@ class CameraApp:
         )
         self.btn_settings.pack(side=tk.LEFT, padx=3)
 
+        self.btn_stats = ttk.Button(
+            btn_frame, text="Статистика", command=self.open_stats_window,
+            width=12
+        )
+        self.btn_stats.pack(side=tk.LEFT, padx=3)
+
+        self.btn_events = ttk.Button(
+            btn_frame, text="События", command=self.open_events_window,
+            width=12
+        )
+        self.btn_events.pack(side=tk.LEFT, padx=3)
+
         self.btn_info = ttk.Button(
             btn_frame, text="Инфо", command=self.show_info,
             width=12
@@ -343,10 +471,13 @@ class CameraApp:
         )
         self.log_label.pack(fill=tk.X, expand=False)
 
-        # ВИДЕО ЛЕЙБЛ
+        # ВИДЕО ЛЕЙБЛ (заглушка, пока камеры не запущены)
         self.video_label = tk.Label(self.root, text="Видео будет здесь", bg="black", fg="white")
         self.video_label.pack(expand=True, fill=tk.BOTH, padx=10, pady=5)
 
+        # Сетка камер — по плитке на каждый запущенный профиль
+        self.video_grid = tk.Frame(self.root, bg="black")
+
         self.root.bind('<Configure>', self.on_window_resize)
         self.last_width = 800
         self.last_height = 600
@@ -360,7 +491,9 @@ class CameraApp:
     def process_messages(self):
         while not self.message_queue.empty():
             msg_type, text = self.message_queue.get()
-            if msg_type == "error":
+            if msg_type == "motion":
+                self.show_motion_alert(text)
+            elif msg_type == "error":
                 messagebox.showerror("Ошибка", text)
             elif msg_type == "warning":
                 messagebox.showwarning("Предупреждение", text)
@@ -392,12 +525,22 @@ class CameraApp:
         self.video_label.image = img_tk
 
     def get_actual_camera_url(self):
-        if self.connection_mode == 'url':
-            url = self.camera_url.strip()
-            return url if url not in ('', '0') else '0'
-        else:
-            user_pass = f"{self.username}:{self.password}@" if (self.username or self.password) else ""
-            return f"rtsp://{user_pass}{self.ip}:{self.port}{self.stream_path}"
+        return get_camera_url(self.get_capture_settings())
+
+    def get_capture_settings(self):
+        """Параметры подключения текущего профиля."""
+        return {
+            'connection_mode': self.connection_mode,
+            'camera_url': self.camera_url,
+            'ip': self.ip,
+            'port': self.port,
+            'username': self.username,
+            'password': self.password,
+            'stream_path': self.stream_path,
+            'capture_backend': self.capture_backend,
+            'rtsp_transport': self.rtsp_transport,
+            'capture_options': self.capture_options,
+        }
 
     def open_profiles_window(self):
         profiles_win = Toplevel(self.root)
@@ -469,7 +612,7 @@ class CameraApp:
                 return
             if messagebox.askyesno("Подтверждение", f"Удалить профиль '{name}'?"):
                 del self.profiles[name]
-                self.save_profiles()
+                self.save_profiles([], removed=[name])
                 profile_listbox.delete(selected[0])
                 self.log_message(f"Профиль '{name}' удален.")
 
@@ -519,6 +662,30 @@ class CameraApp:
         stream_path_var = tk.StringVar(value=profile_settings['stream_path'])
         sens_var = tk.IntVar(value=profile_settings['motion_sensitivity'])
         sound_file_var = tk.StringVar(value=profile_settings['sound_file'])
+        enabled_var = tk.BooleanVar(value=profile_settings.get('enabled', True))
+        background_var = tk.StringVar(value=BACKGROUND_MODEL_NAMES.get(
+            profile_settings.get('background_model', DEFAULT_BACKGROUND_MODEL),
+            BACKGROUND_MODEL_NAMES[DEFAULT_BACKGROUND_MODEL]))
+        learning_rate_var = tk.DoubleVar(value=profile_settings.get('learning_rate', DEFAULT_LEARNING_RATE))
+        analysis_width_var = tk.StringVar(value=str(profile_settings.get('analysis_width', DEFAULT_ANALYSIS_WIDTH)))
+        detection_fps_var = tk.DoubleVar(value=profile_settings.get('detection_fps', DEFAULT_DETECTION_FPS))
+        idle_fps_var = tk.DoubleVar(value=profile_settings.get('idle_detection_fps', DEFAULT_IDLE_DETECTION_FPS))
+        precheck_var = tk.DoubleVar(value=profile_settings.get('precheck_threshold', DEFAULT_PRECHECK_THRESHOLD))
+        trigger_frames_var = tk.IntVar(value=profile_settings.get('event_trigger_frames', DEFAULT_TRIGGER_FRAMES))
+        min_duration_var = tk.DoubleVar(value=profile_settings.get('event_min_duration', DEFAULT_MIN_DURATION))
+        event_gap_var = tk.DoubleVar(value=profile_settings.get('event_gap', DEFAULT_EVENT_GAP))
+        event_cooldown_var = tk.DoubleVar(value=profile_settings.get('event_cooldown', DEFAULT_EVENT_COOLDOWN))
+        substream_url_var = tk.StringVar(value=profile_settings.get('substream_url', ''))
+        substream_path_var = tk.StringVar(value=profile_settings.get('substream_path', ''))
+        backend_var = tk.StringVar(value=CAPTURE_BACKEND_NAMES.get(
+            profile_settings.get('capture_backend', DEFAULT_CAPTURE_BACKEND),
+            CAPTURE_BACKEND_NAMES[DEFAULT_CAPTURE_BACKEND]))
+        transport_var = tk.StringVar(value=RTSP_TRANSPORT_NAMES.get(profile_settings.get('rtsp_transport', ''),
+                                                                    RTSP_TRANSPORT_NAMES['']))
+        capture_options_var = tk.StringVar(value=profile_settings.get('capture_options', ''))
+        record_clips_var = tk.BooleanVar(value=profile_settings.get('record_clips', False))
+        pre_roll_var = tk.DoubleVar(value=profile_settings.get('pre_roll', DEFAULT_PRE_ROLL))
+        post_roll_var = tk.DoubleVar(value=profile_settings.get('post_roll', DEFAULT_POST_ROLL))
 
         notebook = ttk.Notebook(settings_win)
         notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -577,6 +744,127 @@ class CameraApp:
         )
         sens_scale.pack(pady=5)
 
+        tk.Checkbutton(
+            conn_frame, text="Запускать камеру вместе с остальными (кнопка «Старт»)", variable=enabled_var
+        ).pack(anchor="w", padx=20, pady=(10, 0))
+
+        # Вкладка параметров видеопотока
+        stream_frame = ttk.Frame(notebook)
+        notebook.add(stream_frame, text="Поток")
+
+        tk.Label(stream_frame, text="Бэкенд захвата:", anchor="w").pack(fill=tk.X, padx=20, pady=(10, 5))
+        ttk.Combobox(
+            stream_frame, textvariable=backend_var, state='readonly', width=30,
+            values=list(CAPTURE_BACKEND_NAMES.values())
+        ).pack(anchor="w", padx=20)
+
+        tk.Label(stream_frame, text="Транспорт RTSP:", anchor="w").pack(fill=tk.X, padx=20, pady=(15, 5))
+        ttk.Combobox(
+            stream_frame, textvariable=transport_var, state='readonly', width=30,
+            values=list(RTSP_TRANSPORT_NAMES.values())
+        ).pack(anchor="w", padx=20)
+
+        tk.Label(stream_frame, text="Дополнительные параметры бэкенда:", anchor="w").pack(
+            fill=tk.X, padx=20, pady=(15, 5))
+        tk.Entry(stream_frame, textvariable=capture_options_var, width=60).pack(fill=tk.X, padx=20)
+        tk.Label(
+            stream_frame, fg="gray", justify=tk.LEFT, wraplength=520,
+            text="FFmpeg: «ключ;значение|ключ;значение», например «stimeout;5000000». "
+                 "GStreamer: параметры rtspsrc или целиком конвейер с {url}, заканчивающийся appsink."
+        ).pack(anchor="w", padx=20)
+
+        tk.Frame(stream_frame, height=2, bg="gray").pack(fill=tk.X, padx=20, pady=10)
+
+        tk.Label(stream_frame, text="Подпоток для детекции — URL (режим «Прямой URL»):", anchor="w").pack(
+            fill=tk.X, padx=20)
+        tk.Entry(stream_frame, textvariable=substream_url_var, width=60).pack(fill=tk.X, padx=20, pady=(5, 0))
+        tk.Label(stream_frame, text="Подпоток для детекции — путь потока (режим «Параметры камеры»):",
+                 anchor="w").pack(fill=tk.X, padx=20, pady=(10, 0))
+        tk.Entry(stream_frame, textvariable=substream_path_var, width=30).pack(anchor="w", padx=20, pady=(5, 0))
+        tk.Label(
+            stream_frame, fg="gray", justify=tk.LEFT, wraplength=520,
+            text="Детекция идет по подпотоку низкого разрешения, а экран и запись — по основному потоку. "
+                 "Зоны и чувствительность задаются на кадре основного потока и пересчитываются автоматически."
+        ).pack(anchor="w", padx=20, pady=(5, 0))
+
+        # Вкладка параметров детектора
+        detect_frame = ttk.Frame(notebook)
+        notebook.add(detect_frame, text="Детекция")
+
+        tk.Label(detect_frame, text="Модель фона:", anchor="w").pack(fill=tk.X, padx=20, pady=(10, 5))
+        ttk.Combobox(
+            detect_frame, textvariable=background_var, state='readonly', width=40,
+            values=list(BACKGROUND_MODEL_NAMES.values())
+        ).pack(anchor="w", padx=20)
+
+        tk.Label(detect_frame, text="Скорость обучения фона (доля нового кадра):", anchor="w").pack(
+            fill=tk.X, padx=20, pady=(15, 0))
+        tk.Scale(
+            detect_frame,
+            from_=0.001,
+            to=0.5,
+            orient=tk.HORIZONTAL,
+            variable=learning_rate_var,
+            length=400,
+            resolution=0.001
+        ).pack(pady=5)
+        tk.Label(
+            detect_frame, fg="gray", justify=tk.LEFT, wraplength=520,
+            text="Чем больше значение, тем быстрее фон подстраивается под освещение, "
+                 "но тем быстрее «растворяются» остановившиеся объекты."
+        ).pack(anchor="w", padx=20)
+
+        tk.Label(detect_frame, text="Ширина кадра для анализа, пикс. (0 — исходное разрешение):", anchor="w").pack(
+            fill=tk.X, padx=20, pady=(15, 5))
+        ttk.Combobox(detect_frame, textvariable=analysis_width_var, values=ANALYSIS_WIDTH_CHOICES, width=10).pack(
+            anchor="w", padx=20)
+        tk.Label(
+            detect_frame, fg="gray", justify=tk.LEFT, wraplength=520,
+            text="Детекция выполняется на уменьшенной копии кадра — это в разы снижает нагрузку "
+                 "на 1080p/4K-потоках. Чувствительность и зоны задаются в координатах исходного кадра."
+        ).pack(anchor="w", padx=20)
+
+        tk.Label(detect_frame, text="Частота детекции, кадров/с (0 — каждый новый кадр):", anchor="w").pack(
+            fill=tk.X, padx=20, pady=(15, 0))
+        tk.Scale(detect_frame, from_=0, to=30, orient=tk.HORIZONTAL, variable=detection_fps_var, length=400,
+                 resolution=0.5).pack(pady=5)
+
+        tk.Label(detect_frame, text="Частота детекции, пока ничего не движется, кадров/с (0 — всегда полная):",
+                 anchor="w").pack(fill=tk.X, padx=20, pady=(15, 0))
+        tk.Scale(detect_frame, from_=0, to=10, orient=tk.HORIZONTAL, variable=idle_fps_var, length=400,
+                 resolution=0.5).pack(pady=5)
+
+        tk.Label(detect_frame, text="Шум клетки сетки, % пикселей (клетки с меньшим изменением не проверяются):",
+                 anchor="w").pack(fill=tk.X, padx=20, pady=(15, 0))
+        tk.Scale(detect_frame, from_=0, to=20, orient=tk.HORIZONTAL, variable=precheck_var, length=400,
+                 resolution=0.5).pack(pady=5)
+
+        # Вкладка событий
+        events_frame = ttk.Frame(notebook)
+        notebook.add(events_frame, text="События")
+
+        tk.Label(events_frame, text="Кадров с движением подряд для начала события:", anchor="w").pack(
+            fill=tk.X, padx=20, pady=(10, 0))
+        tk.Scale(events_frame, from_=1, to=25, orient=tk.HORIZONTAL, variable=trigger_frames_var,
+                 length=400).pack(pady=5)
+        tk.Label(events_frame, text="Минимальная длительность движения до события, с:", anchor="w").pack(
+            fill=tk.X, padx=20, pady=(10, 0))
+        tk.Scale(events_frame, from_=0, to=10, orient=tk.HORIZONTAL, variable=min_duration_var, length=400,
+                 resolution=0.1).pack(pady=5)
+        tk.Label(events_frame, text="Пауза, после которой событие заканчивается, с:", anchor="w").pack(
+            fill=tk.X, padx=20, pady=(10, 0))
+        tk.Scale(events_frame, from_=0, to=30, orient=tk.HORIZONTAL, variable=event_gap_var, length=400,
+                 resolution=0.5).pack(pady=5)
+        tk.Label(events_frame, text="Без новых событий после окончания события, с:", anchor="w").pack(
+            fill=tk.X, padx=20, pady=(10, 0))
+        tk.Scale(events_frame, from_=0, to=120, orient=tk.HORIZONTAL, variable=event_cooldown_var, length=400,
+                 resolution=1).pack(pady=5)
+        tk.Label(
+            events_frame, fg="gray", justify=tk.LEFT, wraplength=520,
+            text="Одиночные кадры с движением (дождь, мерцание) не создают событий, а движение с короткими "
+                 "перерывами сливается в одно событие с одним оповещением."
+        ).pack(anchor="w", padx=20)
+
         # Вкладка звука
         sound_frame = ttk.Frame(notebook)
         notebook.add(sound_frame, text="Звук")
@@ -595,6 +883,24 @@ class CameraApp:
 
         tk.Button(sound_frame, text="Обзор...", command=choose_sound).pack(pady=5)
 
+        # Вкладка записи клипов
+        record_frame = ttk.Frame(notebook)
+        notebook.add(record_frame, text="Запись")
+
+        tk.Checkbutton(record_frame, text="Сохранять клипы при обнаружении движения", variable=record_clips_var).pack(
+            anchor="w", padx=20, pady=(10, 5))
+        tk.Label(record_frame, text="Секунд до начала движения (предзапись):", anchor="w").pack(fill=tk.X, padx=20)
+        tk.Scale(record_frame, from_=0, to=30, orient=tk.HORIZONTAL, variable=pre_roll_var, length=400,
+                 resolution=0.5).pack(pady=5)
+        tk.Label(record_frame, text="Секунд после окончания движения:", anchor="w").pack(fill=tk.X, padx=20)
+        tk.Scale(record_frame, from_=0, to=60, orient=tk.HORIZONTAL, variable=post_roll_var, length=400,
+                 resolution=0.5).pack(pady=5)
+        tk.Label(
+            record_frame, fg="gray", justify=tk.LEFT, wraplength=520,
+            text="Предзапись хранится в памяти в сжатом виде. Клипы пишутся в фоне в папку, "
+                 "заданную в окне «Настройки»; если диск не успевает, клип отбрасывается, а видео не тормозит."
+        ).pack(anchor="w", padx=20)
+
         # Вкладка зон детекции
         zones_frame = ttk.Frame(notebook)
         notebook.add(zones_frame, text="Зоны")
@@ -617,7 +923,10 @@ class CameraApp:
                     # Кадр есть, открываем редактор
                     self._open_zones_editor_internal(settings_win, profile_name)
             else:
-                # Поток уже запущен, кадр должен быть
+                # Поток уже запущен — берем свежий кадр камеры этого профиля
+                frame = self.manager.get_last_frame(profile_name)
+                if frame is not None:
+                    self.last_frame = frame
                 if self.last_frame is not None:
                     self._open_zones_editor_internal(settings_win, profile_name)
                 else:
@@ -633,6 +942,11 @@ class CameraApp:
         btn_frame.pack(pady=15)
 
         def apply_and_close():
+            try:
+                analysis_width = max(0, int(analysis_width_var.get()))
+            except ValueError:
+                messagebox.showwarning("Предупреждение", "Ширина кадра для анализа должна быть целым числом.")
+                return
             self.profiles[profile_name] = {
                 'connection_mode': mode_var.get(),
                 'camera_url': url_var.get(),
@@ -643,12 +957,49 @@ class CameraApp:
                 'stream_path': stream_path_var.get(),
                 'motion_sensitivity': sens_var.get(),
                 'sound_file': sound_file_var.get(),
+                'substream_url': substream_url_var.get().strip(),
+                'substream_path': substream_path_var.get().strip(),
+                'capture_backend': next(
+                    (key for key, title in CAPTURE_BACKEND_NAMES.items() if title == backend_var.get()),
+                    DEFAULT_CAPTURE_BACKEND),
+                'rtsp_transport': next(
+                    (key for key, title in RTSP_TRANSPORT_NAMES.items() if title == transport_var.get()), ''),
+                'capture_options': capture_options_var.get().strip(),
+                'enabled': enabled_var.get(),
+                'background_model': next(
+                    (key for key, title in BACKGROUND_MODEL_NAMES.items() if title == background_var.get()),
+                    DEFAULT_BACKGROUND_MODEL),
+                'learning_rate': learning_rate_var.get(),
+                'analysis_width': analysis_width,
+                'detection_fps': detection_fps_var.get(),
+                'idle_detection_fps': idle_fps_var.get(),
+                'precheck_threshold': precheck_var.get(),
+                'event_trigger_frames': trigger_frames_var.get(),
+                'event_min_duration': min_duration_var.get(),
+                'event_gap': event_gap_var.get(),
+                'event_cooldown': event_cooldown_var.get(),
+                'record_clips': record_clips_var.get(),
+                'pre_roll': pre_roll_var.get(),
+                'post_roll': post_roll_var.get(),
                 'ignore_mask': self.profiles[profile_name].get('ignore_mask', []),
-                'detection_mask': self.profiles[profile_name].get('detection_mask', [])
+                'detection_mask': self.profiles[profile_name].get('detection_mask', []),
+                'ignore_polygons': self.profiles[profile_name].get('ignore_polygons', []),
+                'detection_polygons': self.profiles[profile_name].get('detection_polygons', [])
             }
-            self.save_profiles()
+            self.save_profiles([profile_name])
             settings_win.destroy()
             self.log_message(f"Профиль '{profile_name}' сохранен.")
+            # Запущенная камера получает новый профиль сразу, остальные камеры не затрагиваются
+            result = self.manager.apply_profile(profile_name, self.profiles[profile_name])
+            self.update_camera_tile(profile_name, result)
+            if result == 'applied':
+                self.log_message(f"Новые параметры профиля '{profile_name}' применены без перезапуска камеры.")
+            elif result == 'restarted':
+                self.log_message(f"Камера '{profile_name}' перезапущена с новыми параметрами подключения.")
+            elif result == 'started':
+                self.log_message(f"Камера '{profile_name}' запущена.")
+            elif result == 'stopped':
+                self.log_message(f"Камера '{profile_name}' остановлена: профиль выключен.")
 
         tk.Button(btn_frame, text="Сохранить", command=apply_and_close, width=10).pack(side=tk.LEFT, padx=5)
         tk.Button(btn_frame, text="Отмена", command=settings_win.destroy, width=10).pack(side=tk.LEFT, padx=5)
@@ -656,8 +1007,7 @@ class CameraApp:
     def _temp_capture_for_zones(self, settings_win):
         """Внутренний метод для получения кадра, если поток не запущен."""
         actual_url = self.get_actual_camera_url()
-        temp_cap = cv2.VideoCapture(actual_url)
-        temp_cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        temp_cap = open_capture(actual_url, self.get_capture_settings())
         try:
             if not temp_cap.isOpened():
                 self.message_queue.put(("error", "Не удалось подключиться к камере для получения кадра."))
@@ -689,6 +1039,8 @@ class CameraApp:
         # Используем временные переменные из профиля
         temp_ignore = self.profiles[profile_name].get('ignore_mask', [])
         temp_detect = self.profiles[profile_name].get('detection_mask', [])
+        temp_ignore_poly = self.profiles[profile_name].get('ignore_polygons', [])
+        temp_detect_poly = self.profiles[profile_name].get('detection_polygons', [])
 
         detection_win = Toplevel(settings_win)
         detection_win.title("Зоны детекции/игнорирования")
@@ -711,8 +1063,12 @@ class CameraApp:
         displayed_detect_rects = []
 
         zone_type_var = tk.StringVar(value="ignore")
+        shape_var = tk.StringVar(value="rect")
+        heatmap_var = tk.BooleanVar(value=False)
+        heatmap_data = None  # Карта активности, читается при включении наложения
         rect_id = None
         start_x = start_y = 0
+        poly_points = []  # Вершины рисуемого многоугольника в координатах исходного кадра
 
         def redraw_canvas():
             nonlocal canvas_img, scale, offset_x, offset_y, displayed_ignore_rects, displayed_detect_rects
@@ -733,7 +1089,10 @@ class CameraApp:
             offset_x = (cw - new_w) // 2
             offset_y = (ch - new_h) // 2
 
-            frame_rgb = cv2.cvtColor(self.last_frame, cv2.COLOR_BGR2RGB)
+            frame = self.last_frame
+            if heatmap_var.get():
+                frame = overlay_heatmap(frame, heatmap_data)
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             img_pil = Image.fromarray(frame_rgb)
             img_resized = img_pil.resize((new_w, new_h), Image.Resampling.LANCZOS)
             canvas_img = ImageTk.PhotoImage(img_resized)
@@ -755,6 +1114,21 @@ class CameraApp:
                 rect_id = canvas.create_rectangle(sx1, sy1, sx2, sy2, outline='blue', width=2, stipple='gray50')
                 displayed_detect_rects.append(rect_id)
 
+            for polygons, color, displayed in ((temp_ignore_poly, 'yellow', displayed_ignore_rects),
+                                               (temp_detect_poly, 'blue', displayed_detect_rects)):
+                for polygon in polygons:
+                    coords = [c for (x, y) in polygon for c in (offset_x + x * scale, offset_y + y * scale)]
+                    displayed.append(canvas.create_polygon(coords, outline=color, fill='', width=2))
+
+            if poly_points:
+                color = 'red' if zone_type_var.get() == 'ignore' else 'cyan'
+                coords = [c for (x, y) in poly_points for c in (offset_x + x * scale, offset_y + y * scale)]
+                if len(poly_points) > 1:
+                    canvas.create_line(coords, fill=color, width=2)
+                for i in range(0, len(coords), 2):
+                    canvas.create_oval(coords[i] - 3, coords[i + 1] - 3, coords[i] + 3, coords[i + 1] + 3,
+                                       outline=color)
+
         detection_win.update_idletasks()
         redraw_canvas()
 
@@ -765,6 +1139,12 @@ class CameraApp:
 
         def on_button_press(event):
             nonlocal start_x, start_y, rect_id
+            if shape_var.get() == 'poly':
+                point = canvas_to_frame_coords(event.x, event.y)
+                if not poly_points or poly_points[-1] != point:
+                    poly_points.append(point)
+                redraw_canvas()
+                return
             start_x, start_y = event.x, event.y
             if rect_id:
                 canvas.delete(rect_id)
@@ -778,7 +1158,7 @@ class CameraApp:
 
         def on_button_release(event):
             nonlocal rect_id
-            if rect_id:
+            if rect_id and shape_var.get() == 'rect':
                 x1_canvas, y1_canvas = start_x, start_y
                 x2_canvas, y2_canvas = event.x, event.y
 
@@ -801,37 +1181,76 @@ class CameraApp:
                 redraw_canvas()
                 rect_id = None
 
+        def finish_polygon(event=None):
+            if len(poly_points) >= 3:
+                target = temp_ignore_poly if zone_type_var.get() == 'ignore' else temp_detect_poly
+                target.append(poly_points[:])
+            poly_points.clear()
+            redraw_canvas()
+
+        def on_shape_change():
+            poly_points.clear()
+            redraw_canvas()
+
+        def on_heatmap_toggle():
+            nonlocal heatmap_data
+            if heatmap_var.get():
+                # У запущенной камеры — текущая карта, иначе сохраненная при последней остановке
+                heatmap_data = self.manager.heatmap(profile_name)
+                if heatmap_data is None:
+                    heatmap_data = load_heatmap(heatmap_path(self.heatmaps_dir, profile_name))
+                if heatmap_data is None:
+                    self.log_message(f"Для '{profile_name}' тепловая карта еще не накоплена.")
+            redraw_canvas()
+
         canvas.bind("<ButtonPress-1>", on_button_press)
         canvas.bind("<B1-Motion>", on_mouse_move)
         canvas.bind("<ButtonRelease-1>", on_button_release)
+        canvas.bind("<Double-Button-1>", finish_polygon)
+        canvas.bind("<ButtonPress-3>", finish_polygon)
+        detection_win.bind("<Return>", finish_polygon)
 
         control_frame = tk.Frame(detection_win)
         control_frame.pack(pady=10)
 
         def clear_all_ignore():
             temp_ignore.clear()
+            temp_ignore_poly.clear()
             redraw_canvas()
 
         def clear_all_detect():
             temp_detect.clear()
+            temp_detect_poly.clear()
             redraw_canvas()
 
         def undo_last():
             zone_type = zone_type_var.get()
-            if zone_type == 'ignore' and temp_ignore:
-                temp_ignore.pop()
+            if shape_var.get() == 'poly':
+                ignore_list, detect_list = temp_ignore_poly, temp_detect_poly
+            else:
+                ignore_list, detect_list = temp_ignore, temp_detect
+            if poly_points:
+                poly_points.pop()
+                self.log_message("Отменена последняя вершина многоугольника.")
+            elif zone_type == 'ignore' and ignore_list:
+                ignore_list.pop()
                 self.log_message("Отменена последняя зона исключения.")
-            elif zone_type == 'detect' and temp_detect:
-                temp_detect.pop()
+            elif zone_type == 'detect' and detect_list:
+                detect_list.pop()
                 self.log_message("Отменена последняя зона детекции.")
             else:
                 self.log_message("Нет зон для отмены этого типа.")
             redraw_canvas()
 
         def apply_and_close():
+            finish_polygon()
             self.profiles[profile_name]['ignore_mask'] = temp_ignore[:]
             self.profiles[profile_name]['detection_mask'] = temp_detect[:]
-            self.save_profiles()
+            self.profiles[profile_name]['ignore_polygons'] = [polygon[:] for polygon in temp_ignore_poly]
+            self.profiles[profile_name]['detection_polygons'] = [polygon[:] for polygon in temp_detect_poly]
+            self.save_profiles([profile_name])
+            # Запущенная камера перекомпилирует маску зон со следующего кадра
+            self.manager.update_zones(profile_name, self.profiles[profile_name])
             detection_win.destroy()
 
         tk.Button(control_frame, text="Очистить исключения", command=clear_all_ignore).pack(side=tk.LEFT, padx=5)
@@ -846,7 +1265,18 @@ class CameraApp:
             side=tk.LEFT)
         tk.Radiobutton(radio_frame, text="Детекции (голубой)", variable=zone_type_var, value='detect').pack(
             side=tk.LEFT, padx=(20, 0))
-        tk.Label(detection_win, text="Нарисуйте прямоугольники — выберите тип выше", fg="blue").pack(pady=(5, 0))
+        tk.Radiobutton(radio_frame, text="Прямоугольник", variable=shape_var, value='rect',
+                       command=on_shape_change).pack(side=tk.LEFT, padx=(40, 0))
+        tk.Radiobutton(radio_frame, text="Многоугольник", variable=shape_var, value='poly',
+                       command=on_shape_change).pack(side=tk.LEFT, padx=(20, 0))
+        tk.Checkbutton(radio_frame, text="Тепловая карта", variable=heatmap_var,
+                       command=on_heatmap_toggle).pack(side=tk.LEFT, padx=(40, 0))
+        tk.Label(
+            detection_win,
+            text="Прямоугольник — протяните мышью. Многоугольник — щелкайте по вершинам, "
+                 "завершите двойным щелчком, правой кнопкой или Enter.",
+            fg="blue", wraplength=760
+        ).pack(pady=(5, 0))
 
         def on_resize(event):
             if event.widget == detection_win:
@@ -868,6 +1298,7 @@ class CameraApp:
             f"Автор: {AUTHOR}\n"
             "Основные функции:\n"
             "• Поддержка подключения к IP-камерам по RTSP/HTTP или к встроенной веб-камере.\n"
+            "• Одновременный просмотр всех включённых профилей в виде сетки с FPS и загрузкой CPU.\n"
             "• Обнаружение движения на основе анализа изменений в кадре.\n"
             "• Настройка чувствительности детектора движения.\n"
             "• Возможность задать зоны игнорирования и активной детекции движения.\n"
@@ -882,25 +1313,223 @@ class CameraApp:
         )
         messagebox.showinfo("О программе", info_text)
 
+    def open_stats_window(self):
+        """Окно задержек стадий по каждой камере; обновляется, пока открыто."""
+        if self.stats_window and self.stats_window.winfo_exists():
+            self.stats_window.lift()
+            return
+        self.stats_window = Toplevel(self.root)
+        self.stats_window.title("Статистика стадий")
+        self.stats_window.geometry("760x320")
+
+        columns = ("camera", "stage", "p50", "p90", "p99", "cpu", "frames", "dropped")
+        titles = ("Камера", "Стадия", "p50, мс", "p90, мс", "p99, мс", "CPU, %", "Кадров", "Пропущено")
+        tree = ttk.Treeview(self.stats_window, columns=columns, show="headings")
+        for column, title in zip(columns, titles):
+            tree.heading(column, text=title)
+            tree.column(column, width=130 if column in ("camera", "stage") else 80,
+                        anchor="w" if column in ("camera", "stage") else "e")
+        tree.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+        tk.Label(self.stats_window, fg="gray", anchor="w",
+                 text="Перцентили — за последние 10–20 с; decode/subdecode — чтение кадра основного потока "
+                      "и подпотока").pack(
+            fill=tk.X, padx=10, pady=(0, 10))
+
+        stage_counters = {'decode': ('captured', None), 'subdecode': ('sub_captured', None),
+                          'detect': ('detected', 'detect_dropped'),
+                          'display': ('displayed', 'display_dropped'), 'record': ('recorded', 'record_dropped')}
+        stage_cpu_names = {'decode': 'capture', 'subdecode': 'subcapture'}
+
+        def refresh():
+            if not tree.winfo_exists():
+                return
+            tree.delete(*tree.get_children())
+            for name, worker in sorted(self.manager.workers.items()):
+                item = worker.stats()
+                for stage, (done_key, dropped_key) in stage_counters.items():
+                    latency = item['latency'].get(stage)
+                    if latency is None:
+                        continue
+                    values = [f"{latency[f'p{q}']:.1f}" for q in (50, 90, 99)]
+                    cpu = item['stage_cpu'].get(stage_cpu_names.get(stage, stage), 0.0)
+                    tree.insert("", tk.END, values=(name, stage, *values, f"{cpu:.1f}", worker.counters[done_key],
+                                                    worker.counters[dropped_key] if dropped_key else ""))
+                outage = item['outage']
+                if item['reconnects'] or outage['current']:
+                    text = f"обрывов: {outage['count']}, простой {outage['total']:.0f} с"
+                    if outage['current']:
+                        text += f", сейчас {outage['current']:.0f} с"
+                    tree.insert("", tk.END, values=(name, text, "", "", "", "", "", ""))
+            self.stats_window.after(STATUS_REFRESH_MS, refresh)
+
+        refresh()
+
+    def open_events_window(self):
+        """Поиск событий движения по камере и интервалу времени с миниатюрами, по EVENTS_PAGE_SIZE на страницу.
+
+        Выбор строки показывает ключевой кадр события, двойной щелчок открывает клип.
+        """
+        if self.event_store is None:
+            messagebox.showwarning("Предупреждение", "Журнал событий недоступен.")
+            return
+        if self.events_window and self.events_window.winfo_exists():
+            self.events_window.lift()
+            return
+        self.events_window = Toplevel(self.root)
+        self.events_window.title("События движения")
+        self.events_window.geometry("1180x640")
+
+        filter_frame = tk.Frame(self.events_window)
+        filter_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+        camera_var = tk.StringVar(value=ALL_CAMERAS)
+        today = time.strftime('%Y-%m-%d')
+        start_var = tk.StringVar(value=f"{today} 00:00")
+        end_var = tk.StringVar(value=f"{today} 23:59")
+        try:
+            cameras = sorted(set(self.profiles) | set(self.event_store.cameras()))
+        except sqlite3.Error:
+            cameras = sorted(self.profiles)
+        tk.Label(filter_frame, text="Камера:").pack(side=tk.LEFT)
+        ttk.Combobox(filter_frame, textvariable=camera_var, values=[ALL_CAMERAS] + cameras, state="readonly",
+                     width=16).pack(side=tk.LEFT, padx=(5, 10))
+        tk.Label(filter_frame, text="С:").pack(side=tk.LEFT)
+        tk.Entry(filter_frame, textvariable=start_var, width=17).pack(side=tk.LEFT, padx=(5, 10))
+        tk.Label(filter_frame, text="По:").pack(side=tk.LEFT)
+        tk.Entry(filter_frame, textvariable=end_var, width=17).pack(side=tk.LEFT, padx=(5, 10))
+
+        body = tk.Frame(self.events_window)
+        body.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+        ttk.Style(self.events_window).configure("Events.Treeview", rowheight=EVENT_THUMBNAIL_HEIGHT + 6)
+        columns = ("start", "camera", "duration", "area", "clip")
+        titles = ("Начало", "Камера", "Длительность, с", "Пик. площадь", "Клип")
+        tree = ttk.Treeview(body, columns=columns, show="tree headings", style="Events.Treeview")
+        tree.column("#0", width=EVENT_THUMBNAIL_WIDTH + 20, stretch=False)
+        for column, title in zip(columns, titles):
+            tree.heading(column, text=title)
+            tree.column(column, width=200 if column == "clip" else 110,
+                        anchor="e" if column in ("duration", "area") else "w")
+        scrollbar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+        preview = tk.Label(body, text="Выберите событие", width=KEYFRAME_WIDTH // 8, anchor="center")
+        preview.pack(side=tk.LEFT, fill=tk.BOTH, padx=(10, 0))
+
+        page_frame = tk.Frame(self.events_window)
+        page_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        result_label = tk.Label(page_frame, fg="gray", anchor="w")
+        result_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        rows = {}  # {элемент дерева: событие}
+        images = []  # PhotoImage живут, пока показана страница
+        page = {'number': 0, 'start': None, 'end': None, 'camera': None}
+
+        def load_image(data, target):
+            image = Image.open(io.BytesIO(data))
+            image.thumbnail(target)
+            return ImageTk.PhotoImage(image)
+
+        def show_page():
+            started = time.perf_counter()
+            try:
+                events = self.event_store.query(page['camera'], page['start'], page['end'], limit=EVENTS_PAGE_SIZE,
+                                                offset=page['number'] * EVENTS_PAGE_SIZE, newest_first=True)
+            except sqlite3.Error as e:
+                messagebox.showerror("Ошибка", f"Не удалось прочитать журнал событий: {e}", parent=self.events_window)
+                return
+            tree.delete(*tree.get_children())
+            rows.clear()
+            images.clear()
+            for event in events:
+                data = self.thumbnails.thumbnail(event['thumbnail']) if (
+                    self.thumbnails is not None and event['thumbnail']) else None
+                image = load_image(data, (EVENT_THUMBNAIL_WIDTH, EVENT_THUMBNAIL_HEIGHT)) if data else ""
+                if image:
+                    images.append(image)
+                item = tree.insert("", tk.END, image=image, values=(
+                    time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(event['start_time'])), event['camera'],
+                    f"{event['end_time'] - event['start_time']:.1f}", f"{event['peak_area']:.0f}",
+                    os.path.basename(event['clip'])))
+                rows[item] = event
+            elapsed = (time.perf_counter() - started) * 1000.0
+            first = page['number'] * EVENTS_PAGE_SIZE
+            result_label.config(text=f"События {first + 1}–{first + len(events)} (страница {page['number'] + 1}), "
+                                     f"показаны за {elapsed:.0f} мс" if events else "Событий не найдено")
+            btn_next.config(state=tk.NORMAL if len(events) == EVENTS_PAGE_SIZE else tk.DISABLED)
+            btn_prev.config(state=tk.NORMAL if page['number'] else tk.DISABLED)
+
+        def search():
+            try:
+                page['start'] = time.mktime(time.strptime(start_var.get().strip(), EVENT_TIME_FORMAT))
+                page['end'] = time.mktime(time.strptime(end_var.get().strip(), EVENT_TIME_FORMAT)) + 60
+            except ValueError:
+                messagebox.showerror("Ошибка", "Время указывается как ГГГГ-ММ-ДД ЧЧ:ММ", parent=self.events_window)
+                return
+            page['camera'] = None if camera_var.get() == ALL_CAMERAS else camera_var.get()
+            page['number'] = 0
+            show_page()
+
+        def turn_page(step):
+            page['number'] = max(0, page['number'] + step)
+            show_page()
+
+        def show_keyframe(_event):
+            event = rows.get(tree.focus())
+            data = self.thumbnails.keyframe(event['thumbnail']) if (
+                event and self.thumbnails is not None and event['thumbnail']) else None
+            if data is None:
+                preview.config(image="", text="Нет кадра")
+                preview.image = None
+                return
+            image = load_image(data, (KEYFRAME_WIDTH, KEYFRAME_WIDTH))
+            preview.config(image=image, text="")
+            preview.image = image
+
+        def open_clip(_event):
+            event = rows.get(tree.focus())
+            if event and event['clip'] and os.path.exists(event['clip']):
+                open_path(event['clip'])
+
+        tree.bind("<<TreeviewSelect>>", show_keyframe)
+        tree.bind("<Double-1>", open_clip)
+        tk.Button(filter_frame, text="Найти", command=search, width=10).pack(side=tk.LEFT)
+        btn_next = tk.Button(page_frame, text="Вперед ›", command=lambda: turn_page(1), width=10)
+        btn_next.pack(side=tk.RIGHT)
+        btn_prev = tk.Button(page_frame, text="‹ Назад", command=lambda: turn_page(-1), width=10)
+        btn_prev.pack(side=tk.RIGHT, padx=5)
+        search()
+
     def start_stream(self):
         if self.is_running:
             return
+        self.manager.set_clips_dir(self.clips_dir)
+        self.manager.display_fps = self.display_fps
+        self.manager.processes = self.worker_processes
+        started = self.manager.start(self.profiles)
+        if not started:
+            messagebox.showwarning("Предупреждение", "Нет включённых профилей для запуска.")
+            return
         self.is_running = True
         self.btn_start.config(state=tk.DISABLED)
         self.btn_stop.config(state=tk.NORMAL)
         self.status_label.config(text="Статус: запуск...", fg="orange")
-        self.message_queue.put(("log", "Запуск видеопотока..."))
-        threading.Thread(target=self.video_loop, daemon=True).start()
+        self.message_queue.put(("log", f"Запуск видеопотоков: {', '.join(started)}"))
+        self._build_camera_grid(started)
+        self.root.after(STATUS_REFRESH_MS, self.refresh_camera_status)
+        self.root.after(0, self.refresh_video_tiles)
 
     def stop_stream(self):
         self.is_running = False
+        self.manager.stop()
         self.message_queue.put(("log", "Остановка видеопотока..."))
 
     def _finalize_stop(self):
-        if self.cap:
-            self.cap.release()
-            self.cap = None
         self.is_running = False
+        self.manager.stop()
+        last_frame = self.manager.get_last_frame(self.current_profile_name)
+        if last_frame is not None:
+            self.last_frame = last_frame
+        self.manager.clear()
+        self._destroy_camera_grid()
         self.btn_start.config(state=tk.NORMAL)
         self.btn_stop.config(state=tk.DISABLED)
         self.video_label.config(image='', text="Видео остановлено")
@@ -909,16 +1538,107 @@ class CameraApp:
             fg="darkgreen")
         self.message_queue.put(("log", "Видеопоток остановлен"))
 
-    def show_motion_alert(self):
+    def _build_camera_grid(self, names):
+        """Создает плитки сетки камер: изображение и строка статуса на каждый профиль."""
+        self._destroy_camera_grid()
+        self.video_label.pack_forget()
+        self.video_grid.pack(expand=True, fill=tk.BOTH, padx=10, pady=5)
+
+        columns = math.ceil(math.sqrt(len(names)))
+        rows = math.ceil(len(names) / columns)
+        for index, name in enumerate(names):
+            tile = tk.Frame(self.video_grid, bg="black", highlightthickness=1, highlightbackground="gray")
+            tile.grid(row=index // columns, column=index % columns, sticky="nsew", padx=1, pady=1)
+            caption = tk.Label(tile, text=f"{name}: запуск...", bg="black", fg="white", anchor="w")
+            caption.pack(side=tk.BOTTOM, fill=tk.X)
+            label = tk.Label(tile, bg="black")
+            label.pack(expand=True, fill=tk.BOTH)
+            self.camera_tiles[name] = {'frame': tile, 'label': label, 'caption': caption,
+                                       'renderer': TileRenderer(label)}
+        for column in range(columns):
+            self.video_grid.columnconfigure(column, weight=1, uniform="camera")
+        for row in range(rows):
+            self.video_grid.rowconfigure(row, weight=1, uniform="camera")
+
+    def update_camera_tile(self, name, result):
+        """Приводит сетку к камере, запущенной, перезапущенной или остановленной на ходу (результат apply_profile)."""
+        if not self.is_running or result not in ('started', 'restarted', 'stopped'):
+            return
+        tile = self.camera_tiles.get(name)
+        if result == 'restarted' and tile is not None:
+            # Новая камера рисует в свежие буферы: размер и изображение прежней к ней не относятся
+            tile['renderer'] = TileRenderer(tile['label'])
+            return
+        names = [other for other in self.camera_tiles if other != name]
+        if result != 'stopped':
+            names.append(name)
+        if names:
+            self._build_camera_grid(names)
+        else:
+            self._destroy_camera_grid()
+
+    def _destroy_camera_grid(self):
+        for tile in self.camera_tiles.values():
+            tile['frame'].destroy()
+        self.camera_tiles = {}
+        for column in range(self.video_grid.grid_size()[0]):
+            self.video_grid.columnconfigure(column, weight=0, uniform="")
+        for row in range(self.video_grid.grid_size()[1]):
+            self.video_grid.rowconfigure(row, weight=0, uniform="")
+        self.video_grid.pack_forget()
+        self.video_label.pack(expand=True, fill=tk.BOTH, padx=10, pady=5)
+
+    def refresh_camera_status(self):
+        """Обновляет подписи плиток и общую строку статуса по данным менеджера камер."""
+        if not self.is_running:
+            return
+        if not self.manager.is_running():
+            self._finalize_stop()
+            return
+
+        stats = self.manager.stats()
+        total_fps = 0.0
+        total_cpu = 0.0
+        working = 0
+        for name, item in stats.items():
+            total_fps += item['fps']
+            total_cpu += item['cpu']
+            if item['status'] == "работает":
+                working += 1
+            tile = self.camera_tiles.get(name)
+            if tile:
+                recording = " | ● REC" if item['recording'] else ""
+                idle = f" (покой, -{item['cpu_saved']:.0f}% CPU)" if item['idle'] else ""
+                substream = ", подпоток недоступен" if item['substream_down'] else ""
+                tile['caption'].config(
+                    text=f"{name}: {item['status']}{substream} | {item['fps']:.1f}/{item['detect_fps']:.1f} FPS{idle} | "
+                         f"CPU {item['cpu']:.0f}% (захват {item['stage_cpu'].get('capture', 0.0):.0f}%) | пропуски: детекция {item['dropped']['detect']}, "
+                         f"экран {item['dropped']['display']}{recording}")
+
+        self.status_label.config(
+            text=f"Статус: работает | Камер: {working}/{len(stats)} | "
+                 f"Всего: {total_fps:.1f} FPS, CPU {total_cpu:.0f}% | "
+                 f"Слотов детекции: {self.manager.scheduler.max_concurrent}"
+                 + (f" | Клипов: {self.manager.clip_writer.clips_written}, отброшено "
+                    f"{self.manager.clip_writer.clips_dropped}" if self.manager.clip_writer else ""),
+            fg="green")
+        self.root.after(STATUS_REFRESH_MS, self.refresh_camera_status)
+
+    def get_alert_sound(self, profile_name):
+        """Звуковой файл оповещения камеры; вызывается из потока приемника шины."""
+        sound_file = self.profiles.get(profile_name, {}).get('sound_file', self.sound_file)
+        return sound_file if sound_file and os.path.exists(sound_file) else ''
+
+    def show_motion_alert(self, profile_name=None):
+        """Всплывающее окно без захвата ввода: работе с главным окном оно не мешает."""
         if self.alert_window and self.alert_window.winfo_exists():
             self.alert_window.destroy()
 
         self.alert_window = Toplevel(self.root)
         self.alert_window.title("⚠️ Движение!")
-        self.alert_window.geometry("300x120")
+        self.alert_window.geometry("300x140")
         self.alert_window.resizable(False, False)
         self.alert_window.transient(self.root)
-        self.alert_window.grab_set()
         self.alert_window.protocol("WM_DELETE_WINDOW", lambda: self.alert_window.destroy())
 
         tk.Label(
@@ -926,8 +1646,10 @@ class CameraApp:
             text="⚠️ ОБНАРУЖЕНО ДВИЖЕНИЕ! ⚠️",
             font=("Arial", 12, "bold"),
             fg="red",
-            pady=20
+            pady=15
         ).pack()
+        if profile_name:
+            tk.Label(self.alert_window, text=f"Камера: {profile_name}").pack()
 
         tk.Button(
             self.alert_window,
@@ -936,12 +1658,6 @@ class CameraApp:
             width=10
         ).pack()
 
-        if self.sound_file and os.path.exists(self.sound_file):
-            try:
-                winsound.PlaySound(self.sound_file, winsound.SND_FILENAME | winsound.SND_ASYNC)
-            except Exception as e:
-                self.message_queue.put(("log", f"Не удалось воспроизвести звук: {e}"))
-
         self.root.after(3000, self._auto_close_alert_window)
 
     def _auto_close_alert_window(self):
@@ -950,129 +1666,47 @@ class CameraApp:
 
     def on_closing(self):
         self.stop_stream()
-        time.sleep(0.2)
+        self.manager.join(timeout=1.0)
+        self.alert_bus.close(timeout=0.5)
+        if self.thumbnails is not None:
+            self.thumbnails.close(timeout=1.0)
+        if self.manager.clip_writer is not None:
+            self.manager.clip_writer.drain(timeout=3.0)
         self.root.destroy()
 
-    def video_loop(self):
-        actual_url = self.get_actual_camera_url()
-        self.cap = cv2.VideoCapture(actual_url)
-        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-
-        try:
-            if not self.cap.isOpened():
-                self.message_queue.put(("error", "Не удалось подключиться к камере"))
-                return
-
-            self.message_queue.put(("log", f"Подключено к: {actual_url}"))
-            self.root.after(0, lambda: self.status_label.config(text="Статус: работает", fg="green"))
-
-            ret, first_frame = self.cap.read()
-            if not ret or first_frame is None:
-                self.message_queue.put(("error", "Пустой кадр. Проверьте камеру."))
-                return
-
-            gray_first = cv2.cvtColor(first_frame, cv2.COLOR_BGR2GRAY)
-            gray_first = cv2.GaussianBlur(gray_first, (21, 21), 0)
-
-            motion_detected_recently = False
-            last_time = time.time()
-            target_fps = 30
-            frame_interval = 1.0 / target_fps
-
-            while self.is_running:
-                current_time = time.time()
-                if current_time - last_time < frame_interval:
-                    time.sleep(0.001)
-                    continue
-                last_time = current_time
+    def on_camera_frame(self, name, frame, motion_detected):
+        """Вызывается из потока отображения камеры (не чаще display_fps): готовит кадр плитки.
 
-                ret, frame = self.cap.read()
-                if not ret:
-                    self.message_queue.put(("log", "Потеря видеопотока"))
-                    break
+        Буфер frame переиспользуется потоком, ссылку на него сохранять нельзя.
+        """
+        tile = self.camera_tiles.get(name)
+        if tile is not None:
+            tile['renderer'].render(frame, motion_detected)
 
-                self.last_frame = frame.copy()
-
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                gray = cv2.GaussianBlur(gray, (21, 21), 0)
+    def refresh_video_tiles(self):
+        """Единственный цикл обновления видео в потоке Tk: переносит готовые кадры в плитки."""
+        if not self.is_running:
+            return
+        for tile in self.camera_tiles.values():
+            renderer = tile['renderer']
+            renderer.size = (max(1, tile['label'].winfo_width()), max(1, tile['label'].winfo_height()))
+            renderer.flush()
+        self.root.after(max(1, 1000 // max(1, self.display_fps)), self.refresh_video_tiles)
 
-                delta = cv2.absdiff(gray_first, gray)
-                thresh = cv2.threshold(delta, 25, 255, cv2.THRESH_BINARY)[1]
-                thresh = cv2.dilate(thresh, None, iterations=2)
 
-                contours, _ = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+def open_path(path):
+    """Открывает файл программой, назначенной в системе."""
+    if sys.platform == 'win32':
+        os.startfile(path)
+    else:
+        subprocess.Popen(['open' if sys.platform == 'darwin' else 'xdg-open', path])
 
-                motion_detected = False
-                for contour in contours:
-                    if cv2.contourArea(contour) < self.motion_sensitivity:
-                        continue
 
-                    x, y, w, h = cv2.boundingRect(contour)
-                    cx, cy = x + w // 2, y + h // 2
-                    contour_bbox = (x, y, x + w, y + h)
-
-                    in_detection_zone = False
-                    if not self.detection_mask_rects:
-                        in_detection_zone = True
-                    else:
-                        for (dx1, dy1, dx2, dy2) in self.detection_mask_rects:
-                            if not (contour_bbox[2] < dx1 or contour_bbox[0] > dx2 or
-                                    contour_bbox[3] < dy1 or contour_bbox[1] > dy2):
-                                in_detection_zone = True
-                                break
-
-                    in_ignored_zone = False
-                    for (ix1, iy1, ix2, iy2) in self.ignore_mask_rects:
-                        if not (contour_bbox[2] < ix1 or contour_bbox[0] > ix2 or
-                                contour_bbox[3] < iy1 or contour_bbox[1] > iy2):
-                            in_ignored_zone = True
-                            break
-
-                    if in_detection_zone and not in_ignored_zone:
-                        motion_detected = True
-                        break
-
-                if motion_detected and not motion_detected_recently:
-                    self.show_motion_alert()
-                    motion_detected_recently = True
-                elif not motion_detected:
-                    motion_detected_recently = False
-
-                label_width = max(1, self.video_label.winfo_width())
-                label_height = max(1, self.video_label.winfo_height())
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img_pil = Image.fromarray(frame_rgb)
-                img_pil.thumbnail((label_width, label_height), Image.Resampling.LANCZOS)
-
-                status_text = "DETECTION" if motion_detected else "Green"
-                color = (255, 0, 0) if motion_detected else (0, 255, 0)
-                draw = ImageDraw.Draw(img_pil)
-                try:
-                    font = ImageFont.truetype("arialbd.ttf", 36)
-                except:
-                    try:
-                        font = ImageFont.truetype("arial.ttf", 32)
-                    except:
-                        font = ImageFont.load_default()
-                text_bbox = draw.textbbox((10, 10), status_text, font=font)
-                draw.rectangle(text_bbox, fill=(0, 0, 0, 200))
-                draw.text((10, 10), status_text, fill=color, font=font)
-
-                img_tk = ImageTk.PhotoImage(image=img_pil)
-                self.root.after(0, self.update_frame, img_tk)
-
-        except Exception as e:
-            self.message_queue.put(("error", f"Ошибка в видеопотоке:\n{str(e)}"))
-        finally:
-            self.root.after(0, self._finalize_stop)
-
-    def update_frame(self, img_tk):
-        if self.is_running:
-            self.video_label.config(image=img_tk, text="")
-            self.video_label.image = img_tk
+def main():
+    root = tk.Tk()
+    app = CameraApp(root)
+    root.mainloop()
 
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = CameraApp(root)
-    root.mainloop()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""Сравнение моделей фона: стоимость кадра и доля ложных срабатываний.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_background.py
+    python benchmarks/bench_background.py --quiet empty_room.mp4 --motion corridor.mp4
+
+Клипы --quiet не содержат настоящего движения (только смена освещения, шум),
+поэтому любой кадр с детекцией в них — ложное срабатывание. Клипы --motion
+содержат движение, для них печатается доля кадров с детекцией.
+Без аргументов используются синтетические сцены.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from nexora.background import BACKGROUND_MODEL_NAMES, DEFAULT_LEARNING_RATE  # noqa: E402
+from nexora.engine import MOTION_DEFAULT_SENSITIVITY, MotionDetector  # noqa: E402
+
+WARMUP_FRAMES = 10  # Кадры прогрева модели, не учитываются в статистике
+
+
+def synthetic_scene(frames, width, height, with_motion, seed=1):
+    """Статичная текстура с дрейфом яркости и шумом; опционально — движущийся объект."""
+    rng = np.random.default_rng(seed)
+    base = cv2.GaussianBlur(rng.integers(40, 200, (height, width, 3), dtype=np.uint8), (9, 9), 0)
+    for i in range(frames):
+        drift = int(60 * i / max(1, frames - 1))
+        frame = cv2.add(base, np.full_like(base, drift))
+        noise = rng.integers(0, 8, base.shape, dtype=np.uint8)
+        frame = cv2.add(frame, noise)
+        if with_motion and frames // 4 <= i < 3 * frames // 4:
+            x = (i * 7) % (width - 80)
+            cv2.rectangle(frame, (x, height // 3), (x + 80, height // 3 + 120), (250, 250, 250), -1)
+        yield frame
+
+
+def clip_frames(path, limit):
+    cap = cv2.VideoCapture(str(path))
+    try:
+        count = 0
+        while count < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            count += 1
+            yield frame
+    finally:
+        cap.release()
+
+
+def run_model(model, learning_rate, frames):
+    settings = {
+        'motion_sensitivity': MOTION_DEFAULT_SENSITIVITY,
+        'ignore_mask': [],
+        'detection_mask': [],
+        'background_model': model,
+        'learning_rate': learning_rate,
+    }
+    detector = MotionDetector(settings)
+    durations = []
+    detections = 0
+    for index, frame in enumerate(frames):
+        start = time.perf_counter()
+        motion = detector.detect(frame)
+        elapsed = time.perf_counter() - start
+        if index < WARMUP_FRAMES:
+            continue
+        durations.append(elapsed)
+        detections += bool(motion)
+    if not durations:
+        return None
+    return {
+        'ms_per_frame': 1000.0 * sum(durations) / len(durations),
+        'detection_rate': detections / len(durations),
+        'frames': len(durations),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quiet', nargs='*', default=[], help="клипы без настоящего движения")
+    parser.add_argument('--motion', nargs='*', default=[], help="клипы с движением")
+    parser.add_argument('--frames', type=int, default=300, help="максимум кадров на клип")
+    parser.add_argument('--learning-rate', type=float, default=DEFAULT_LEARNING_RATE)
+    parser.add_argument('--json', help="сохранить результаты в JSON-файл")
+    args = parser.parse_args()
+
+    scenes = []
+    if args.quiet or args.motion:
+        scenes += [(f"quiet:{Path(p).name}", False, lambda p=p: clip_frames(p, args.frames)) for p in args.quiet]
+        scenes += [(f"motion:{Path(p).name}", True, lambda p=p: clip_frames(p, args.frames)) for p in args.motion]
+    else:
+        scenes.append(("synthetic-quiet-720p", False, lambda: synthetic_scene(args.frames, 1280, 720, False)))
+        scenes.append(("synthetic-motion-720p", True, lambda: synthetic_scene(args.frames, 1280, 720, True)))
+
+    results = []
+    print(f"{'Модель':<18}{'Сцена':<28}{'мс/кадр':>10}{'ЛС, %':>9}{'Детекция, %':>14}")
+    for model in BACKGROUND_MODEL_NAMES:
+        for scene_name, has_motion, make_frames in scenes:
+            result = run_model(model, args.learning_rate, make_frames())
+            if result is None:
+                continue
+            result.update({'model': model, 'scene': scene_name, 'has_motion': has_motion})
+            results.append(result)
+            rate = 100.0 * result['detection_rate']
+            false_positive = "" if has_motion else f"{rate:.1f}"
+            detected = f"{rate:.1f}" if has_motion else ""
+            print(f"{model:<18}{scene_name:<28}{result['ms_per_frame']:>10.2f}{false_positive:>9}{detected:>14}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
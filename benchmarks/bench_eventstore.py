@@ -0,0 +1,92 @@
+"""Скорость журнала событий SQLite: пакетная запись и поиск «камера X между T1 и T2».
+
+Запуск из корня репозитория:
+    python benchmarks/bench_eventstore.py
+    python benchmarks/bench_eventstore.py --rows 5000000 --cameras 32
+
+База заполняется синтетическими событиями за год (пачками по BATCH_SIZE,
+как пишет EventStore), затем выполняются случайные запросы по камере
+и интервалу в час и в сутки через EventStore.query().
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from nexora.eventstore import BATCH_SIZE, INSERT, EventStore, _connect, _row  # noqa: E402
+
+YEAR = 365 * 24 * 3600.0
+WINDOWS = {'час': 3600.0, 'сутки': 24 * 3600.0}
+
+
+def synthetic_events(rows, cameras, origin):
+    for _ in range(rows):
+        start = origin + random.random() * YEAR
+        yield {
+            'camera': f"cam{random.randrange(cameras):02d}", 'start': start, 'end': start + random.uniform(1, 60),
+            'peak_area': random.uniform(500, 50000), 'peak_time': start, 'bbox': (10, 20, 300, 400), 'frames': 50,
+        }
+
+
+def fill(path, rows, cameras, origin):
+    connection = _connect(path)
+    started = time.perf_counter()
+    batch = []
+    for event in synthetic_events(rows, cameras, origin):
+        batch.append(_row(event))
+        if len(batch) == BATCH_SIZE:
+            with connection:
+                connection.executemany(INSERT, batch)
+            batch = []
+    if batch:
+        with connection:
+            connection.executemany(INSERT, batch)
+    connection.close()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--cameras', type=int, default=16)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(1)
+    origin = time.time() - YEAR
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'events.db')
+        store = EventStore(path)
+        elapsed = fill(path, args.rows, args.cameras, origin)
+        print(f"Запись: {args.rows} событий за {elapsed:.1f} с ({args.rows / elapsed:.0f} событий/с), "
+              f"файл {os.path.getsize(path) / 1e6:.0f} МБ")
+
+        for title, window in WINDOWS.items():
+            timings, found = [], 0
+            for _ in range(args.queries):
+                camera = f"cam{random.randrange(args.cameras):02d}"
+                start = origin + random.random() * (YEAR - window)
+                t0 = time.perf_counter()
+                found += len(store.query(camera, start, start + window))
+                timings.append((time.perf_counter() - t0) * 1000.0)
+            p50, p99 = np.percentile(timings, (50, 99))
+            print(f"Поиск за {title}: p50 {p50:.2f} мс, p99 {p99:.2f} мс, в среднем {found / args.queries:.1f} событий")
+
+        connection = sqlite3.connect(path)
+        plan = connection.execute("EXPLAIN QUERY PLAN SELECT * FROM events WHERE camera = ? AND start_time >= ? "
+                                  "AND start_time < ?", ('cam00', 0, 1)).fetchall()
+        connection.close()
+        print("План запроса:", plan[0][-1])
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""Задержка каждой стадии детекции, кадры в секунду и пиковая память на 720p/1080p/4K.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --video corridor.mp4 --output bench.json
+    python benchmarks/bench_pipeline.py --output new.json --compare old.json
+    python benchmarks/bench_pipeline.py --detection-zone 0.35 0.1 0.6 0.95
+    python benchmarks/bench_pipeline.py --scene quiet
+
+Кадры проходят через те же методы MotionDetector, что и в работающей камере
+(серый + уменьшение, размытие, модель фона — absdiff и порог, предпроверка
+по сетке клеток, расширение и маска зон, контуры), а затем через
+TileRenderer (масштаб плитки, надпись, RGB). С --detection-zone (доли
+ширины и высоты кадра) детектор получает зону детекции и анализирует только
+ее рамку. --scene quiet — та же синтетическая сцена без движущегося
+объекта: на тихих кадрах предпроверка отсекает расширение и контуры.
+Каждое разрешение меряется в отдельном процессе, поэтому пиковая память
+(ru_maxrss) относится только к нему. OpenCV ограничивается одним потоком.
+Результат в JSON можно сравнивать между версиями через --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_background import clip_frames, synthetic_scene  # noqa: E402
+from nexora.engine import DEFAULT_ANALYSIS_WIDTH, MOTION_DEFAULT_SENSITIVITY, MotionDetector  # noqa: E402
+
+RESOLUTIONS = {'720p': (1280, 720), '1080p': (1920, 1080), '4K': (3840, 2160)}
+STAGES = ('gray', 'blur', 'background', 'precheck', 'mask', 'contours', 'overlay')
+SCENES = ('busy', 'quiet')
+PERCENTILES = (50, 90, 99)
+DISTINCT_FRAMES = 32  # Сколько разных кадров держать в памяти (дальше они повторяются по кругу)
+WARMUP_FRAMES = 5
+TILE_SIZE = (640, 360)  # Размер плитки сетки, в которую рендерится кадр
+
+
+def load_frames(width, height, video, scene='busy'):
+    if video is None:
+        return list(synthetic_scene(DISTINCT_FRAMES, width, height, with_motion=scene == 'busy'))
+    return [cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            for frame in clip_frames(video, DISTINCT_FRAMES)]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux сообщает килобайты, macOS — байты
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_resolution(width, height, iterations, analysis_width, background_model, video, detection_zone=None,
+                   scene='busy', precheck_threshold=0.0):
+    """Прогоняет кадры через все стадии и возвращает перцентили задержек в миллисекундах."""
+    from nexora.display import TileRenderer
+
+    cv2.setNumThreads(1)
+    frames = load_frames(width, height, video, scene)
+    if not frames:
+        return {'error': f"нет кадров в {video}"}
+    settings = {
+        'motion_sensitivity': MOTION_DEFAULT_SENSITIVITY,
+        'background_model': background_model,
+        'analysis_width': analysis_width,
+        'precheck_threshold': precheck_threshold,
+    }
+    if detection_zone:
+        x1, y1, x2, y2 = detection_zone
+        settings['detection_mask'] = [(int(x1 * width), int(y1 * height), int(x2 * width), int(y2 * height))]
+    detector = MotionDetector(settings)
+    renderer = TileRenderer(label=None)
+    renderer.size = TILE_SIZE
+    timings = {stage: np.empty(iterations) for stage in STAGES}
+    detections = 0
+    quiet = 0
+
+    clock = time.perf_counter
+    for i in range(-WARMUP_FRAMES, iterations):
+        frame = frames[i % len(frames)]
+        t0 = clock()
+        gray = detector.to_gray(frame)
+        t1 = clock()
+        blurred = detector.blur(gray)
+        t2 = clock()
+        thresh = detector.background.apply(blurred)
+        t3 = clock()
+        motion = False
+        cells = None
+        if thresh is not None:
+            cells = detector.changed_cells(thresh)
+        t4 = clock()
+        if cells is not None:
+            mask = detector.motion_mask(thresh, cells)
+            t5 = clock()
+            motion = detector.has_motion(mask)
+            t6 = clock()
+        else:
+            t5 = t6 = t4
+        renderer.render(frame, motion)
+        t7 = clock()
+        if i < 0:
+            continue
+        detections += motion
+        quiet += cells is None
+        for stage, start, end in zip(STAGES, (t0, t1, t2, t3, t4, t5, t6), (t1, t2, t3, t4, t5, t6, t7)):
+            timings[stage][i] = (end - start) * 1000.0
+
+    total = sum(timings.values())
+    return {
+        'resolution': [width, height],
+        'stages_ms': {stage: summarize(values) for stage, values in timings.items()},
+        'total_ms': summarize(total),
+        'fps': round(1000.0 / float(np.mean(total)), 1),
+        'detection_share': round(detections / iterations, 3),
+        'quiet_share': round(quiet / iterations, 3),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def summarize(values):
+    summary = {f'p{p}': round(float(v), 3) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+    summary['mean'] = round(float(np.mean(values)), 3)
+    return summary
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def print_report(results, baseline=None):
+    header = f"{'Поток':<8}{'Стадия':<12}" + "".join(f"{'p' + str(p):>10}" for p in PERCENTILES) + f"{'среднее':>10}"
+    if baseline:
+        header += f"{'было p50':>10}{'Δ p50':>9}"
+    print(header)
+    for name, result in results.items():
+        if 'error' in result:
+            print(f"{name:<8}{result['error']}")
+            continue
+        old = (baseline or {}).get(name, {})
+        rows = list(result['stages_ms'].items()) + [('итого', result['total_ms'])]
+        for stage, summary in rows:
+            line = f"{name:<8}{stage:<12}" + "".join(f"{summary[f'p{p}']:>10.3f}" for p in PERCENTILES)
+            line += f"{summary['mean']:>10.3f}"
+            previous = old.get('total_ms') if stage == 'итого' else old.get('stages_ms', {}).get(stage)
+            if previous and previous['p50']:
+                change = 100.0 * (summary['p50'] - previous['p50']) / previous['p50']
+                line += f"{previous['p50']:>10.3f}{change:>+8.1f}%"
+            print(line)
+        rss = "н/д" if result['peak_rss_mb'] is None else f"{result['peak_rss_mb']} МБ"
+        fps_line = f"{name:<8}{result['fps']:.1f} кадр/с, пиковая память {rss}"
+        if old.get('fps'):
+            fps_line += f" (было {old['fps']:.1f} кадр/с)"
+        fps_line += f", тихих кадров {100 * result['quiet_share']:.0f}%"
+        print(fps_line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolutions', nargs='*', default=list(RESOLUTIONS), choices=list(RESOLUTIONS))
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--analysis-width', type=int, default=DEFAULT_ANALYSIS_WIDTH)
+    parser.add_argument('--background-model', default='running_average')
+    parser.add_argument('--video', help="брать кадры из записи вместо синтетической сцены")
+    parser.add_argument('--detection-zone', nargs=4, type=float, metavar=('X1', 'Y1', 'X2', 'Y2'),
+                        help="зона детекции в долях кадра, например дверной проем: 0.35 0.1 0.6 0.95")
+    parser.add_argument('--scene', default='busy', choices=SCENES,
+                        help="синтетическая сцена с движущимся объектом (busy) или без него (quiet)")
+    parser.add_argument('--precheck-threshold', type=float, default=0.0,
+                        help="изменившихся пикселей клетки, %%, до которого клетка считается спокойной")
+    parser.add_argument('--output', help="сохранить результаты в JSON")
+    parser.add_argument('--compare', help="JSON предыдущего прогона для сравнения")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.resolutions:
+        width, height = RESOLUTIONS[name]
+        # Свежий процесс на каждое разрешение — иначе ru_maxrss копится от предыдущих
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+            results[name] = pool.submit(run_resolution, width, height, args.iterations,
+                                        args.analysis_width, args.background_model, args.video,
+                                        args.detection_zone, args.scene, args.precheck_threshold).result()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    print_report(results, baseline)
+
+    if args.output:
+        report = {
+            'environment': environment(),
+            'parameters': {
+                'iterations': args.iterations,
+                'analysis_width': args.analysis_width,
+                'background_model': args.background_model,
+                'video': args.video,
+                'detection_zone': args.detection_zone,
+                'scene': args.scene,
+                'precheck_threshold': args.precheck_threshold,
+                'tile_size': list(TILE_SIZE),
+            },
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Скорость файла профилей: загрузка при запуске, сохранение одного профиля и проверка правки извне.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_profiles.py
+    python benchmarks/bench_profiles.py --profiles 1000 --target-ms 300
+
+Файл заполняется синтетическими профилями с зонами и многоугольниками.
+Загрузка (ProfileStore.load, как при запуске программы) повторяется
+несколько раз; код завершения 1, если медиана дольше --target-ms.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from nexora.profiles import ProfileStore, default_profile  # noqa: E402
+
+DEFAULT_TARGET_MS = 200.0  # Загрузка 500 профилей при запуске — не дольше, мс
+
+
+def synthetic_profiles(count):
+    profiles = {}
+    for i in range(count):
+        profiles[f"cam{i:04d}"] = dict(
+            default_profile(), camera_url=f"rtsp://10.0.{i // 250}.{i % 250}:554/stream1", enabled=i % 4 != 0,
+            motion_sensitivity=300 + i % 700, detection_mask=[(100, 50, 900, 700)], ignore_mask=[(0, 0, 200, 80)],
+            detection_polygons=[[(120, 80), (860, 90), (880, 690), (140, 650)]])
+    return profiles
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return (time.perf_counter() - started) * 1000.0, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profiles', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--target-ms', type=float, default=DEFAULT_TARGET_MS)
+    args = parser.parse_args()
+
+    profiles = synthetic_profiles(args.profiles)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'profiles.ini')
+        elapsed, _ = timed(ProfileStore(path).update, profiles)
+        print(f"Запись {args.profiles} профилей: {elapsed:.1f} мс, файл {os.path.getsize(path) / 1e3:.0f} КБ")
+
+        timings = [timed(ProfileStore(path).load)[0] for _ in range(args.repeat)]
+        load_ms = statistics.median(timings)
+        print(f"Загрузка: медиана {load_ms:.1f} мс, лучшая {min(timings):.1f} мс "
+              f"({load_ms * 1000.0 / args.profiles:.0f} мкс на профиль)")
+
+        store = ProfileStore(path)
+        store.load()
+        name = next(iter(profiles))
+        elapsed, _ = timed(store.update, {name: profiles[name]})
+        print(f"Сохранение неизмененного профиля: {elapsed:.2f} мс (без записи файла)")
+        elapsed, _ = timed(store.update, {name: dict(profiles[name], motion_sensitivity=1)})
+        print(f"Сохранение одного измененного профиля: {elapsed:.1f} мс")
+        elapsed, _ = timed(store.poll)
+        print(f"Проверка файла без изменений: {elapsed * 1000.0:.0f} мкс")
+
+        other = ProfileStore(path)
+        other.load()
+        other.update({name: dict(profiles[name], motion_sensitivity=2)})
+        elapsed, changes = timed(store.poll)
+        print(f"Правка одного профиля извне: {elapsed:.1f} мс, изменилось профилей: {len(changes)}")
+
+    if load_ms > args.target_ms:
+        print(f"Загрузка дольше цели {args.target_ms:.0f} мс")
+        sys.exit(1)
+    print(f"Цель {args.target_ms:.0f} мс выполнена")
+
+
+if __name__ == '__main__':
+    main()
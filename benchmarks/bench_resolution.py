@@ -0,0 +1,56 @@
+"""Кадры в секунду на одно ядро в зависимости от разрешения анализа.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_resolution.py
+    python benchmarks/bench_resolution.py --widths 0 640 320 --iterations 200
+
+Ширина 0 — анализ в исходном разрешении (поведение до появления analysis_width).
+OpenCV ограничивается одним потоком, чтобы цифры были «на ядро».
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_background import synthetic_scene  # noqa: E402
+from nexora.engine import MOTION_DEFAULT_SENSITIVITY, MotionDetector  # noqa: E402
+
+RESOLUTIONS = {'1080p': (1920, 1080), '4K': (3840, 2160)}
+DISTINCT_FRAMES = 16  # Сколько разных кадров генерировать (дальше они повторяются по кругу)
+
+
+def measure(frames, analysis_width, iterations):
+    detector = MotionDetector({
+        'motion_sensitivity': MOTION_DEFAULT_SENSITIVITY,
+        'ignore_mask': [],
+        'detection_mask': [],
+        'analysis_width': analysis_width,
+    })
+    for frame in frames[:2]:
+        detector.detect(frame)
+    start = time.perf_counter()
+    for i in range(iterations):
+        detector.detect(frames[i % len(frames)])
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--widths', nargs='*', type=int, default=[0, 640, 320])
+    parser.add_argument('--iterations', type=int, default=60)
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    print(f"{'Поток':<8}" + "".join(f"{('исходное' if w == 0 else str(w)):>12}" for w in args.widths))
+    for name, (width, height) in RESOLUTIONS.items():
+        frames = list(synthetic_scene(DISTINCT_FRAMES, width, height, with_motion=True))
+        row = [measure(frames, analysis_width, args.iterations) for analysis_width in args.widths]
+        print(f"{name:<8}" + "".join(f"{fps:>12.1f}" for fps in row))
+
+
+if __name__ == '__main__':
+    main()
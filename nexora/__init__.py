@@ -0,0 +1,4 @@
+"""Ядро Nexora: захват видеопотоков и детекция движения без привязки к GUI."""
+from nexora.engine import CameraManager, CameraWorker, DetectionScheduler, MotionDetector, get_camera_url
+
+__all__ = ['CameraManager', 'CameraWorker', 'DetectionScheduler', 'MotionDetector', 'get_camera_url']
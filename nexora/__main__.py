@@ -0,0 +1,128 @@
+"""Точка входа: python -m nexora [--headless --profiles файл.ini | --batch каталог]."""
+import argparse
+import logging
+import sys
+import time
+
+from nexora.alerts import DEFAULT_ALERT_COOLDOWN
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m nexora', description="Nexora — видеонаблюдение с детекцией движения")
+    parser.add_argument('--headless', action='store_true', help="работать без графического интерфейса")
+    parser.add_argument('--batch', metavar='КАТАЛОГ',
+                        help="пакетно проанализировать видеофайлы каталога и выйти")
+    parser.add_argument('--profiles', help="INI-файл профилей (секции Profile_<имя>)")
+    parser.add_argument('--profile', action='append', dest='profile_names', metavar='ИМЯ',
+                        help="запустить только этот профиль (можно указать несколько раз)")
+    parser.add_argument('--clips-dir', default='clips', help="папка для клипов с движением (по умолчанию ./clips)")
+    parser.add_argument('--max-concurrent', type=int, help="максимум одновременных детекций (по умолчанию — число ядер)")
+    parser.add_argument('--processes', action='store_true',
+                        help="захват и детекция каждой камеры в отдельном процессе (сбой одной не задевает другие)")
+    parser.add_argument('--metrics-port', type=int, help="отдавать метрики Prometheus по HTTP на этом порту")
+    parser.add_argument('--metrics-host', default='127.0.0.1', help="адрес HTTP-эндпоинта метрик (по умолчанию 127.0.0.1)")
+    parser.add_argument('--metrics-file', help="периодически записывать метрики Prometheus в файл")
+    parser.add_argument('--events-db', default='events.db',
+                        help="журнал событий движения SQLite (по умолчанию ./events.db; пустая строка — не вести)")
+    parser.add_argument('--thumbnails-dir', default='thumbnails',
+                        help="каталог миниатюр событий (по умолчанию ./thumbnails; пустая строка — не сохранять)")
+    parser.add_argument('--heatmaps-dir', default='heatmaps',
+                        help="каталог тепловых карт активности (по умолчанию ./heatmaps; пустая строка — не копить)")
+    parser.add_argument('--alert-log', metavar='ФАЙЛ', help="дописывать события движения в файл (JSON по строке)")
+    parser.add_argument('--alert-webhook', metavar='URL', help="отправлять события движения POST-запросом в JSON")
+    parser.add_argument('--alert-udp', metavar='ХОСТ:ПОРТ', help="отправлять события движения UDP-датаграммами")
+    parser.add_argument('--alert-cooldown', type=float, default=DEFAULT_ALERT_COOLDOWN,
+                        help=f"минимальная пауза между оповещениями по камере для webhook и UDP, секунды "
+                             f"(по умолчанию {DEFAULT_ALERT_COOLDOWN:g})")
+    parser.add_argument('--alert-clip', type=float, default=0.0, metavar='СЕКУНДЫ',
+                        help="по событию движения записывать клип этой длины (у профилей с записью клипов)")
+    parser.add_argument('--alert-clip-camera', action='append', dest='alert_clip_cameras', metavar='КАМЕРА=КАМЕРЫ',
+                        help="по движению на КАМЕРЕ писать клипы на перечисленных через запятую камерах "
+                             "(можно указать несколько раз; по умолчанию — на самой камере события)")
+    parser.add_argument('--output', default='motion_events.json',
+                        help="файл результатов пакетного анализа: .json или .csv")
+    parser.add_argument('--workers', type=int, help="число процессов пакетного анализа (по умолчанию — число ядер)")
+    parser.add_argument('--step', type=int, default=1, help="анализировать каждый N-й кадр при пакетном анализе")
+    parser.add_argument('--log-file', help="дополнительно писать журнал в файл")
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    return parser, parser.parse_args(argv)
+
+
+def setup_logging(level, log_file=None):
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    logging.basicConfig(level=level, format='%(asctime)s %(levelname)s %(message)s', handlers=handlers)
+
+
+def run_batch(parser, args):
+    from nexora.batch import analyze_directory, write_results
+    from nexora.profiles import default_profile, load_profiles
+
+    logger = logging.getLogger('nexora')
+    settings = default_profile()
+    if args.profiles:
+        profiles = load_profiles(args.profiles)
+        name = args.profile_names[0] if args.profile_names else None
+        if name is None and len(profiles) == 1:
+            name = next(iter(profiles))
+        if name is None:
+            parser.error("укажите --profile: в файле несколько профилей")
+        if name not in profiles:
+            parser.error(f"профиль '{name}' не найден в {args.profiles}")
+        settings = profiles[name]
+
+    def report(result):
+        if result['error']:
+            logger.error("%s: %s", result['file'], result['error'])
+        else:
+            logger.info("%s: событий %d, %.1f с видео за %.1f с", result['file'], len(result['events']),
+                        result['duration'], result['processing_time'])
+
+    started = time.perf_counter()
+    results = analyze_directory(args.batch, settings, workers=args.workers, step=max(1, args.step),
+                                on_result=report)
+    if not results:
+        logger.error("В каталоге %s нет видеофайлов", args.batch)
+        return 1
+    write_results(results, args.output)
+    elapsed = time.perf_counter() - started
+    total_video = sum(result['duration'] for result in results)
+    logger.info("Файлов: %d, видео: %.1f с, время: %.1f с (x%.1f реального времени). Результат: %s",
+                len(results), total_video, elapsed, total_video / elapsed if elapsed else 0.0, args.output)
+    return 0
+
+
+def main(argv=None):
+    parser, args = parse_args(argv)
+    if args.batch:
+        setup_logging(args.log_level, args.log_file)
+        return run_batch(parser, args)
+    if not args.headless:
+        # Графический интерфейс живет в app.py в каталоге программы
+        try:
+            import app
+        except ModuleNotFoundError as e:
+            if e.name != 'app':
+                raise
+            parser.error("графический интерфейс запускается командой: python app.py")
+        app.main()
+        return 0
+
+    if not args.profiles:
+        parser.error("для --headless нужен --profiles файл.ini")
+    setup_logging(args.log_level, args.log_file)
+
+    from nexora.headless import parse_clip_targets, run_headless
+    return run_headless(args.profiles, clips_dir=args.clips_dir, profile_names=args.profile_names,
+                        max_concurrent=args.max_concurrent, metrics_port=args.metrics_port,
+                        metrics_host=args.metrics_host, metrics_file=args.metrics_file,
+                        alert_log=args.alert_log, alert_webhook=args.alert_webhook, alert_udp=args.alert_udp,
+                        alert_cooldown=args.alert_cooldown, events_db=args.events_db,
+                        thumbnails_dir=args.thumbnails_dir, heatmaps_dir=args.heatmaps_dir,
+                        processes=args.processes, alert_clip=args.alert_clip,
+                        alert_clip_targets=parse_clip_targets(args.alert_clip_cameras))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""Шина оповещений: детекция публикует события, приемники обрабатывают их в своих потоках.
+
+publish() только кладет событие в ограниченные очереди приемников и никогда
+не блокирует поток детекции: при переполненной очереди событие для этого
+приемника отбрасывается и учитывается в счетчике dropped. Каждый приемник
+работает в своем потоке, поэтому медленный webhook не задерживает звук
+или всплывающее окно, и сам ограничивает частоту: пауза между оповещениями
+по одной камере (cooldown) и общий предел за минуту (rate_limit).
+"""
+import json
+import logging
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import deque
+from queue import Queue, Full
+
+logger = logging.getLogger('nexora')
+
+ALERT_QUEUE_SIZE = 64  # Очередь событий одного приемника
+DEFAULT_ALERT_COOLDOWN = 5.0  # Секунд между оповещениями приемника по одной камере
+RATE_WINDOW = 60.0  # Окно общего ограничения частоты, секунды
+WEBHOOK_TIMEOUT = 3.0
+SOUND_TIMEOUT = 10.0
+
+
+def motion_event(camera, **details):
+    """Событие движения в формате шины: словарь, сериализуемый в JSON.
+
+    type — motion (начало события) или motion_end (конец, с итогами события).
+    """
+    event = {'type': 'motion', 'camera': camera, 'time': time.time()}
+    event.update(details)
+    return event
+
+
+class AlertSink:
+    """Базовый приемник: собственный поток, очередь и ограничение частоты.
+
+    Наследники переопределяют handle(event); исключения из него
+    перехватываются и считаются в failed. event_types ограничивает типы
+    принимаемых событий; None — все.
+    """
+
+    name = "приемник"
+    event_types = ('motion',)
+    queue_size = ALERT_QUEUE_SIZE
+
+    def __init__(self, cooldown=DEFAULT_ALERT_COOLDOWN, rate_limit=0, event_types=None):
+        if event_types is not None:
+            self.event_types = event_types
+        self.cooldown = cooldown
+        self.rate_limit = rate_limit  # Не больше стольких оповещений за RATE_WINDOW; 0 — без предела
+        self.counters = {'sent': 0, 'suppressed': 0, 'dropped': 0, 'failed': 0}
+        self._queue = Queue(self.queue_size)
+        self._last_sent = {}  # {камера: время последнего оповещения о начале события}
+        self._suppressed = set()  # Камеры, у которых подавлено начало текущего события
+        self._recent = deque()
+        self._thread = threading.Thread(target=self._run, name=f"alert-{self.name}", daemon=True)
+        self._thread.start()
+
+    def offer(self, event):
+        if self.event_types is not None and event['type'] not in self.event_types:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except Full:
+            self.counters['dropped'] += 1
+
+    def allow(self, event):
+        """Проверяет паузу по камере и общий предел частоты; вызывается в потоке приемника.
+
+        Ограничения действуют только на начало события (motion): конец
+        события (motion_end) доставляется всегда, если доставлено его начало,
+        и отбрасывается вместе с подавленным началом.
+        """
+        camera = event.get('camera')
+        if event['type'] != 'motion':
+            return camera not in self._suppressed
+        now = time.monotonic()
+        if self.cooldown and now - self._last_sent.get(camera, -self.cooldown) < self.cooldown:
+            self._suppressed.add(camera)
+            return False
+        if self.rate_limit:
+            while self._recent and now - self._recent[0] >= RATE_WINDOW:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit:
+                self._suppressed.add(camera)
+                return False
+            self._recent.append(now)
+        self._last_sent[camera] = now
+        self._suppressed.discard(camera)
+        return True
+
+    def handle(self, event):
+        raise NotImplementedError
+
+    def close(self, timeout=None):
+        """Обрабатывает уже принятые события и останавливает поток."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                break
+            if not self.allow(event):
+                self.counters['suppressed'] += 1
+                continue
+            try:
+                self.handle(event)
+                self.counters['sent'] += 1
+            except Exception as e:
+                self.counters['failed'] += 1
+                logger.warning("Приемник оповещений «%s»: %s", self.name, e)
+
+
+class QueueSink(AlertSink):
+    """Передает событие в очередь сообщений интерфейса или headless-журнала как ("motion", камера)."""
+
+    name = "окно"
+
+    def __init__(self, message_queue, msg_type="motion", **kwargs):
+        self.message_queue = message_queue
+        self.msg_type = msg_type
+        super().__init__(**kwargs)
+
+    def handle(self, event):
+        self.message_queue.put((self.msg_type, event['camera']))
+
+
+def play_sound(path):
+    """Проигрывает звуковой файл средствами системы и ждет окончания."""
+    if sys.platform == 'win32':
+        import winsound
+        winsound.PlaySound(path, winsound.SND_FILENAME)
+        return
+    if sys.platform == 'darwin':
+        command = ['afplay', path]
+    else:
+        player = next((name for name in ('paplay', 'aplay', 'ffplay') if shutil.which(name)), None)
+        if player is None:
+            raise RuntimeError("не найден проигрыватель (paplay, aplay или ffplay)")
+        command = [player, path] if player != 'ffplay' else [player, '-nodisp', '-autoexit', '-loglevel', 'quiet', path]
+    subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=SOUND_TIMEOUT, check=False)
+
+
+class SoundSink(AlertSink):
+    """Звук профиля камеры; sound_for(камера) возвращает путь к файлу или пустую строку."""
+
+    name = "звук"
+
+    def __init__(self, sound_for, **kwargs):
+        self.sound_for = sound_for
+        super().__init__(**kwargs)
+
+    def handle(self, event):
+        path = self.sound_for(event['camera'])
+        if path:
+            play_sound(path)
+
+
+class LogFileSink(AlertSink):
+    """Дописывает события в файл, по одному JSON-объекту на строку."""
+
+    name = "журнал"
+    event_types = None
+
+    def __init__(self, path, cooldown=0.0, **kwargs):
+        self.path = path
+        super().__init__(cooldown=cooldown, **kwargs)
+
+    def handle(self, event):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+
+class WebhookSink(AlertSink):
+    """POST события в формате JSON на HTTP-адрес."""
+
+    name = "webhook"
+    event_types = None
+
+    def __init__(self, url, timeout=WEBHOOK_TIMEOUT, **kwargs):
+        self.url = url
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def handle(self, event):
+        request = urllib.request.Request(
+            self.url, data=json.dumps(event, ensure_ascii=False).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class UdpSink(AlertSink):
+    """Отправляет событие JSON-датаграммой на (хост, порт) — без ожидания ответа."""
+
+    name = "udp"
+    event_types = None
+
+    def __init__(self, address, cooldown=0.0, **kwargs):
+        self.address = address
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        super().__init__(cooldown=cooldown, **kwargs)
+
+    def handle(self, event):
+        self._socket.sendto(json.dumps(event, ensure_ascii=False).encode('utf-8'), self.address)
+
+    def close(self, timeout=None):
+        super().close(timeout)
+        self._socket.close()
+
+
+class ClipTriggerSink(AlertSink):
+    """Включает запись клипа на камерах по событию.
+
+    targets — {камера события: [камеры для записи]}; по умолчанию пишется
+    сама камера события. Клип продлевается на duration секунд, как при движении.
+    """
+
+    name = "клип"
+
+    def __init__(self, manager, duration, targets=None, cooldown=0.0, **kwargs):
+        self.manager = manager
+        self.duration = duration
+        self.targets = targets or {}
+        super().__init__(cooldown=cooldown, **kwargs)
+
+    def handle(self, event):
+        for camera in self.targets.get(event['camera'], [event['camera']]):
+            self.manager.trigger_clip(camera, self.duration)
+
+
+class AlertBus:
+    """Рассылает события всем приемникам без блокировки публикующего потока."""
+
+    def __init__(self, sinks=()):
+        self.sinks = list(sinks)
+        self.published = 0
+
+    def add_sink(self, sink):
+        self.sinks = self.sinks + [sink]
+        return sink
+
+    def publish(self, event):
+        self.published += 1
+        for sink in self.sinks:
+            sink.offer(event)
+
+    def stats(self):
+        """Счетчики каждого приемника: отправлено, подавлено паузой, отброшено, ошибки."""
+        return {sink.name: dict(sink.counters) for sink in self.sinks}
+
+    def close(self, timeout=1.0):
+        for sink in self.sinks:
+            sink.close(timeout)
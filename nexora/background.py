@@ -0,0 +1,109 @@
+"""Модели фона для детектора движения.
+
+Каждая модель принимает размытый кадр в оттенках серого и возвращает
+бинарную маску переднего плана (0/255) либо None, пока модель не прогрета.
+"""
+import cv2
+import numpy as np
+
+DIFF_THRESHOLD = 25  # Порог яркости, с которого пиксель считается изменившимся
+
+BACKGROUND_RUNNING_AVERAGE = 'running_average'
+BACKGROUND_MOG2 = 'mog2'
+BACKGROUND_KNN = 'knn'
+BACKGROUND_FRAME_DIFF = 'frame_diff'
+BACKGROUND_STATIC = 'static'
+
+DEFAULT_BACKGROUND_MODEL = BACKGROUND_RUNNING_AVERAGE
+DEFAULT_LEARNING_RATE = 0.05
+
+BACKGROUND_MODEL_NAMES = {
+    BACKGROUND_RUNNING_AVERAGE: "Скользящее среднее",
+    BACKGROUND_MOG2: "MOG2",
+    BACKGROUND_KNN: "KNN",
+    BACKGROUND_FRAME_DIFF: "Разность соседних кадров",
+    BACKGROUND_STATIC: "Первый кадр (без обучения)",
+}
+
+
+class RunningAverageModel:
+    """Фон как экспоненциальное скользящее среднее (cv2.accumulateWeighted)."""
+
+    def __init__(self, learning_rate=DEFAULT_LEARNING_RATE):
+        self.learning_rate = learning_rate
+        self._average = None
+        self._background = None
+
+    def apply(self, gray):
+        if self._average is None or self._average.shape != gray.shape:
+            self._average = gray.astype(np.float32)
+            self._background = gray.copy()
+            return None
+        cv2.convertScaleAbs(self._average, dst=self._background)
+        delta = cv2.absdiff(self._background, gray)
+        cv2.accumulateWeighted(gray, self._average, self.learning_rate)
+        return cv2.threshold(delta, DIFF_THRESHOLD, 255, cv2.THRESH_BINARY)[1]
+
+
+class FrameDifferenceModel:
+    """Разность с предыдущим кадром: мгновенно забывает фон, видит только изменения."""
+
+    def __init__(self, learning_rate=DEFAULT_LEARNING_RATE):
+        self._previous = None
+
+    def apply(self, gray):
+        previous, self._previous = self._previous, gray
+        if previous is None or previous.shape != gray.shape:
+            return None
+        delta = cv2.absdiff(previous, gray)
+        return cv2.threshold(delta, DIFF_THRESHOLD, 255, cv2.THRESH_BINARY)[1]
+
+
+class StaticReferenceModel:
+    """Прежнее поведение: первый кадр становится опорным навсегда."""
+
+    def __init__(self, learning_rate=DEFAULT_LEARNING_RATE):
+        self._reference = None
+
+    def apply(self, gray):
+        if self._reference is None or self._reference.shape != gray.shape:
+            self._reference = gray
+            return None
+        delta = cv2.absdiff(self._reference, gray)
+        return cv2.threshold(delta, DIFF_THRESHOLD, 255, cv2.THRESH_BINARY)[1]
+
+
+class SubtractorModel:
+    """Обертка над cv2.BackgroundSubtractor (MOG2 или KNN) без поиска теней."""
+
+    def __init__(self, kind, learning_rate=DEFAULT_LEARNING_RATE):
+        self.kind = kind
+        self.learning_rate = learning_rate
+        self._subtractor = None
+        self._shape = None
+
+    def _create(self):
+        if self.kind == BACKGROUND_KNN:
+            return cv2.createBackgroundSubtractorKNN(detectShadows=False)
+        return cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+
+    def apply(self, gray):
+        if self._subtractor is None or self._shape != gray.shape:
+            self._subtractor = self._create()
+            self._shape = gray.shape
+            self._subtractor.apply(gray, learningRate=1.0)
+            return None
+        return self._subtractor.apply(gray, learningRate=self.learning_rate)
+
+
+def create_background_model(kind=DEFAULT_BACKGROUND_MODEL, learning_rate=DEFAULT_LEARNING_RATE):
+    """Создает модель фона по имени из BACKGROUND_MODEL_NAMES."""
+    if kind == BACKGROUND_RUNNING_AVERAGE:
+        return RunningAverageModel(learning_rate)
+    if kind in (BACKGROUND_MOG2, BACKGROUND_KNN):
+        return SubtractorModel(kind, learning_rate)
+    if kind == BACKGROUND_FRAME_DIFF:
+        return FrameDifferenceModel(learning_rate)
+    if kind == BACKGROUND_STATIC:
+        return StaticReferenceModel(learning_rate)
+    raise ValueError(f"Неизвестная модель фона: {kind}")
@@ -0,0 +1,132 @@
+"""Пакетный анализ записанных видеофайлов на пуле процессов.
+
+Каждый файл целиком обрабатывается одним процессом тем же детектором,
+что и живые камеры (чувствительность, модель фона и зоны берутся из профиля),
+без привязки к реальному времени. Кадры сводятся в события тем же трекером
+MotionEventTracker, что и у камер, по времени файла. Результат — временная
+шкала событий движения по каждому файлу в JSON или CSV.
+"""
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from nexora.capture import source_fps
+from nexora.engine import MotionDetector
+from nexora.events import MotionEventTracker
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov', '.ts', '.m4v', '.webm', '.flv', '.3gp')
+
+
+def find_videos(directory, extensions=VIDEO_EXTENSIONS):
+    """Все видеофайлы каталога (рекурсивно), отсортированные по пути."""
+    videos = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(extensions):
+                videos.append(os.path.join(root, name))
+    return sorted(videos)
+
+
+def _close_event(events, event, fps, step=1, last_frame=None):
+    # Последний проанализированный кадр движения стоит за step кадров файла: событие заканчивается
+    # вместе с последним из них, но не дальше последнего кадра файла (last_frame)
+    end_frame = round(event['end'] * fps) + step - 1
+    if last_frame is not None:
+        end_frame = min(end_frame, last_frame)
+    end = (end_frame + 1) / fps
+    events.append({
+        'start': round(event['start'], 3),
+        'end': round(end, 3),
+        'duration': round(end - event['start'], 3),
+        'start_frame': round(event['start'] * fps),
+        'end_frame': end_frame,
+        'peak_area': round(event['peak_area'], 1),
+        'bbox': list(event['bbox']),
+    })
+
+
+def analyze_file(path, settings, step=1):
+    """Прогоняет файл через детектор и возвращает события движения.
+
+    step > 1 анализирует каждый step-й кадр, пропуская остальные через grab()
+    без декодирования изображения.
+    """
+    started = time.perf_counter()
+    cap = cv2.VideoCapture(path)
+    result = {'file': path, 'events': [], 'frames': 0, 'fps': 0.0, 'duration': 0.0, 'error': None}
+    try:
+        if not cap.isOpened():
+            result['error'] = "не удалось открыть файл"
+            return result
+        fps = source_fps(cap)
+        result['fps'] = fps
+        detector = MotionDetector(settings)
+        tracker = MotionEventTracker(settings)
+
+        index = -1
+        frame = None
+        while True:
+            for _ in range(step - 1):
+                if not cap.grab():
+                    break
+                index += 1
+            ret, frame = cap.read(frame)
+            if not ret:
+                break
+            index += 1
+            area, bbox = detector.measure(frame)
+            for event in tracker.update(index / fps, area, bbox):
+                if event['end'] is not None:
+                    _close_event(result['events'], event, fps, step)
+        for event in tracker.finish():
+            _close_event(result['events'], event, fps, step, index)
+        result['frames'] = index + 1
+        result['duration'] = round((index + 1) / fps, 3)
+    except Exception as e:
+        result['error'] = str(e)
+    finally:
+        cap.release()
+        result['processing_time'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def _init_worker():
+    # Параллелизм дают процессы; внутренние потоки OpenCV только мешали бы им
+    cv2.setNumThreads(1)
+
+
+def analyze_directory(directory, settings, workers=None, step=1, on_result=None):
+    """Анализирует все видео каталога на пуле процессов; результаты — в порядке файлов."""
+    videos = find_videos(directory)
+    results = {}
+    if not videos:
+        return []
+    workers = max(1, min(workers or os.cpu_count() or 1, len(videos)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(analyze_file, path, settings, step): path for path in videos}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            if on_result is not None:
+                on_result(result)
+    return [results[path] for path in videos]
+
+
+def write_results(results, output_path):
+    """Сохраняет результаты в JSON или CSV (по расширению файла)."""
+    if output_path.lower().endswith('.csv'):
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['file', 'start', 'end', 'duration', 'start_frame', 'end_frame', 'peak_area', 'bbox'])
+            for result in results:
+                for event in result['events']:
+                    writer.writerow([result['file'], event['start'], event['end'], event['duration'],
+                                     event['start_frame'], event['end_frame'], event['peak_area'],
+                                     ' '.join(map(str, event['bbox']))])
+    else:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,166 @@
+"""Открытие видеоисточников: адреса потоков, выбор бэкенда OpenCV и транспорта RTSP.
+
+Профиль может задать бэкенд захвата (FFmpeg или GStreamer), транспорт RTSP
+(TCP/UDP), дополнительные параметры бэкенда и подпоток низкого разрешения
+для детекции.
+"""
+import os
+import threading
+
+import cv2
+
+FALLBACK_FPS = 25.0  # Частота файла, если контейнер её не сообщает
+OPEN_TIMEOUT_MS = 10000  # Таймауты сетевого потока, чтобы обрыв не вешал read() надолго
+READ_TIMEOUT_MS = 5000
+
+CAPTURE_BACKEND_AUTO = 'auto'
+CAPTURE_BACKEND_FFMPEG = 'ffmpeg'
+CAPTURE_BACKEND_GSTREAMER = 'gstreamer'
+DEFAULT_CAPTURE_BACKEND = CAPTURE_BACKEND_AUTO
+CAPTURE_BACKEND_NAMES = {
+    CAPTURE_BACKEND_AUTO: "Автоматически",
+    CAPTURE_BACKEND_FFMPEG: "FFmpeg",
+    CAPTURE_BACKEND_GSTREAMER: "GStreamer",
+}
+RTSP_TRANSPORT_NAMES = {'': "Автоматически", 'tcp': "TCP", 'udp': "UDP"}
+# Ключи профиля, от которых зависит подключение к источнику
+CONNECTION_KEYS = ('connection_mode', 'camera_url', 'ip', 'port', 'username', 'password', 'stream_path',
+                   'substream_url', 'substream_path', 'capture_backend', 'rtsp_transport', 'capture_options')
+
+GSTREAMER_LATENCY_MS = 200
+# {source} — rtspsrc или uridecodebin; appsink отдает только последний кадр
+GSTREAMER_PIPELINE = ("{source} ! decodebin ! videoconvert ! video/x-raw,format=BGR ! "
+                      "appsink drop=true max-buffers=1 sync=false")
+
+# Параметры FFmpeg OpenCV читает из переменной окружения в момент открытия,
+# поэтому открытие с собственными параметрами выполняется под блокировкой
+_ffmpeg_options_lock = threading.Lock()
+FFMPEG_OPTIONS_ENV = 'OPENCV_FFMPEG_CAPTURE_OPTIONS'
+
+
+def _rtsp_url(settings, stream_path):
+    user_pass = f"{settings['username']}:{settings['password']}@" if (
+        settings['username'] or settings['password']) else ""
+    return f"rtsp://{user_pass}{settings['ip']}:{settings['port']}{stream_path}"
+
+
+def get_camera_url(settings):
+    """Формирует адрес видеопотока из настроек профиля."""
+    if settings['connection_mode'] == 'url':
+        url = str(settings['camera_url']).strip()
+        return url if url not in ('', '0') else '0'
+    return _rtsp_url(settings, settings['stream_path'])
+
+
+def get_substream_url(settings):
+    """Адрес подпотока для детекции или пустая строка, если подпоток не задан."""
+    if settings.get('connection_mode') == 'url':
+        return str(settings.get('substream_url') or '').strip()
+    stream_path = str(settings.get('substream_path') or '').strip()
+    return _rtsp_url(settings, stream_path) if stream_path else ''
+
+
+def is_live_source(url):
+    """True для камер и сетевых потоков, False для видеофайлов."""
+    return url.isdigit() or '://' in url
+
+
+def source_fps(cap, fallback=FALLBACK_FPS):
+    """Частота кадров источника по CAP_PROP_FPS с защитой от нулевых и нелепых значений (тогда fallback)."""
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    return fps if 0 < fps <= 1000 else fallback
+
+
+def backend_available(backend):
+    """Есть ли бэкенд в сборке OpenCV (GStreamer в pip-колесах обычно отсутствует)."""
+    if backend == CAPTURE_BACKEND_GSTREAMER:
+        return cv2.videoio_registry.hasBackend(cv2.CAP_GSTREAMER)
+    if backend == CAPTURE_BACKEND_FFMPEG:
+        return cv2.videoio_registry.hasBackend(cv2.CAP_FFMPEG)
+    return True
+
+
+def gstreamer_pipeline(url, transport='', options=''):
+    """Конвейер GStreamer для адреса; options с «!» считается готовым конвейером с подстановкой {url}."""
+    if '!' in options:
+        return options.replace('{url}', url)
+    if url.startswith(('rtsp://', 'rtsps://')):
+        protocols = f" protocols={transport}" if transport else ""
+        source = f'rtspsrc location="{url}" latency={GSTREAMER_LATENCY_MS}{protocols}{" " + options if options else ""}'
+    elif '://' in url:
+        source = f'uridecodebin uri="{url}"'
+    else:
+        source = f'filesrc location="{url}"'
+    return GSTREAMER_PIPELINE.format(source=source)
+
+
+def ffmpeg_options(transport='', options=''):
+    """Строка OPENCV_FFMPEG_CAPTURE_OPTIONS: «ключ;значение|ключ;значение»."""
+    parts = []
+    if transport:
+        parts.append(f"rtsp_transport;{transport}")
+    if options:
+        parts.append(options.strip().strip('|'))
+    return '|'.join(parts)
+
+
+def _open_ffmpeg(url, api, params, options):
+    if not options:
+        return cv2.VideoCapture(url, api, params)
+    with _ffmpeg_options_lock:
+        previous = os.environ.get(FFMPEG_OPTIONS_ENV)
+        os.environ[FFMPEG_OPTIONS_ENV] = options
+        try:
+            return cv2.VideoCapture(url, api, params)
+        finally:
+            if previous is None:
+                del os.environ[FFMPEG_OPTIONS_ENV]
+            else:
+                os.environ[FFMPEG_OPTIONS_ENV] = previous
+
+
+def open_capture(url, settings=None):
+    """Открывает cv2.VideoCapture с бэкендом и транспортом из профиля.
+
+    Числовой адрес трактуется как индекс веб-камеры. Если выбранного
+    бэкенда нет в сборке OpenCV, используется выбор OpenCV по умолчанию.
+    """
+    settings = settings or {}
+    backend = settings.get('capture_backend') or DEFAULT_CAPTURE_BACKEND
+    transport = settings.get('rtsp_transport') or ''
+    options = str(settings.get('capture_options') or '').strip()
+    if not backend_available(backend):
+        backend = CAPTURE_BACKEND_AUTO
+
+    if url.isdigit():
+        cap = cv2.VideoCapture(int(url))
+    elif backend == CAPTURE_BACKEND_GSTREAMER:
+        cap = cv2.VideoCapture(gstreamer_pipeline(url, transport, options), cv2.CAP_GSTREAMER)
+    elif '://' in url:
+        api = cv2.CAP_FFMPEG if backend == CAPTURE_BACKEND_FFMPEG else cv2.CAP_ANY
+        cap = _open_ffmpeg(url, api, [
+            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, OPEN_TIMEOUT_MS,
+            cv2.CAP_PROP_READ_TIMEOUT_MSEC, READ_TIMEOUT_MS,
+        ], ffmpeg_options(transport, options))
+    elif backend == CAPTURE_BACKEND_FFMPEG:
+        cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG)
+    else:
+        cap = cv2.VideoCapture(url)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+def probe_frame_size(url, settings=None):
+    """Разрешение источника (ширина, высота) или None, если его не удалось узнать."""
+    cap = open_capture(url, settings)
+    try:
+        if not cap.isOpened():
+            return None
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width > 0 and height > 0:
+            return width, height
+        ret, frame = cap.read()
+        return (frame.shape[1], frame.shape[0]) if ret and frame is not None else None
+    finally:
+        cap.release()
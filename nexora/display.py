@@ -0,0 +1,79 @@
+"""Отображение кадров камер в Tk без пересоздания изображений на каждый кадр.
+
+Модуль нужен только графическому интерфейсу: он импортирует PIL.ImageTk,
+поэтому ядро и headless-режим его не подключают.
+"""
+import threading
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+DEFAULT_DISPLAY_FPS = 15
+OVERLAY_FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+class TileRenderer:
+    """Буферы одной плитки: кадр готовится в потоке отображения, а в Tk лишь копируется.
+
+    render() вызывается из потока отображения камеры: масштабирует кадр
+    cv2.resize(INTER_AREA) в переиспользуемый буфер, рисует надпись статуса
+    и переводит его в RGB. flush() вызывается из потока Tk и обновляет
+    постоянный PhotoImage на месте через paste(). Пока Tk не забрал кадр,
+    следующий просто перезаписывает буфер — очередь обновлений не копится.
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.size = (1, 1)  # Размер плитки; обновляется из потока Tk
+        self._lock = threading.Lock()
+        self._resized = None
+        self._rgb = None
+        self._dirty = False
+        self._photo = None
+
+    def render(self, frame, motion_detected):
+        width, height = self.size
+        frame_h, frame_w = frame.shape[:2]
+        # Как и прежний thumbnail(): только уменьшаем, с сохранением пропорций
+        scale = min(width / frame_w, height / frame_h, 1.0)
+        target = (max(1, int(frame_w * scale)), max(1, int(frame_h * scale)))
+
+        if self._resized is None or self._resized.shape[1::-1] != target:
+            self._resized = np.empty((target[1], target[0], 3), dtype=np.uint8)
+        if target == (frame_w, frame_h):
+            np.copyto(self._resized, frame)
+        else:
+            cv2.resize(frame, target, dst=self._resized, interpolation=cv2.INTER_AREA)
+
+        self._draw_status(self._resized, motion_detected)
+
+        with self._lock:
+            if self._rgb is None or self._rgb.shape != self._resized.shape:
+                self._rgb = np.empty_like(self._resized)
+            cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGB, dst=self._rgb)
+            self._dirty = True
+
+    def _draw_status(self, image, motion_detected):
+        status_text = "DETECTION" if motion_detected else "Green"
+        color = (0, 0, 255) if motion_detected else (0, 255, 0)
+        font_scale = max(0.4, image.shape[1] / 640)
+        thickness = max(1, int(font_scale * 2))
+        (text_w, text_h), baseline = cv2.getTextSize(status_text, OVERLAY_FONT, font_scale, thickness)
+        cv2.rectangle(image, (8, 8), (12 + text_w, 12 + text_h + baseline), (0, 0, 0), thickness=-1)
+        cv2.putText(image, status_text, (10, 10 + text_h), OVERLAY_FONT, font_scale, color, thickness, cv2.LINE_AA)
+
+    def flush(self):
+        """Переносит готовый кадр в PhotoImage; вызывать только из потока Tk."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            height, width = self._rgb.shape[:2]
+            image = Image.frombuffer('RGB', (width, height), self._rgb, 'raw', 'RGB', 0, 1)
+            if self._photo is None or (self._photo.width(), self._photo.height()) != (width, height):
+                self._photo = ImageTk.PhotoImage(image=image)
+                self.label.config(image=self._photo)
+                self.label.image = self._photo
+            else:
+                self._photo.paste(image)
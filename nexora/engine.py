@@ -0,0 +1,1172 @@
+"""Движок захвата и детекции движения: несколько камер одновременно."""
+import math
+import multiprocessing
+import os
+import threading
+import time
+from types import MappingProxyType
+
+import cv2
+import numpy as np
+
+from nexora.alerts import AlertBus, QueueSink, motion_event
+from nexora.background import DEFAULT_BACKGROUND_MODEL, DEFAULT_LEARNING_RATE, create_background_model
+from nexora.capture import (  # noqa: F401 — get_camera_url и open_capture исторически импортируются из engine
+    CONNECTION_KEYS, backend_available, get_camera_url, get_substream_url, is_live_source, open_capture,
+    probe_frame_size, source_fps
+)
+from nexora.events import MotionEventTracker
+from nexora.framebuffer import FrameRing
+from nexora.heatmap import MotionHeatmap, heatmap_path
+from nexora.metrics import StageHistogram
+from nexora.recorder import DEFAULT_POST_ROLL, DEFAULT_PRE_ROLL, ClipWriter, PreRollBuffer, encode_frame
+from nexora.thumbnails import KEYFRAME_INTERVAL, event_key, make_keyframe
+from nexora.zones import ZONE_KEYS, compile_zone_mask, zone_bounds
+
+MOTION_DEFAULT_SENSITIVITY = 500
+DEFAULT_ANALYSIS_WIDTH = 640  # Ширина кадра для анализа движения; 0 — исходное разрешение
+BLUR_KERNEL_SIZE = 21  # Ядро размытия для исходного разрешения
+DILATE_ITERATIONS = 2  # Проходов расширения маски движения ядром 3×3
+PRECHECK_CELL = 16  # Сторона клетки сетки предпроверки в пикселях кадра анализа
+DEFAULT_PRECHECK_THRESHOLD = 0.0  # Изменившихся пикселей клетки, %, до которого клетка считается спокойной
+STATS_INTERVAL = 1.0  # Период пересчёта FPS и загрузки CPU, секунды
+DEFAULT_DETECTION_FPS = 0.0  # Целевая частота детекции; 0 — каждый свежий кадр
+DEFAULT_IDLE_DETECTION_FPS = 3.0  # Частота детекции, пока в кадре ничего не движется; 0 — всегда полная
+IDLE_DELAY = 2.0  # Столько секунд без движения до перехода на частоту покоя
+COST_SMOOTHING = 0.05  # Вес нового замера в скользящей оценке стоимости кадра
+RECONNECT_INITIAL_DELAY = 1.0  # Первая пауза перед переподключением, секунды
+RECONNECT_MAX_DELAY = 30.0  # Предел экспоненциального роста паузы
+RECONNECT_BACKOFF = 2.0
+STABLE_CONNECTION = 10.0  # Соединение короче этого не сбрасывает растущую паузу
+WARM_OUTAGE_LIMIT = 60.0  # После обрыва дольше этого модель фона обучается заново
+# Ключи профиля, изменение которых применяется только перезапуском камеры: подключение и набор стадий
+RESTART_KEYS = CONNECTION_KEYS + ('record_clips',)
+
+
+def reduce_cells(image, ufunc, dtype=None):
+    """Свертка изображения ufunc по клеткам PRECHECK_CELL×PRECHECK_CELL (крайние клетки могут быть меньше).
+
+    Два векторных прохода NumPy по блокам строк: второй — по уже уменьшенному
+    и транспонированному массиву. Сумма пороговых значений клетки (до 256·255)
+    помещается в uint16.
+    """
+    cell = PRECHECK_CELL
+    for _ in range(2):
+        height, width = image.shape
+        full = height // cell * cell
+        rows = ufunc.reduce(image[:full].reshape(-1, cell, width), axis=1, dtype=dtype)
+        if full < height:
+            rows = np.concatenate([rows, ufunc.reduce(image[full:], axis=0, dtype=dtype, keepdims=True)])
+        image = np.ascontiguousarray(rows.T)
+    return image
+
+
+class ReconnectBackoff:
+    """Растущая пауза между попытками подключения к одному источнику."""
+
+    def __init__(self, stop_event):
+        self.delay = RECONNECT_INITIAL_DELAY
+        self.connected_at = 0.0
+        self._stop_event = stop_event
+
+    def wait(self):
+        """Ждет текущую паузу (прерывается остановкой камеры) и удваивает следующую."""
+        self._stop_event.wait(self.delay)
+        self.delay = min(self.delay * RECONNECT_BACKOFF, RECONNECT_MAX_DELAY)
+
+    def reset(self):
+        self.delay = RECONNECT_INITIAL_DELAY
+
+
+def pace(deadline, interval):
+    """Спит до следующего срока deadline + interval и возвращает его.
+
+    При отставании срок сдвигается на текущий момент — пропущенные интервалы
+    не наверстываются серией кадров без пауз.
+    """
+    now = time.perf_counter()
+    deadline = max(deadline + interval, now)
+    if deadline > now:
+        time.sleep(deadline - now)
+    return deadline
+
+
+class CompiledProfile:
+    """Неизменяемый снимок профиля камеры, из которого читает работающий поток.
+
+    Словарь профиля копируется и закрывается от записи (settings), адреса
+    источника и числовые параметры вычисляются один раз, а маски зон для
+    известного разрешения кадра собираются заранее (geometry). Настройки
+    работающей камеры меняются подменой снимка целиком — одним присваиванием
+    ссылки, поэтому поток детекции не видит смеси старых и новых значений.
+    """
+
+    def __init__(self, settings, frame_shape=None, reference_size=None):
+        settings = {key: [list(zone) for zone in value] if key in ZONE_KEYS and value else value
+                    for key, value in settings.items()}
+        for key in ZONE_KEYS:
+            settings.setdefault(key, [])
+        self.settings = MappingProxyType(settings)
+        connected = 'connection_mode' in settings
+        self.url = get_camera_url(settings) if connected else ''
+        self.substream_url = get_substream_url(settings) if connected else ''
+        self.motion_sensitivity = settings['motion_sensitivity']
+        self.analysis_width = int(settings.get('analysis_width', DEFAULT_ANALYSIS_WIDTH) or 0)
+        self.background_model = settings.get('background_model', DEFAULT_BACKGROUND_MODEL)
+        self.learning_rate = settings.get('learning_rate', DEFAULT_LEARNING_RATE)
+        self.precheck_threshold = float(settings.get('precheck_threshold', DEFAULT_PRECHECK_THRESHOLD) or 0)
+        self.detection_fps = float(settings.get('detection_fps', DEFAULT_DETECTION_FPS) or 0)
+        self.detect_interval = 1.0 / self.detection_fps if self.detection_fps > 0 else 0.0
+        idle_fps = float(settings.get('idle_detection_fps', DEFAULT_IDLE_DETECTION_FPS) or 0)
+        # Частота покоя имеет смысл, только если она ниже полной
+        self.idle_interval = 1.0 / idle_fps if idle_fps > 0 and not 0 < self.detection_fps <= idle_fps else 0.0
+        self.pre_roll = float(settings.get('pre_roll', DEFAULT_PRE_ROLL))
+        self.post_roll = float(settings.get('post_roll', DEFAULT_POST_ROLL))
+        self.geometry = DetectionGeometry(self, frame_shape, reference_size) if frame_shape else None
+
+    def restart_needed(self, other):
+        """True, если переход от снимка other к этому требует перезапуска камеры (RESTART_KEYS)."""
+        return any(self.settings.get(key) != other.settings.get(key) for key in RESTART_KEYS)
+
+
+class DetectionGeometry:
+    """Размеры и маски детекции для снимка профиля и разрешения кадра; не меняется после создания.
+
+    Зоны компилируются в битовую маску кадра анализа и обрезаются до их
+    общей рамки roi; для рамки готовится сетка клеток предпроверки.
+    """
+
+    def __init__(self, profile, frame_shape, reference_size=None):
+        self.profile = profile
+        self.frame_shape = frame_shape
+        self.reference_size = reference_size  # (ширина, высота) кадра, в котором заданы зоны; None — сам кадр
+        height, width = frame_shape[:2]
+        if 0 < profile.analysis_width < width:
+            self.analysis_size = (profile.analysis_width, max(1, round(height * profile.analysis_width / width)))
+            analysis_width, analysis_height = self.analysis_size
+        else:
+            self.analysis_size = None
+            analysis_width, analysis_height = width, height
+        self.full_size = (analysis_width, analysis_height)  # (ширина, высота) всего кадра анализа
+        reference_width, reference_height = reference_size or (width, height)
+        # Масштабы по осям от координат зон к кадру анализа
+        self.zone_scale = (analysis_width / reference_width, analysis_height / reference_height)
+        self.scale = self.zone_scale[0]  # Масштаб анализа относительно исходного кадра
+        self.min_area = profile.motion_sensitivity * self.zone_scale[0] * self.zone_scale[1]
+        # Ядро размытия уменьшается вместе с кадром (нечетное, не меньше 3)
+        kernel = max(3, int(BLUR_KERNEL_SIZE * self.scale) | 1)
+        self.blur_size = (kernel, kernel)
+
+        mask = compile_zone_mask(self.full_size, self.zone_scale, profile.settings)
+        # Запас на ядро размытия и расширение: движение у края рамки дает те же контуры, что и на всем кадре
+        self.roi = None if mask is None else zone_bounds(mask, kernel // 2 + DILATE_ITERATIONS)
+        self.source_roi = None  # Срез исходного кадра, соответствующий roi
+        self.crop_size = None  # Размер уменьшенного среза; None — срез не масштабируется
+        if self.roi is not None:
+            x1, y1, x2, y2 = self.roi
+            mask = mask[y1:y2, x1:x2].copy()
+            if self.analysis_size is not None:
+                self.source_roi = (x1 * width // analysis_width, y1 * height // analysis_height,
+                                   -(-x2 * width // analysis_width), -(-y2 * height // analysis_height))
+                self.crop_size = (x2 - x1, y2 - y1)
+            else:
+                self.source_roi = self.roi
+        self.zone_mask = mask  # Маска зон в границах roi или None
+
+        # Сетка предпроверки для порогового изображения размера маски зон (или кадра анализа)
+        mask_height, mask_width = mask.shape if mask is not None else self.full_size[::-1]
+        rows = np.append(np.arange(0, mask_height, PRECHECK_CELL), mask_height)
+        cols = np.append(np.arange(0, mask_width, PRECHECK_CELL), mask_width)
+        self.cell_edges = (rows, cols)  # Границы клеток по строкам и столбцам порогового изображения
+        areas = np.diff(rows)[:, None] * np.diff(cols)
+        # Сумма пороговых значений клетки, выше которой клетка изменилась
+        self.cell_limits = areas * (255.0 * profile.precheck_threshold / 100.0)
+        self.cell_zones = None  # Клетки, из которых движение достает до зон; None — все
+        if mask is not None:
+            # Пиксель вне расширенных зон не дотянется до них и после расширения маски движения
+            reach = cv2.dilate(mask, None, iterations=DILATE_ITERATIONS)
+            self.cell_zones = reduce_cells(reach, np.maximum) > 0
+
+    def matches(self, frame_shape, reference_size):
+        return self.frame_shape == frame_shape and self.reference_size == reference_size
+
+
+class MotionDetector:
+    """Детектор движения по модели фона профиля с учётом зон.
+
+    Анализ идет на уменьшенной до analysis_width копии кадра в оттенках серого;
+    порог площади пересчитывается в координаты исходного кадра, поэтому
+    motion_sensitivity и зоны профиля сохраняют прежний смысл. Зоны один раз
+    компилируются в битовую маску кадра анализа и накладываются на пороговое
+    изображение до поиска контуров.
+
+    Если зоны оставляют для анализа только часть кадра, весь конвейер
+    (серый, уменьшение, размытие, модель фона, контуры) идет по срезу
+    исходного кадра в общей рамке зон — без копирования, — а рамки движения
+    переводятся обратно в координаты кадра.
+
+    Перед расширением маски и поиском контуров пороговое изображение
+    проверяется по грубой сетке клеток (changed_cells): на тихом кадре
+    дорогие стадии не выполняются вовсе, а на кадре с движением идут только
+    по рамке изменившихся клеток.
+
+    Параметры берутся из снимка CompiledProfile. apply() подменяет снимок
+    из любого потока; детекция переходит на него со следующего кадра: to_gray()
+    выбирает геометрию кадра (geometry), и все стадии этого кадра читают
+    только ее. Модель фона обучается заново лишь при смене модели или рамки
+    анализа.
+    """
+
+    def __init__(self, settings):
+        self.profile = settings if isinstance(settings, CompiledProfile) else CompiledProfile(settings)
+        self.background_kind = self.profile.background_model
+        self.background = create_background_model(self.background_kind, self.profile.learning_rate)
+        self.reference_size = None  # (ширина, высота) кадра, в котором заданы зоны; None — сам кадр
+        self.heatmap = None  # MotionHeatmap, копящая пороговую маску до наложения зон
+        self.geometry = None  # DetectionGeometry текущего кадра; меняется только потоком детекции
+        self.mask_origin = (0, 0)  # Сдвиг последней маски motion_mask() внутри порогового изображения
+
+    @property
+    def roi(self):
+        """Анализируемая часть кадра анализа (x1, y1, x2, y2); None — весь кадр."""
+        return self.geometry.roi if self.geometry is not None else None
+
+    def reset(self):
+        """Начинает обучение модели фона заново (например, после долгого обрыва потока)."""
+        self.background = create_background_model(self.background_kind, self.profile.learning_rate)
+
+    def set_reference_size(self, size):
+        """Задает разрешение, в координатах которого заданы зоны и чувствительность.
+
+        Нужно, когда детекция идет по подпотоку, а зоны нарисованы на кадре
+        основного потока. Геометрия пересчитается на следующем кадре.
+        """
+        self.reference_size = size
+
+    def compile(self, settings):
+        """Снимок профиля с масками, заранее собранными для разрешения текущего кадра."""
+        geometry = self.geometry
+        if geometry is None:
+            return CompiledProfile(settings)
+        return CompiledProfile(settings, geometry.frame_shape, geometry.reference_size)
+
+    def apply(self, profile):
+        """Подменяет снимок профиля (CompiledProfile или словарь); безопасно вызывать из другого потока."""
+        self.profile = profile if isinstance(profile, CompiledProfile) else self.compile(profile)
+
+    def set_zones(self, settings):
+        """Задает новые зоны; остальные параметры профиля не меняются."""
+        self.apply(dict(self.profile.settings, **{key: settings.get(key) or [] for key in ZONE_KEYS}))
+
+    def _activate(self, frame_shape):
+        """Геометрия для кадра: заранее собранная снимком, прежняя или новая."""
+        profile = self.profile
+        current = self.geometry
+        if current is not None and current.profile is profile and current.matches(frame_shape, self.reference_size):
+            return current
+        geometry = profile.geometry
+        if geometry is None or not geometry.matches(frame_shape, self.reference_size):
+            geometry = DetectionGeometry(profile, frame_shape, self.reference_size)
+        if profile.background_model != self.background_kind:
+            self.background_kind = profile.background_model
+            self.reset()
+        else:
+            if hasattr(self.background, 'learning_rate'):
+                self.background.learning_rate = profile.learning_rate
+            if current is not None and geometry.roi != current.roi:
+                self.reset()  # Модель фона обучена на другой части кадра
+        self.geometry = geometry
+        return geometry
+
+    def to_gray(self, frame):
+        """Кадр (или его часть roi) в оттенках серого в разрешении анализа.
+
+        Выбирает геометрию кадра по текущему снимку профиля.
+        """
+        geometry = self._activate(frame.shape)
+        if geometry.source_roi is not None:
+            x1, y1, x2, y2 = geometry.source_roi
+            frame = frame[y1:y2, x1:x2]
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if geometry.crop_size is not None:
+            gray = cv2.resize(gray, geometry.crop_size, interpolation=cv2.INTER_AREA)
+        elif geometry.analysis_size is not None:
+            gray = cv2.resize(gray, geometry.analysis_size, interpolation=cv2.INTER_AREA)
+        return gray
+
+    def blur(self, gray):
+        return cv2.GaussianBlur(gray, self.geometry.blur_size, 0)
+
+    def prepare(self, frame):
+        """Размытый кадр в оттенках серого в разрешении анализа."""
+        return self.blur(self.to_gray(frame))
+
+    def changed_cells(self, thresh):
+        """Сетка изменившихся клеток (bool, строки × столбцы) или None на тихом кадре.
+
+        Клетка PRECHECK_CELL×PRECHECK_CELL изменилась, если в ней больше
+        precheck_threshold процентов пикселей выше порога; клетки, из которых
+        движение не достает до зон, не учитываются. Кадр без единого
+        изменившегося пикселя отсекается одним cv2.countNonZero.
+        """
+        if not cv2.countNonZero(thresh):
+            return None
+        geometry = self.geometry
+        if geometry.profile.precheck_threshold > 0:
+            cells = reduce_cells(thresh, np.add, np.uint16) > geometry.cell_limits
+        else:
+            cells = reduce_cells(thresh, np.maximum) > 0  # Хватает одного изменившегося пикселя
+        if geometry.cell_zones is not None:
+            cells &= geometry.cell_zones
+        return cells if cells.any() else None
+
+    def motion_mask(self, thresh, cells=None):
+        """Расширяет пороговое изображение и оставляет только зоны детекции.
+
+        С сеткой cells из changed_cells() обрабатывается только рамка
+        изменившихся клеток (с запасом на расширение), а при ненулевом
+        precheck_threshold пиксели спокойных клеток отбрасываются до
+        расширения. Сдвиг возвращенной маски — в mask_origin.
+        """
+        geometry = self.geometry
+        zone_mask = geometry.zone_mask
+        if cells is None:
+            self.mask_origin = (0, 0)
+            thresh = cv2.dilate(thresh, None, iterations=DILATE_ITERATIONS)
+            if zone_mask is not None:
+                cv2.bitwise_and(thresh, zone_mask, dst=thresh)
+            return thresh
+        rows, cols = geometry.cell_edges
+        changed_rows, changed_cols = np.flatnonzero(cells.any(axis=1)), np.flatnonzero(cells.any(axis=0))
+        row1, row2 = changed_rows[0], changed_rows[-1] + 1
+        col1, col2 = changed_cols[0], changed_cols[-1] + 1
+        y1, y2, x1, x2 = rows[row1], rows[row2], cols[col1], cols[col2]
+        region = thresh[y1:y2, x1:x2]
+        if geometry.profile.precheck_threshold > 0:
+            keep = np.repeat(np.repeat(cells[row1:row2, col1:col2], np.diff(rows[row1:row2 + 1]), axis=0),
+                             np.diff(cols[col1:col2 + 1]), axis=1)
+            region = np.where(keep, region, np.uint8(0))
+        # Запас на расширение — только внутри кадра, как и при расширении всего изображения
+        height, width = thresh.shape
+        top, left = min(DILATE_ITERATIONS, y1), min(DILATE_ITERATIONS, x1)
+        bottom, right = min(DILATE_ITERATIONS, height - y2), min(DILATE_ITERATIONS, width - x2)
+        region = cv2.copyMakeBorder(region, top, bottom, left, right, cv2.BORDER_CONSTANT, value=0)
+        mask = cv2.dilate(region, None, iterations=DILATE_ITERATIONS)
+        y1, x1 = y1 - top, x1 - left
+        if zone_mask is not None:
+            cv2.bitwise_and(mask, zone_mask[y1:y2 + bottom, x1:x2 + right], dst=mask)
+        self.mask_origin = (int(x1), int(y1))
+        return mask
+
+    def has_motion(self, mask):
+        """Есть ли на маске движения контур площадью не меньше порога."""
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        min_area = self.geometry.min_area
+        for contour in contours:
+            if cv2.contourArea(contour) >= min_area:
+                return True
+        return False
+
+    def motion_regions(self, mask):
+        """Наибольшая площадь и общая рамка (x1, y1, x2, y2) контуров не меньше порога.
+
+        Значения в координатах зон (исходного кадра); без движения — (0.0, None).
+        """
+        geometry = self.geometry
+        offset_x, offset_y = geometry.roi[:2] if geometry.roi else (0, 0)
+        offset_x, offset_y = offset_x + self.mask_origin[0], offset_y + self.mask_origin[1]
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+                                       offset=(offset_x, offset_y))
+
+        scale_x, scale_y = geometry.zone_scale
+        min_area = geometry.min_area
+        peak_area = 0.0
+        bbox = None
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            if area < min_area:
+                continue
+            peak_area = max(peak_area, area)
+            x, y, w, h = cv2.boundingRect(contour)
+            bbox = (x, y, x + w, y + h) if bbox is None else (
+                min(bbox[0], x), min(bbox[1], y), max(bbox[2], x + w), max(bbox[3], y + h))
+        if bbox is None:
+            return 0.0, None
+        return peak_area / (scale_x * scale_y), (int(bbox[0] / scale_x), int(bbox[1] / scale_y),
+                                                 math.ceil(bbox[2] / scale_x), math.ceil(bbox[3] / scale_y))
+
+    def detect(self, frame):
+        """Возвращает True, если в зонах детекции есть движение площадью не меньше порога."""
+        thresh = self.background.apply(self.prepare(frame))
+        if thresh is None:
+            return False
+        cells = self.changed_cells(thresh)
+        if cells is None:
+            return False
+        return self.has_motion(self.motion_mask(thresh, cells))
+
+    def measure(self, frame):
+        """Как detect(), но возвращает наибольшую площадь и рамку движения (см. motion_regions)."""
+        thresh = self.background.apply(self.prepare(frame))
+        if thresh is None:
+            return 0.0, None
+        if self.heatmap is not None:
+            geometry = self.geometry
+            self.heatmap.add(thresh, shape=geometry.full_size[::-1],
+                             origin=geometry.roi[:2] if geometry.roi else (0, 0))
+        cells = self.changed_cells(thresh)
+        if cells is None:
+            return 0.0, None
+        return self.motion_regions(self.motion_mask(thresh, cells))
+
+
+class DetectionScheduler:
+    """Общий для всех камер ограничитель числа одновременно выполняемых детекций.
+
+    Потоки камер занимают слот на время анализа кадра, поэтому при 16+ потоках
+    детекция не выполняется параллельно на большем числе ядер, чем задано.
+    В режиме процессов слоты — общий семафор multiprocessing (process_slots()),
+    который каждый процесс камеры получает при запуске.
+    """
+
+    def __init__(self, max_concurrent=None, slots=None):
+        self.max_concurrent = max(1, max_concurrent or os.cpu_count() or 1)
+        self._slots = slots if slots is not None else threading.BoundedSemaphore(self.max_concurrent)
+        self._process_slots = None
+
+    def process_slots(self):
+        """Семафор слотов для процессов камер (создается при первом вызове, один на планировщик)."""
+        if self._process_slots is None:
+            self._process_slots = multiprocessing.get_context('spawn').BoundedSemaphore(self.max_concurrent)
+        return self._process_slots
+
+    def __enter__(self):
+        self._slots.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._slots.release()
+        return False
+
+
+class CameraWorker:
+    """Камера профиля: поток захвата и независимые потоки детекции и отображения.
+
+    Поток захвата непрерывно вычитывает cv2.VideoCapture в кольцевой буфер
+    FrameRing, а детекция и отображение берут из него самый свежий кадр.
+    Медленная стадия не тормозит декодирование, а лишь пропускает кадры —
+    их число видно в счетчиках ``*_dropped``.
+
+    Если в профиле задан подпоток, детекция читает его из отдельного буфера
+    detect_ring (свой поток захвата), а основной поток идет только на экран
+    и в запись; без экрана и записи основной поток не открывается вовсе.
+    Зоны и чувствительность остаются в координатах основного потока.
+
+    Пока в кадре ничего не движется (IDLE_DELAY секунд подряд), детекция
+    анализирует кадры с частотой покоя idle_detection_fps и возвращается
+    к полной частоте на первом же кадре с движением. Если декодированные
+    кадры нужны только детекции, захват в покое пропускает лишние кадры
+    через cap.grab() без retrieve(). Оценка сэкономленного CPU — в stats().
+
+    Кадры с движением трекер MotionEventTracker сводит в события с подавлением
+    дребезга; о начале (тип motion) и конце (motion_end) события детекция
+    сообщает в шину оповещений alert_bus — без ожидания приемников; без шины
+    начало события уходит в message_queue как ("motion", имя).
+    """
+
+    def __init__(self, name, settings, scheduler, message_queue, on_frame=None, clip_writer=None,
+                 display_fps=0, alert_bus=None, thumbnails=None, heatmaps_dir=None):
+        self.name = name
+        self.profile = CompiledProfile(settings)  # Снимок профиля; подменяется целиком в apply_settings()
+        self.scheduler = scheduler
+        self.message_queue = message_queue
+        self.alert_bus = alert_bus if alert_bus is not None else AlertBus([QueueSink(message_queue, cooldown=0)])
+        self.on_frame = on_frame
+        self.thumbnails = thumbnails  # ThumbnailCache для ключевых кадров событий или None
+        self.display_fps = display_fps
+        self.idle = False  # Детекция на частоте покоя: в кадре давно ничего не движется
+        self.cpu_saved = 0.0  # Оценка CPU, сэкономленного частотой покоя, % одного ядра
+        self.clip_writer = clip_writer if self.settings.get('record_clips') else None
+        # Кадры основного потока нужны экрану или записи
+        self.publish_frames = on_frame is not None or self.clip_writer is not None
+        self.recording = False
+        self.clip_span = ('', 0.0, None)  # Последний клип: (файл, начало, конец или None, пока пишется)
+        self.clip_until = 0.0  # Запись по внешнему триггеру продолжается до этого времени (time.time())
+        self.is_running = False
+        self.status = "остановлена"
+        self.motion_detected = False
+        # Подпоток детекции оборван: детекция ждет его, а основной поток, экран и запись работают
+        self.substream_down = False
+        self.fps = 0.0
+        self.source_fps = 0.0  # Частота основного потока по данным источника (CAP_PROP_FPS); 0 — неизвестна
+        self.detect_fps = 0.0
+        self.cpu = 0.0
+        self.stage_cpu = {}  # {стадия: загрузка CPU её потоком, %}
+        self.ring = FrameRing()
+        self.detect_ring = self.ring  # Отдельный буфер, если детекция идет по подпотоку
+        self.detector = self._create_detector(heatmaps_dir)
+        self.counters = {
+            'captured': 0, 'detected': 0, 'displayed': 0, 'recorded': 0, 'sub_captured': 0,
+            'detect_dropped': 0, 'display_dropped': 0, 'record_dropped': 0, 'reconnects': 0, 'events': 0,
+            'grabbed': 0, 'sub_grabbed': 0, 'idle_skipped': 0,  # Кадры без декодирования и без анализа в покое
+        }
+        # Задержки стадий: decode — cap.read(), subdecode — чтение подпотока,
+        # остальные — обработка кадра потоком стадии
+        stages = ('decode', 'subdecode', 'detect', 'display', 'record')
+        self.histograms = {stage: StageHistogram() for stage in stages}
+        self.outage = {'count': 0, 'total': 0.0, 'last': 0.0, 'started': None}  # Обрывы потока, секунды
+        self._stop_event = threading.Event()
+        self._stage_cpu = {}  # {стадия: накопленное процессорное время её потока}
+        self._frame_cost = {}  # {стадия: скользящая оценка процессорного времени на кадр, с}
+        self._thread = None
+
+    def _create_detector(self, heatmaps_dir):
+        detector = MotionDetector(self.profile)
+        if heatmaps_dir:
+            detector.heatmap = MotionHeatmap(heatmap_path(heatmaps_dir, self.name))
+        return detector
+
+    @property
+    def settings(self):
+        """Словарь текущего профиля камеры (только для чтения)."""
+        return self.profile.settings
+
+    @property
+    def detection_fps(self):
+        return self.profile.detection_fps
+
+    @property
+    def idle_interval(self):
+        """Пауза между кадрами анализа в покое; 0 — частота покоя не используется."""
+        return self.profile.idle_interval
+
+    def start(self):
+        self.is_running = True
+        self.status = "запуск"
+        self._thread = threading.Thread(target=self._capture_loop, name=f"capture-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.is_running = False
+        self._stop_event.set()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def get_last_frame(self):
+        """Копия последнего захваченного кадра или None."""
+        return self.ring.snapshot()
+
+    def apply_settings(self, settings):
+        """Подменяет снимок профиля работающей камеры без переподключения.
+
+        Чувствительность, зоны, модель фона, частоты детекции, параметры
+        событий и предзаписи вступают в силу со следующего кадра: маски зон
+        собираются здесь, в вызывающем потоке. Возвращает False и ничего не
+        меняет, если изменились ключи RESTART_KEYS — их применяет только
+        перезапуск камеры (CameraManager.apply_profile).
+        """
+        profile = self.detector.compile(settings)
+        if profile.restart_needed(self.profile):
+            return False
+        self.profile = profile
+        self.detector.apply(profile)
+        return True
+
+    def update_zones(self, settings):
+        """Применяет отредактированные зоны к работающему детектору."""
+        self.apply_settings(dict(self.settings, **{key: settings.get(key) or [] for key in ZONE_KEYS}))
+
+    def heatmap(self):
+        """Текущая тепловая карта активности или None."""
+        return self.detector.heatmap.snapshot() if self.detector.heatmap is not None else None
+
+    def trigger_clip(self, duration):
+        """Записывает клип в ближайшие duration секунд, как при движении."""
+        self.clip_until = max(self.clip_until, time.time() + duration)
+
+    def stats(self):
+        """Снимок текущего состояния потока для интерфейса."""
+        return {
+            'status': self.status,
+            'substream_down': self.substream_down,
+            'fps': self.fps,
+            'detect_fps': self.detect_fps,
+            'cpu': self.cpu,
+            'stage_cpu': dict(self.stage_cpu),
+            'idle': self.idle,
+            'cpu_saved': self.cpu_saved,
+            'recording': self.recording,
+            'dropped': {
+                'detect': self.counters['detect_dropped'],
+                'display': self.counters['display_dropped'],
+                'record': self.counters['record_dropped'],
+            },
+            'reconnects': self.counters['reconnects'],
+            'outage': self.outage_stats(),
+            'latency': {stage: histogram.snapshot() for stage, histogram in self.histograms.items()
+                        if histogram.count},
+        }
+
+    def outage_stats(self):
+        """Обрывы потока: число, суммарная, последняя и текущая длительность в секундах."""
+        started = self.outage['started']
+        return {
+            'count': self.outage['count'],
+            'total': self.outage['total'],
+            'last': self.outage['last'],
+            'current': time.monotonic() - started if started is not None else 0.0,
+        }
+
+    def _log(self, msg_type, text):
+        self.message_queue.put((msg_type, f"[{self.name}] {text}"))
+
+    def _read(self, cap, ring, stage, decode=True):
+        """cap.read() в следующий слот ring; без decode кадр только пропускается (grab() без retrieve()).
+
+        Возвращает (ok, frame); у пропущенного кадра frame равен None.
+        """
+        if not cap.grab():
+            return False, None
+        if not decode:
+            return True, None
+        started = time.thread_time()
+        ret, frame = cap.retrieve(ring.next_slot())
+        self._observe_cost(stage, time.thread_time() - started)
+        return ret and frame is not None, frame
+
+    def _observe_cost(self, stage, seconds):
+        previous = self._frame_cost.get(stage)
+        self._frame_cost[stage] = seconds if previous is None else previous + (seconds - previous) * COST_SMOOTHING
+
+    def _estimate_cpu_saved(self, delta, elapsed):
+        """CPU, сэкономленный частотой покоя за интервал (по приращениям счетчиков), % одного ядра."""
+        skipped = delta['idle_skipped'] + delta['sub_grabbed' if self.detect_ring is not self.ring else 'grabbed']
+        if self.detection_fps > 0:
+            # На полной частоте детекция и так не анализировала бы больше detection_fps кадров в секунду
+            skipped = min(skipped, max(0.0, self.detection_fps * elapsed - delta['detected']))
+        saved = skipped * self._frame_cost.get('detect', 0.0)
+        saved += delta['grabbed'] * self._frame_cost.get('capture', 0.0)
+        saved += delta['sub_grabbed'] * self._frame_cost.get('subcapture', 0.0)
+        return 100.0 * saved / elapsed
+
+    def _open_with_backoff(self, url, live, backoff, source="камерой", primary=True):
+        """Открывает источник; живой источник переоткрывается с растущей паузой до успеха или остановки.
+
+        primary=False — подпоток детекции: его недоступность отмечается в substream_down,
+        статус камеры не меняется.
+        """
+        attempt = 0
+        while self.is_running:
+            cap = open_capture(url, self.settings)
+            if cap.isOpened():
+                backoff.connected_at = time.monotonic()
+                if not primary:
+                    self.substream_down = False
+                return cap
+            cap.release()
+            if not live:
+                return None
+            attempt += 1
+            if primary:
+                self.status = "переподключение"
+            else:
+                self.substream_down = True
+            self._log("log", f"Нет связи с {source}, повтор через {backoff.delay:.0f} с (попытка {attempt})")
+            backoff.wait()
+        return None
+
+    def _reconnect(self, url, backoff, primary=True):
+        """Переподключается после обрыва, учитывая длительность простоя основного потока.
+
+        Стадии детекции, отображения и записи продолжают ждать кадры в своих
+        потоках, а детектор сохраняет модель фона: после короткого обрыва
+        детекция продолжается без повторного обучения.
+
+        Обрыв подпотока (primary=False) не трогает статус камеры, движение
+        и запись по основному потоку: он отмечается только в substream_down.
+        """
+        stream = "видеопотока" if primary else "подпотока детекции"
+        started = time.monotonic()
+        if primary:
+            self.outage['started'] = started
+            self.fps = 0.0
+            self.status = "переподключение"
+            self.motion_detected = False
+            self.detect_fps = 0.0
+        else:
+            self.substream_down = True
+        if started - backoff.connected_at < STABLE_CONNECTION:
+            # Поток обрывается сразу после подключения — не переподключаемся в цикле без пауз
+            self._log("log", f"Потеря {stream}, переподключение через {backoff.delay:.0f} с...")
+            backoff.wait()
+        else:
+            backoff.reset()
+            self._log("log", f"Потеря {stream}, переподключение...")
+        cap = self._open_with_backoff(url, True, backoff, "камерой" if primary else "подпотоком", primary)
+        if primary:
+            self.outage['started'] = None
+        if cap is None:
+            return None
+
+        duration = time.monotonic() - started
+        if primary:
+            self.outage['count'] += 1
+            self.outage['total'] += duration
+            self.outage['last'] = duration
+        self.counters['reconnects'] += 1
+        if duration > WARM_OUTAGE_LIMIT:
+            self.detector.reset()
+        if primary:
+            self.status = "работает"
+        self._log("log", f"Связь {'' if primary else 'с подпотоком '}восстановлена через {duration:.1f} с")
+        return cap
+
+    def _capture_loop(self):
+        actual_url = self.profile.url
+        live = is_live_source(actual_url)
+        substream_url = self.profile.substream_url if live else ''
+        backend = self.settings.get('capture_backend')
+        cap = None
+        stages = []
+        try:
+            if backend and not backend_available(backend):
+                self._log("log", f"Бэкенд {backend} отсутствует в сборке OpenCV, используется бэкенд по умолчанию")
+            if substream_url and not self.publish_frames:
+                # Кадры основного потока нужны только экрану и записи: без них читаем один подпоток,
+                # а разрешение основного узнаем один раз — в его координатах заданы зоны
+                reference_size = probe_frame_size(actual_url, self.settings)
+                if reference_size is None:
+                    self._log("log", "Не удалось узнать разрешение основного потока: "
+                                     "зоны применяются в координатах подпотока")
+                self.detector.set_reference_size(reference_size)
+                actual_url, substream_url = substream_url, ''
+
+            backoff = ReconnectBackoff(self._stop_event)
+            cap = self._open_with_backoff(actual_url, live, backoff)
+            if cap is None:
+                if self.is_running:
+                    self.status = "ошибка подключения"
+                    self._log("error", "Не удалось подключиться к камере")
+                return
+
+            self._log("log", f"Подключено к: {actual_url}")
+            self.status = "работает"
+
+            if substream_url:
+                self.detect_ring = FrameRing()
+                stages.append(self._start_stage("subcapture", lambda: self._substream_loop(substream_url)))
+            stages.append(self._start_stage("detect", self._detect_loop))
+            if self.on_frame is not None:
+                stages.append(self._start_stage("display", self._display_loop))
+            if self.clip_writer is not None:
+                stages.append(self._start_stage("record", self._record_loop))
+
+            # Живой поток задает темп сам: read() блокируется до следующего кадра камеры,
+            # и декодер не копит очередь. Файл воспроизводим с его собственной частотой
+            self.source_fps = source_fps(cap, 0.0)
+            if live:
+                frame_interval = 0.0
+            else:
+                fps = source_fps(cap)
+                frame_interval = 1.0 / fps
+                self._log("log", f"Воспроизведение файла с частотой {fps:.1f} FPS")
+            deadline = time.perf_counter()
+            decode_histogram = self.histograms['decode']
+            # Без экрана и записи декодированный кадр нужен только детекции — в покое лишние пропускаем
+            skip_idle = not self.publish_frames and self.detect_ring is self.ring
+            next_decode = 0.0
+
+            stats_wall = time.perf_counter()
+            stats_counters = dict(self.counters)
+            stats_stage_cpu = {'capture': time.thread_time()}
+            frame_shape = None
+
+            while self.is_running:
+                if frame_interval:
+                    deadline = pace(deadline, frame_interval)
+
+                read_started = time.perf_counter()
+                decode = not (skip_idle and self.idle and read_started < next_decode)
+                ret, frame = self._read(cap, self.ring, 'capture', decode)
+                if not ret:
+                    if not live:
+                        self._log("log", "Видеофайл закончился")
+                        break
+                    cap.release()
+                    cap = self._reconnect(actual_url, backoff)
+                    if cap is None:
+                        break
+                    stats_wall = time.perf_counter()
+                    stats_counters = dict(self.counters)
+                    stats_stage_cpu = dict(self._stage_cpu)
+                    continue
+                if frame is None:
+                    self.counters['grabbed'] += 1
+                else:
+                    decode_histogram.observe(time.perf_counter() - read_started)
+                    self.ring.publish(frame)
+                    self.counters['captured'] += 1
+                    next_decode = read_started + self.idle_interval
+                    if substream_url and frame.shape != frame_shape:
+                        frame_shape = frame.shape
+                        self.detector.set_reference_size((frame_shape[1], frame_shape[0]))
+                self._stage_cpu['capture'] = time.thread_time()
+
+                now = time.perf_counter()
+                if now - stats_wall >= STATS_INTERVAL:
+                    elapsed = now - stats_wall
+                    stage_cpu = dict(self._stage_cpu)
+                    counters = dict(self.counters)
+                    delta = {key: value - stats_counters.get(key, 0) for key, value in counters.items()}
+                    self.fps = (delta['captured'] + delta['grabbed']) / elapsed
+                    self.detect_fps = delta['detected'] / elapsed
+                    self.stage_cpu = {stage: 100.0 * (cpu - stats_stage_cpu.get(stage, 0.0)) / elapsed
+                                      for stage, cpu in stage_cpu.items()}
+                    self.cpu = sum(self.stage_cpu.values())
+                    self.cpu_saved = self._estimate_cpu_saved(delta, elapsed)
+                    stats_stage_cpu = stage_cpu
+                    stats_wall = now
+                    stats_counters = counters
+
+        except Exception as e:
+            self.status = "ошибка"
+            self._log("error", f"Ошибка в видеопотоке:\n{str(e)}")
+        finally:
+            self.is_running = False
+            self.ring.close()
+            self.detect_ring.close()
+            for stage in stages:
+                stage.join()
+            if cap is not None:
+                cap.release()
+            self.fps = 0.0
+            self.detect_fps = 0.0
+            self.cpu = 0.0
+            self.cpu_saved = 0.0
+            self.idle = False
+            self.substream_down = False
+            self.stage_cpu = {}
+            if self.status in ("работает", "запуск"):
+                self.status = "остановлена"
+
+    def _start_stage(self, stage, target):
+        self._stage_cpu[stage] = 0.0
+        thread = threading.Thread(target=self._run_stage, args=(stage, target),
+                                  name=f"{stage}-{self.name}", daemon=True)
+        thread.start()
+        return thread
+
+    def _run_stage(self, stage, target):
+        try:
+            target()
+        except Exception as e:
+            self.status = "ошибка"
+            self._log("error", f"Ошибка на стадии {stage}:\n{str(e)}")
+            self.is_running = False
+
+    def _substream_loop(self, url):
+        """Читает подпоток детекции в detect_ring с собственным переподключением."""
+        backoff = ReconnectBackoff(self._stop_event)
+        histogram = self.histograms['subdecode']
+        cap = self._open_with_backoff(url, True, backoff, "подпотоком", primary=False)
+        if cap is not None:
+            self._log("log", f"Детекция по подпотоку: {url}")
+        next_decode = 0.0
+        try:
+            while self.is_running and cap is not None:
+                read_started = time.perf_counter()
+                # Подпоток нужен только детекции: в покое лишние кадры пропускаются без декодирования
+                decode = not (self.idle and read_started < next_decode)
+                ret, frame = self._read(cap, self.detect_ring, 'subcapture', decode)
+                if not ret:
+                    cap.release()
+                    cap = self._reconnect(url, backoff, primary=False)
+                    continue
+                if frame is None:
+                    self.counters['sub_grabbed'] += 1
+                else:
+                    histogram.observe(time.perf_counter() - read_started)
+                    self.detect_ring.publish(frame)
+                    self.counters['sub_captured'] += 1
+                    next_decode = read_started + self.idle_interval
+                self._stage_cpu['subcapture'] = time.thread_time()
+        finally:
+            if cap is not None:
+                cap.release()
+
+    def _consume(self, stage, handler, interval=0.0, ring=None):
+        """Общий цикл потребителя: берет самый свежий кадр и считает пропущенные.
+
+        interval > 0 ограничивает частоту обработки: между кадрами поток спит
+        до следующего срока, а не опрашивает буфер. interval может быть
+        функцией — тогда пауза выбирается перед каждым ожиданием.
+        """
+        ring = ring or self.ring
+        seq = 0
+        frame = None
+        histogram = self.histograms[stage]
+        deadline = time.perf_counter()
+        while self.is_running:
+            new_seq, frame, _ = ring.read_latest(frame, seq, timeout=0.5)
+            if new_seq == seq:
+                if ring.closed:
+                    break
+                continue
+            if new_seq - seq > 1:
+                # В покое детекция пропускает кадры намеренно — это не отставание
+                key = 'idle_skipped' if stage == 'detect' and self.idle else f'{stage}_dropped'
+                self.counters[key] += new_seq - seq - 1
+            seq = new_seq
+            started = time.perf_counter()
+            started_cpu = time.thread_time()
+            handler(frame)
+            histogram.observe(time.perf_counter() - started)
+            self._stage_cpu[stage] = time.thread_time()
+            self._observe_cost(stage, self._stage_cpu[stage] - started_cpu)
+            wait = interval() if callable(interval) else interval
+            if wait:
+                deadline = pace(deadline, wait)
+
+    def _publish_event(self, event):
+        if event['end'] is None:
+            self.counters['events'] += 1
+            self.alert_bus.publish(motion_event(self.name, **event))
+        else:
+            path, opened, closed = self.clip_span
+            clip = path if opened <= event['end'] and (closed is None or closed >= event['start']) else ''
+            self.alert_bus.publish(motion_event(self.name, type='motion_end', clip=clip, **event))
+
+    def _detect_loop(self):
+        detector = self.detector
+        tracker_profile = self.profile
+        tracker = MotionEventTracker(tracker_profile.settings)
+        keyframe = None  # Уменьшенный кадр пика текущего события или кандидата
+        keyframe_owner = None
+        keyframe_time = 0.0
+        quiet_since = None  # Начало тишины: ни движения, ни события или кандидата
+
+        def handle(frame):
+            nonlocal keyframe, keyframe_owner, keyframe_time, quiet_since, tracker_profile
+            profile = self.profile
+            if profile is not tracker_profile:
+                tracker.configure(profile.settings)  # Профиль подменен на ходу — событие не прерывается
+                tracker_profile = profile
+            with self.scheduler:
+                area, bbox = detector.measure(frame)
+            timestamp = time.time()
+            for event in tracker.update(timestamp, area, bbox):
+                if event['end'] is not None and event is keyframe_owner:
+                    event['thumbnail'] = event_key(self.name, event['start'])
+                    self.thumbnails.put(event['thumbnail'], keyframe)
+                    keyframe = keyframe_owner = None
+                self._publish_event(event)
+            # Ключевой кадр — уменьшенная копия кадра пика, пока событие (или кандидат) растет
+            if self.thumbnails is not None and tracker.at_peak:
+                current = tracker.current
+                if current is not keyframe_owner or timestamp - keyframe_time >= KEYFRAME_INTERVAL:
+                    keyframe, keyframe_owner, keyframe_time = make_keyframe(frame), current, timestamp
+            self.motion_detected = tracker.active
+            if area or tracker.current is not None or not profile.idle_interval:
+                quiet_since = None
+                self.idle = False  # Первое движение сразу возвращает полную частоту
+            elif quiet_since is None:
+                quiet_since = timestamp
+            elif timestamp - quiet_since >= IDLE_DELAY:
+                self.idle = True
+            self.counters['detected'] += 1
+
+        try:
+            self._consume("detect", handle,
+                          lambda: self.idle_interval if self.idle else self.profile.detect_interval, self.detect_ring)
+        finally:
+            for event in tracker.finish():
+                if event is keyframe_owner:
+                    event['thumbnail'] = event_key(self.name, event['start'])
+                    self.thumbnails.put(event['thumbnail'], keyframe)
+                self._publish_event(event)
+            if detector.heatmap is not None:
+                try:
+                    detector.heatmap.save()
+                except OSError as e:
+                    self._log("log", f"Не удалось сохранить тепловую карту: {e}")
+
+    def _display_loop(self):
+        """Отдает кадры интерфейсу не чаще display_fps, независимо от частоты детекции."""
+        def handle(frame):
+            self.on_frame(self.name, frame, self.motion_detected)
+            self.counters['displayed'] += 1
+
+        self._consume("display", handle, 1.0 / self.display_fps if self.display_fps > 0 else 0.0)
+
+    def _record_loop(self):
+        """Держит предзапись в памяти и по движению или триггеру передает клип фоновому писателю."""
+        pre_roll = PreRollBuffer(self.profile.pre_roll)
+        clip = None
+        last_motion = 0.0
+
+        def handle(frame):
+            nonlocal clip, last_motion
+            profile = self.profile
+            pre_roll.seconds = profile.pre_roll
+            timestamp = time.time()
+            data = encode_frame(frame)
+            if data is None:
+                return
+            self.counters['recorded'] += 1
+            motion = self.motion_detected or timestamp < self.clip_until
+            if motion:
+                last_motion = timestamp
+
+            if clip is None:
+                pre_roll.append(timestamp, data)
+                if motion:
+                    # Для короткой предзаписи частоту клипа подскажет измеренная частота захвата
+                    clip = self.clip_writer.open_clip(self.name, pre_roll.drain(), self.fps or self.source_fps)
+                    self.clip_span = (clip.path, timestamp, None)
+                    self.recording = True
+            elif timestamp - last_motion > profile.post_roll or clip.dropped:
+                self.clip_writer.close_clip(clip)
+                self.clip_span = (clip.path, self.clip_span[1], timestamp)
+                clip = None
+                self.recording = False
+                pre_roll.append(timestamp, data)
+            else:
+                self.clip_writer.write(clip, data)
+
+        try:
+            self._consume("record", handle)
+        finally:
+            if clip is not None:
+                self.clip_writer.close_clip(clip)
+                self.clip_span = (clip.path, self.clip_span[1], time.time())
+            self.recording = False
+
+
+class CameraManager:
+    """Запускает все включённые профили одновременно и собирает их статистику."""
+
+    def __init__(self, message_queue, on_frame=None, max_concurrent=None, clips_dir=None, display_fps=0,
+                 alert_bus=None, thumbnails=None, heatmaps_dir=None, processes=False):
+        self.message_queue = message_queue
+        # Без своей шины оповещения идут в message_queue, как раньше
+        self.alert_bus = alert_bus if alert_bus is not None else AlertBus([QueueSink(message_queue, cooldown=0)])
+        self.thumbnails = thumbnails
+        self.heatmaps_dir = heatmaps_dir  # Каталог тепловых карт активности; None — не копить
+        self.on_frame = on_frame
+        self.display_fps = display_fps  # Ограничение частоты кадров для on_frame; 0 — без ограничения
+        self.processes = processes  # Захват и детекция каждой камеры в своем процессе (ProcessCameraWorker)
+        self.scheduler = DetectionScheduler(max_concurrent)
+        self.clip_writer = ClipWriter(clips_dir, message_queue) if clips_dir else None
+        self.workers = {}
+        self._threads = 1  # Потоков OpenCV на камеру при последнем запуске
+
+    def set_clips_dir(self, clips_dir):
+        """Задает папку клипов; пустое значение отключает запись."""
+        if not clips_dir:
+            self.clip_writer = None
+        elif self.clip_writer is None:
+            self.clip_writer = ClipWriter(clips_dir, self.message_queue)
+        else:
+            self.clip_writer.clips_dir = clips_dir
+
+    def start(self, profiles):
+        """Запускает потоки для всех профилей с включённым флагом enabled."""
+        self.stop()
+        enabled = {name: settings for name, settings in profiles.items() if settings.get('enabled', True)}
+        if not enabled:
+            return []
+        # Параллелизмом управляет планировщик; внутренние потоки OpenCV делим между камерами,
+        # чтобы суммарно не занимать больше ядер, чем есть
+        cpu_count = os.cpu_count() or 1
+        self._threads = max(1, cpu_count // len(enabled))
+        cv2.setNumThreads(self._threads)
+        for name in sorted(enabled):
+            worker = self.workers[name] = self._create_worker(name, enabled[name])
+            worker.start()
+        return list(self.workers)
+
+    def _create_worker(self, name, settings):
+        if self.processes:
+            from nexora.procworker import ProcessCameraWorker
+            return ProcessCameraWorker(name, settings, self.scheduler, self.message_queue, self.on_frame,
+                                       self.clip_writer, self.display_fps, self.alert_bus, self.thumbnails,
+                                       self.heatmaps_dir, self._threads)
+        return CameraWorker(name, settings, self.scheduler, self.message_queue, self.on_frame, self.clip_writer,
+                            self.display_fps, self.alert_bus, self.thumbnails, self.heatmaps_dir)
+
+    def stop(self):
+        """Сигнализирует всем потокам об остановке (без ожидания)."""
+        for worker in self.workers.values():
+            worker.stop()
+
+    def is_running(self):
+        return any(worker.is_alive() for worker in list(self.workers.values()))
+
+    def join(self, timeout=None):
+        for worker in self.workers.values():
+            worker.join(timeout)
+
+    def clear(self):
+        self.workers = {}
+
+    def get_last_frame(self, name):
+        worker = self.workers.get(name)
+        return worker.get_last_frame() if worker else None
+
+    def update_zones(self, name, settings):
+        """Передает новые зоны профиля в работающую камеру, если она запущена."""
+        worker = self.workers.get(name)
+        if worker is not None:
+            worker.update_zones(settings)
+
+    def apply_profile(self, name, settings):
+        """Применяет измененный профиль к запущенной камере, не трогая остальные.
+
+        Параметры детекции, событий и предзаписи подменяются на ходу
+        (CameraWorker.apply_settings) — без переподключения и без повторного
+        обучения фона. Изменение подключения или записи клипов перезапускает
+        только эту камеру, выключенный профиль ее останавливает. Если камеры
+        профиля нет (профиль добавлен или включен после запуска), а другие
+        камеры работают, она запускается.
+
+        Возвращает 'applied', 'restarted', 'started', 'stopped' или None,
+        если ничего не изменилось.
+        """
+        worker = self.workers.get(name)
+        if worker is None:
+            if not settings.get('enabled', True) or not self.is_running():
+                return None
+            worker = self.workers[name] = self._create_worker(name, settings)
+            worker.start()
+            return 'started'
+        if not settings.get('enabled', True):
+            worker.stop()
+            return 'stopped'
+        if worker.is_alive() and worker.apply_settings(settings):
+            return 'applied'
+        # Старая камера дочитывает свои потоки сама; новая сразу подключается с новыми параметрами
+        worker.stop()
+        worker = self.workers[name] = self._create_worker(name, settings)
+        worker.start()
+        return 'restarted'
+
+    def heatmap(self, name):
+        """Текущая тепловая карта запущенной камеры или None."""
+        worker = self.workers.get(name)
+        return worker.heatmap() if worker else None
+
+    def trigger_clip(self, name, duration):
+        """Включает запись клипа на запущенной камере (приемник ClipTriggerSink)."""
+        worker = self.workers.get(name)
+        if worker is not None:
+            worker.trigger_clip(duration)
+
+    def stats(self):
+        """Статистика по каждой камере: статус, FPS захвата и детекции, CPU по стадиям, пропуски кадров."""
+        return {name: worker.stats() for name, worker in list(self.workers.items())}
@@ -0,0 +1,124 @@
+"""События движения: подавление дребезга и слияние кадров с движением в события.
+
+Детектор отвечает на вопрос «есть ли движение в этом кадре»: одиночный
+шумный кадр (дождь, мерцание) дает «да», один тихий кадр — «нет». Трекер
+превращает поток таких ответов в события с началом и концом:
+
+- событие начинается, когда движение есть в trigger_frames кадрах подряд
+  и длится не меньше min_duration секунд;
+- паузы не длиннее gap секунд не разрывают событие, а продлевают его;
+- после конца события новое не начинается cooldown секунд.
+
+Состояние трекера — несколько чисел; кадр без движения вне события
+обходится одним сравнением. Время передается явно, поэтому трекер
+проверяется синтетическими последовательностями (время, площадь, рамка)
+без камеры.
+"""
+
+DEFAULT_TRIGGER_FRAMES = 2  # Кадров с движением подряд для начала события
+DEFAULT_MIN_DURATION = 0.0  # Минимальная длительность движения до начала события, секунды
+DEFAULT_EVENT_GAP = 2.0  # Пауза, после которой событие считается законченным, секунды
+DEFAULT_EVENT_COOLDOWN = 0.0  # Пауза после конца события, в которую новое не начинается, секунды
+
+_NO_EVENTS = ()
+
+
+def _union(bbox, other):
+    if bbox is None:
+        return other
+    if other is None:
+        return bbox
+    return (min(bbox[0], other[0]), min(bbox[1], other[1]), max(bbox[2], other[2]), max(bbox[3], other[3]))
+
+
+class MotionEventTracker:
+    """Конечный автомат «тишина → кандидат → событие» для одной камеры.
+
+    update() возвращает начавшиеся и закончившиеся на этом кадре события
+    (словари start, end, peak_area, peak_time, bbox, frames); у начавшегося
+    события end равен None. bbox — общая рамка движения (x1, y1, x2, y2)
+    за всё событие, peak_area — наибольшая площадь контура.
+    """
+
+    def __init__(self, settings=None):
+        self.configure(settings)
+        self.event = None  # Текущее событие или None
+        self._candidate = None  # Серия кадров с движением, еще не ставшая событием
+        self._last_motion = None
+        self._last_update = None
+        self._cooldown_until = float('-inf')
+
+    def configure(self, settings=None):
+        """Задает параметры из профиля; текущее событие и кандидат сохраняются."""
+        settings = settings or {}
+        self.trigger_frames = max(1, int(settings.get('event_trigger_frames', DEFAULT_TRIGGER_FRAMES)))
+        self.min_duration = float(settings.get('event_min_duration', DEFAULT_MIN_DURATION))
+        self.gap = float(settings.get('event_gap', DEFAULT_EVENT_GAP))
+        self.cooldown = float(settings.get('event_cooldown', DEFAULT_EVENT_COOLDOWN))
+
+    @property
+    def active(self):
+        return self.event is not None
+
+    @property
+    def current(self):
+        """Текущее событие или серия-кандидат; None в тишине. Словарь меняется трекером."""
+        return self.event or self._candidate
+
+    @property
+    def at_peak(self):
+        """True, если последний кадр дал новый пик площади текущего события или кандидата."""
+        current = self.current
+        return current is not None and current['peak_time'] == self._last_update
+
+    def update(self, timestamp, area=0.0, bbox=None):
+        """Учитывает очередной кадр; движение — ненулевая площадь или рамка."""
+        self._last_update = timestamp
+        if not area and bbox is None:
+            self._candidate = None
+            if self.event is not None and timestamp - self._last_motion > self.gap:
+                return (self._finish(),)
+            return _NO_EVENTS
+
+        event = self.event
+        if event is not None:
+            if timestamp - self._last_motion <= self.gap:
+                self._add(event, timestamp, area, bbox)
+                return _NO_EVENTS
+            # Кадров долго не было (обрыв, пауза детекции) — прежнее событие уже закончилось
+            finished = (self._finish(),)
+        else:
+            finished = _NO_EVENTS
+
+        if timestamp < self._cooldown_until:
+            return finished
+        candidate = self._candidate
+        if candidate is None:
+            candidate = self._candidate = {'start': timestamp, 'end': None, 'peak_area': 0.0,
+                                           'peak_time': timestamp, 'bbox': None, 'frames': 0}
+        self._add(candidate, timestamp, area, bbox)
+        if candidate['frames'] >= self.trigger_frames and timestamp - candidate['start'] >= self.min_duration:
+            self.event = candidate
+            self._candidate = None
+            return finished + (dict(candidate),)
+        return finished
+
+    def finish(self):
+        """Закрывает текущее событие (конец потока, остановка камеры)."""
+        self._candidate = None
+        return (self._finish(),) if self.event is not None else _NO_EVENTS
+
+    def _add(self, event, timestamp, area, bbox):
+        event['frames'] += 1
+        if area > event['peak_area']:
+            event['peak_area'] = area
+            event['peak_time'] = timestamp
+        event['bbox'] = _union(event['bbox'], bbox)
+        self._last_motion = timestamp
+
+    def _finish(self):
+        event = self.event
+        self.event = None
+        event['end'] = self._last_motion
+        self._cooldown_until = self._last_motion + self.cooldown
+        return event
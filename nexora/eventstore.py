@@ -0,0 +1,144 @@
+"""Журнал событий движения в SQLite с быстрым поиском по камере и времени.
+
+Хранилище — приемник шины оповещений: законченные события (motion_end)
+копятся в очереди и записываются пачками в одной транзакции из фонового
+потока, поэтому ни детекция, ни интерфейс не ждут диска. Поиск «камера X
+между T1 и T2» идет по индексу (camera, start_time) и на миллионах строк
+занимает миллисекунды (benchmarks/bench_eventstore.py).
+"""
+import logging
+import sqlite3
+import time
+from queue import Empty
+
+from nexora.alerts import AlertSink
+
+logger = logging.getLogger('nexora')
+
+BATCH_SIZE = 500  # Событий в одной транзакции
+BATCH_INTERVAL = 1.0  # Дольше этого событие не ждет записи, секунды
+STORE_QUEUE_SIZE = 10000
+DEFAULT_QUERY_LIMIT = 1000
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY,
+        camera TEXT NOT NULL,
+        start_time REAL NOT NULL,
+        end_time REAL NOT NULL,
+        peak_area REAL NOT NULL DEFAULT 0,
+        peak_time REAL,
+        x1 INTEGER, y1 INTEGER, x2 INTEGER, y2 INTEGER,
+        frames INTEGER NOT NULL DEFAULT 0,
+        clip TEXT NOT NULL DEFAULT '',
+        thumbnail TEXT NOT NULL DEFAULT ''
+    )""",
+    "CREATE INDEX IF NOT EXISTS events_camera_start ON events (camera, start_time)",
+    "CREATE INDEX IF NOT EXISTS events_start ON events (start_time)",
+)
+COLUMNS = ('id', 'camera', 'start_time', 'end_time', 'peak_area', 'peak_time', 'x1', 'y1', 'x2', 'y2',
+           'frames', 'clip', 'thumbnail')
+INSERT = ("INSERT INTO events (camera, start_time, end_time, peak_area, peak_time, x1, y1, x2, y2, frames, "
+          "clip, thumbnail) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, timeout=10.0)
+    connection.execute("PRAGMA journal_mode=WAL")  # Чтение не блокируется записью
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def _row(event):
+    bbox = event.get('bbox') or (None, None, None, None)
+    return (event['camera'], event['start'], event['end'], event.get('peak_area', 0.0), event.get('peak_time'),
+            *bbox, event.get('frames', 0), event.get('clip') or '', event.get('thumbnail') or '')
+
+
+class EventStore(AlertSink):
+    """Индекс событий движения: пакетная запись из шины и поиск по камере и времени."""
+
+    name = "журнал событий"
+    event_types = ('motion_end',)
+    queue_size = STORE_QUEUE_SIZE
+
+    def __init__(self, path):
+        self.path = path
+        connection = _connect(path)
+        try:
+            with connection:
+                for statement in SCHEMA:
+                    connection.execute(statement)
+        finally:
+            connection.close()
+        super().__init__(cooldown=0)
+
+    def query(self, camera=None, start=None, end=None, limit=DEFAULT_QUERY_LIMIT, offset=0, newest_first=False):
+        """События, начавшиеся в [start, end), в порядке времени; None снимает ограничение.
+
+        offset пропускает первые события — для постраничного просмотра;
+        newest_first выдает сначала последние события.
+
+        Возвращает список словарей с ключами COLUMNS.
+        """
+        conditions, params = [], []
+        if camera:
+            conditions.append("camera = ?")
+            params.append(camera)
+        if start is not None:
+            conditions.append("start_time >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("start_time < ?")
+            params.append(end)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM events"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY start_time {'DESC' if newest_first else 'ASC'} LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        connection = sqlite3.connect(self.path, timeout=10.0)
+        try:
+            return [dict(zip(COLUMNS, row)) for row in connection.execute(sql, params)]
+        finally:
+            connection.close()
+
+    def cameras(self):
+        """Имена камер, по которым есть события."""
+        connection = sqlite3.connect(self.path, timeout=10.0)
+        try:
+            # DISTINCT по первому столбцу индекса (camera, start_time) не читает таблицу
+            return [row[0] for row in connection.execute("SELECT DISTINCT camera FROM events ORDER BY camera")]
+        finally:
+            connection.close()
+
+    def _write(self, batch):
+        with self._connection:
+            self._connection.executemany(INSERT, [_row(event) for event in batch])
+
+    def _run(self):
+        self._connection = _connect(self.path)
+        try:
+            stopping = False
+            while not stopping:
+                event = self._queue.get()
+                if event is None:
+                    break
+                batch = [event]
+                deadline = time.monotonic() + BATCH_INTERVAL
+                while len(batch) < BATCH_SIZE:
+                    try:
+                        event = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except Empty:
+                        break
+                    if event is None:
+                        stopping = True
+                        break
+                    batch.append(event)
+                try:
+                    self._write(batch)
+                    self.counters['sent'] += len(batch)
+                except sqlite3.Error as e:
+                    self.counters['failed'] += len(batch)
+                    logger.warning("Не удалось записать события в %s: %s", self.path, e)
+        finally:
+            self._connection.close()
@@ -0,0 +1,270 @@
+"""Кольцевой буфер последних кадров между потоком захвата и потребителями."""
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+FRAME_RING_CAPACITY = 3
+
+
+class FrameRing:
+    """Предвыделенный кольцевой буфер кадров с вытеснением самых старых.
+
+    Поток захвата декодирует кадр прямо в следующий свободный слот
+    (``cap.read(ring.next_slot())``) и публикует его через ``publish``.
+    Потребители (детекция, отображение) забирают только самый свежий кадр,
+    копируя его в собственный буфер, поэтому медленный потребитель
+    не задерживает захват, а лишь пропускает кадры.
+    """
+
+    def __init__(self, capacity=FRAME_RING_CAPACITY):
+        # Минимум два слота: запись в следующий слот не пересекается с чтением последнего
+        self.capacity = max(2, capacity)
+        self._slots = None
+        self._timestamps = [0.0] * self.capacity
+        self._seq = 0  # Число опубликованных кадров; последний лежит в слоте (seq - 1) % capacity
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def seq(self):
+        return self._seq
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def next_slot(self):
+        """Слот для записи следующего кадра или None, пока размер кадра неизвестен."""
+        if self._slots is None:
+            return None
+        return self._slots[self._seq % self.capacity]
+
+    def publish(self, frame, timestamp=None):
+        """Публикует кадр, записанный в next_slot(); иначе копирует его в буфер."""
+        index = self._seq % self.capacity
+        slots = self._slots
+        if slots is None or slots[index].shape != frame.shape or slots[index].dtype != frame.dtype:
+            slots = [np.empty_like(frame) for _ in range(self.capacity)]
+        slot = slots[index]
+        if frame is not slot:
+            np.copyto(slot, frame)
+        with self._cond:
+            # Новые слоты (смена разрешения) подменяются вместе с публикацией кадра в них:
+            # иначе читатель скопировал бы последний кадр из еще пустого слота нового размера
+            self._slots = slots
+            self._timestamps[index] = time.time() if timestamp is None else timestamp
+            self._seq += 1
+            self._cond.notify_all()
+
+    def read_latest(self, out=None, after_seq=0, timeout=None):
+        """Ждет кадр новее after_seq и копирует последний из них в out.
+
+        Возвращает (seq, frame, timestamp) или (after_seq, out, None) по таймауту
+        либо после закрытия буфера.
+        """
+        with self._cond:
+            if self._seq <= after_seq and not self._closed:
+                self._cond.wait_for(lambda: self._seq > after_seq or self._closed, timeout)
+            if self._seq <= after_seq:
+                return after_seq, out, None
+            index = (self._seq - 1) % self.capacity
+            slot = self._slots[index]
+            if out is None or out.shape != slot.shape or out.dtype != slot.dtype:
+                out = np.empty_like(slot)
+            np.copyto(out, slot)
+            return self._seq, out, self._timestamps[index]
+
+    def snapshot(self):
+        """Копия последнего кадра или None."""
+        seq, frame, _ = self.read_latest(after_seq=0, timeout=0)
+        return frame if seq else None
+
+    def close(self):
+        """Будит всех ожидающих потребителей: новых кадров больше не будет."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+# Заголовок общего буфера: счетчики int64, затем время кадров float64 по слотам
+_SEQ, _CLOSED, _GENERATION, _HEIGHT, _WIDTH, _CHANNELS = range(6)
+_HEADER_FIELDS = 6
+SHARED_POLL_INTERVAL = 0.005  # Период опроса нового кадра читателем из другого процесса, секунды
+
+
+class SharedFrameRing:
+    """FrameRing в разделяемой памяти: кадры между процессами без сериализации.
+
+    Заголовок (номер последнего кадра, размер кадра, время по слотам) создает
+    владелец — процесс, который читает кадры, — и передает дочернему процессу
+    имя буфера. Пишущий процесс при первом кадре (и при смене разрешения)
+    создает сегмент слотов ``<имя>_<поколение>`` и декодирует кадры прямо в него.
+
+    Интерфейс совпадает с FrameRing. Читатель в процессе писателя ждет
+    кадр на условной переменной, читатель в другом процессе опрашивает
+    заголовок раз в SHARED_POLL_INTERVAL. Блокировок между процессами нет:
+    читатель копирует последний слот и повторяет копирование, если за это
+    время писатель успел дойти до этого слота снова.
+    """
+
+    def __init__(self, name=None, capacity=FRAME_RING_CAPACITY):
+        self.capacity = max(2, capacity)
+        size = 8 * (_HEADER_FIELDS + self.capacity)
+        self.owner = name is None
+        self._header_shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self.name = self._header_shm.name
+        self._header = np.ndarray((_HEADER_FIELDS,), np.int64, self._header_shm.buf)
+        self._timestamps = np.ndarray((self.capacity,), np.float64, self._header_shm.buf, 8 * _HEADER_FIELDS)
+        if self.owner:
+            self._header[:] = 0
+            self._timestamps[:] = 0.0
+        self._data_shm = None
+        self._generation = 0
+        self._slots = None
+        self._writer = False  # Кадры пишет этот процесс
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def seq(self):
+        return int(self._header[_SEQ])
+
+    @property
+    def closed(self):
+        return self._closed or bool(self._header[_CLOSED])
+
+    def next_slot(self):
+        """Слот для записи следующего кадра или None, пока размер кадра неизвестен."""
+        if not self._writer:
+            return None
+        return self._slots[self._header[_SEQ] % self.capacity]
+
+    def publish(self, frame, timestamp=None):
+        """Публикует кадр, записанный в next_slot(); иначе копирует его в буфер."""
+        seq = int(self._header[_SEQ])
+        if not self._writer or self._slots.shape[1:] != frame.shape:
+            self._allocate(frame.shape)
+        slot = self._slots[seq % self.capacity]
+        if frame is not slot:
+            np.copyto(slot, frame)
+        self._timestamps[seq % self.capacity] = time.time() if timestamp is None else timestamp
+        with self._cond:
+            self._header[_SEQ] = seq + 1  # Номер увеличивается последним: кадр в слоте уже целиком
+            self._cond.notify_all()
+
+    def read_latest(self, out=None, after_seq=0, timeout=None):
+        """Ждет кадр новее after_seq и копирует последний из них в out (см. FrameRing.read_latest)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            seq = int(self._header[_SEQ])
+            if seq <= after_seq:
+                if self.closed or not self._wait(after_seq, deadline):
+                    return after_seq, out, None
+                continue
+            if self._generation != self._header[_GENERATION] and not self._attach():
+                return after_seq, out, None
+            index = (seq - 1) % self.capacity
+            slot = self._slots[index]
+            if out is None or out.shape != slot.shape or out.dtype != slot.dtype:
+                out = np.empty_like(slot)
+            np.copyto(out, slot)
+            timestamp = float(self._timestamps[index])
+            # За время копирования писатель мог заново дойти до этого слота — тогда кадр рваный
+            if self._header[_SEQ] - seq < self.capacity - 1 and self._generation == self._header[_GENERATION]:
+                return seq, out, timestamp
+
+    def snapshot(self):
+        """Копия последнего кадра или None."""
+        seq, frame, _ = self.read_latest(after_seq=0, timeout=0)
+        return frame if seq else None
+
+    def close(self):
+        """Будит ожидающих потребителей; у владельца — и в других процессах."""
+        if self.owner:
+            self._header[_CLOSED] = 1
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reopen(self):
+        """Снова принимает кадры после close() (владелец перезапускает пишущий процесс)."""
+        self._closed = False
+        self._header[_CLOSED] = 0
+
+    def release(self):
+        """Отключается от разделяемой памяти; владелец удаляет заголовок и последний сегмент слотов.
+
+        Писатель свой последний сегмент не удаляет: владелец еще может
+        прочитать из него последний кадр.
+        """
+        if self._data_shm is not None:
+            self._release_data(unlink=False)
+        if self.owner:
+            try:
+                shared_memory.SharedMemory(name=f"{self.name}_{int(self._header[_GENERATION])}").unlink()
+            except FileNotFoundError:
+                pass
+        self._header = self._timestamps = None
+        self._header_shm.close()
+        if self.owner:
+            self._header_shm.unlink()
+
+    def _wait(self, after_seq, deadline):
+        """Ждет новый кадр до deadline; False — время вышло."""
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            return False
+        if self._writer:
+            # Читатель в процессе писателя: тот будит его сам
+            with self._cond:
+                return self._cond.wait_for(lambda: self._header[_SEQ] > after_seq or self._closed, remaining)
+        time.sleep(SHARED_POLL_INTERVAL if remaining is None else min(SHARED_POLL_INTERVAL, remaining))
+        return True
+
+    def _allocate(self, shape):
+        """Создает сегмент слотов под новый размер кадра (пишущий процесс)."""
+        generation = int(self._header[_GENERATION]) + 1
+        size = max(1, self.capacity * int(np.prod(shape)))
+        data_shm = shared_memory.SharedMemory(name=f"{self.name}_{generation}", create=True, size=size)
+        if self._data_shm is not None:
+            self._release_data(unlink=True)
+        self._data_shm = data_shm
+        self._slots = np.ndarray((self.capacity, *shape), np.uint8, data_shm.buf)
+        height, width = shape[:2]
+        self._header[_HEIGHT], self._header[_WIDTH] = height, width
+        self._header[_CHANNELS] = shape[2] if len(shape) > 2 else 0
+        self._header[_GENERATION] = self._generation = generation
+        self._writer = True
+
+    def _attach(self):
+        """Подключается к текущему сегменту слотов писателя; False — сегмента уже нет."""
+        generation = int(self._header[_GENERATION])
+        shape = (int(self._header[_HEIGHT]), int(self._header[_WIDTH]))
+        if self._header[_CHANNELS]:
+            shape += (int(self._header[_CHANNELS]),)
+        try:
+            data_shm = shared_memory.SharedMemory(name=f"{self.name}_{generation}")
+        except FileNotFoundError:
+            return False
+        if self._data_shm is not None:
+            # Прежний сегмент писатель уже бросил (новое разрешение или перезапуск процесса)
+            self._release_data(unlink=True)
+        self._data_shm = data_shm
+        self._slots = np.ndarray((self.capacity, *shape), np.uint8, data_shm.buf)
+        self._generation = generation
+        return True
+
+    def _release_data(self, unlink):
+        self._slots = None
+        data_shm, self._data_shm = self._data_shm, None
+        try:
+            data_shm.close()
+        except BufferError:
+            pass  # На сегмент еще смотрит кадр, выданный next_slot(); память освободит сборщик
+        if unlink:
+            try:
+                data_shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,236 @@
+"""Работа без графического интерфейса: все профили, журнал событий и клипы.
+
+Модуль не импортирует tkinter и PIL, поэтому подходит для сервисов
+на серверах без дисплея.
+"""
+import configparser
+import logging
+import signal
+import sqlite3
+import threading
+import time
+from queue import Queue, Empty
+
+from nexora.alerts import (
+    DEFAULT_ALERT_COOLDOWN, AlertBus, ClipTriggerSink, LogFileSink, QueueSink, UdpSink, WebhookSink
+)
+from nexora.engine import CameraManager
+from nexora.eventstore import EventStore
+from nexora.thumbnails import ThumbnailCache
+from nexora.metrics import MetricsServer, write_metrics_file
+from nexora.profiles import PROFILE_POLL_INTERVAL, ProfileStore
+
+logger = logging.getLogger('nexora')
+
+MESSAGE_LEVELS = {
+    'error': logging.ERROR,
+    'warning': logging.WARNING,
+    'motion': logging.WARNING,
+    'info': logging.INFO,
+    'log': logging.INFO,
+}
+STATS_LOG_INTERVAL = 60.0  # Период записи статистики камер в журнал, секунды
+METRICS_FILE_INTERVAL = 5.0  # Период перезаписи файла метрик, секунды
+
+
+def log_stats(manager):
+    """Пишет в журнал частоту кадров и загрузку CPU каждой камеры по стадиям."""
+    for name, item in manager.stats().items():
+        stages = ', '.join(f"{stage} {cpu:.1f}%" for stage, cpu in sorted(item['stage_cpu'].items()))
+        latency = ', '.join(f"{stage} {summary['p50']:.1f}/{summary['p99']:.1f}"
+                            for stage, summary in item['latency'].items() if summary['p50'] is not None)
+        status = item['status'] + (", подпоток недоступен" if item['substream_down'] else "")
+        logger.info("[%s] %s: %.1f FPS, детекция %.1f FPS%s, CPU %.1f%% (%s; покой сэкономил %.1f%%), "
+                    "задержки p50/p99, мс: %s, пропуски детекции %d, переподключений %d (простой %.0f с)",
+                    name, status, item['fps'], item['detect_fps'], " (покой)" if item['idle'] else "",
+                    item['cpu'], stages or "нет данных", item['cpu_saved'],
+                    latency or "нет данных", item['dropped']['detect'], item['reconnects'],
+                    item['outage']['total'] + item['outage']['current'])
+    sinks = ', '.join(f"{sink} {counters['sent']}/{counters['suppressed']}/{counters['dropped']}/{counters['failed']}"
+                      for sink, counters in sorted(manager.alert_bus.stats().items()))
+    logger.info("Оповещения (отправлено/подавлено/отброшено/ошибки): %s", sinks or "нет приемников")
+
+
+def apply_profile_changes(manager, changes, profile_names=None):
+    """Применяет к камерам профили, измененные в файле во время работы (ProfileStore.poll)."""
+    for name, settings in changes.items():
+        if profile_names:
+            if name not in profile_names:
+                continue
+            if settings is not None:
+                settings = dict(settings, enabled=True)
+        if settings is None:
+            worker = manager.workers.get(name)
+            if worker is not None:
+                manager.apply_profile(name, dict(worker.settings, enabled=False))
+                logger.warning("Профиль '%s' удален из файла, камера остановлена", name)
+            continue
+        result = manager.apply_profile(name, settings)
+        if result == 'applied':
+            logger.info("Профиль '%s' изменен, параметры применены без перезапуска камеры", name)
+        elif result == 'restarted':
+            logger.info("Профиль '%s' изменен, камера перезапущена", name)
+        elif result == 'started':
+            logger.info("Профиль '%s' добавлен или включен, камера запущена", name)
+        elif result == 'stopped':
+            logger.info("Профиль '%s' выключен, камера остановлена", name)
+        else:
+            logger.info("Профиль '%s' изменен (камера не запущена)", name)
+
+
+def dump_metrics(path, manager):
+    try:
+        write_metrics_file(path, manager.workers, manager.alert_bus.stats())
+    except OSError as e:
+        logger.error("Не удалось записать метрики в %s: %s", path, e)
+
+
+def parse_address(value):
+    """«хост:порт» → (хост, порт); без хоста — 127.0.0.1."""
+    host, _, port = value.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def parse_clip_targets(values):
+    """Строки «камера=камера1,камера2» → {камера события: [камеры для записи]}."""
+    targets = {}
+    for value in values or ():
+        camera, _, cameras = value.partition('=')
+        targets[camera.strip()] = [name.strip() for name in cameras.split(',') if name.strip()]
+    return targets
+
+
+def build_alert_bus(message_queue, alert_log=None, alert_webhook=None, alert_udp=None,
+                    alert_cooldown=DEFAULT_ALERT_COOLDOWN, events_db=None):
+    """Шина оповещений: журнал процесса и заданные приемники (SQLite, файл JSON-строк, webhook, UDP)."""
+    bus = AlertBus([QueueSink(message_queue, cooldown=0)])
+    if events_db:
+        bus.add_sink(EventStore(events_db))
+    if alert_log:
+        bus.add_sink(LogFileSink(alert_log))
+    if alert_webhook:
+        bus.add_sink(WebhookSink(alert_webhook, cooldown=alert_cooldown))
+    if alert_udp:
+        bus.add_sink(UdpSink(parse_address(alert_udp), cooldown=alert_cooldown))
+    return bus
+
+
+def run_headless(profiles_path, clips_dir=None, profile_names=None, max_concurrent=None,
+                 metrics_port=None, metrics_host='127.0.0.1', metrics_file=None,
+                 alert_log=None, alert_webhook=None, alert_udp=None, alert_cooldown=DEFAULT_ALERT_COOLDOWN,
+                 events_db=None, thumbnails_dir=None, heatmaps_dir=None, processes=False, alert_clip=0.0,
+                 alert_clip_targets=None):
+    """Запускает камеры профилей и пишет события в журнал до сигнала остановки.
+
+    metrics_port открывает HTTP-эндпоинт /metrics в формате Prometheus,
+    metrics_file — тот же текст, периодически перезаписываемый в файл.
+    alert_log, alert_webhook и alert_udp («хост:порт») добавляют приемники
+    оповещений о движении; webhook и UDP не чаще alert_cooldown секунд на камеру.
+    events_db — файл SQLite, куда записываются законченные события,
+    thumbnails_dir — каталог ключевых кадров и миниатюр событий,
+    heatmaps_dir — каталог тепловых карт активности камер. processes запускает
+    захват и детекцию каждой камеры в отдельном процессе. alert_clip — секунды
+    записи клипа по событию движения (ClipTriggerSink) на камерах
+    alert_clip_targets ({камера события: [камеры]}; по умолчанию — на самой
+    камере события). Правка файла профилей во время работы применяется
+    к камерам измененных профилей.
+
+    Возвращает код завершения процесса: 0 — остановлено сигналом,
+    1 — нечего запускать или все камеры остановились сами.
+    """
+    store = ProfileStore(profiles_path)
+    profiles = store.load()
+    if profile_names:
+        missing = [name for name in profile_names if name not in profiles]
+        for name in missing:
+            logger.error("Профиль '%s' не найден в %s", name, profiles_path)
+        profiles = {name: profiles[name] for name in profile_names if name in profiles}
+        # Явно перечисленные профили запускаются независимо от флага enabled
+        profiles = {name: dict(settings, enabled=True) for name, settings in profiles.items()}
+
+    message_queue = Queue()
+    try:
+        alert_bus = build_alert_bus(message_queue, alert_log, alert_webhook, alert_udp, alert_cooldown, events_db)
+    except (OSError, sqlite3.Error) as e:
+        logger.error("Не удалось подготовить приемники оповещений: %s", e)
+        return 1
+    thumbnails = None
+    if thumbnails_dir:
+        try:
+            thumbnails = ThumbnailCache(thumbnails_dir)
+        except OSError as e:
+            logger.error("Не удалось открыть каталог миниатюр %s: %s", thumbnails_dir, e)
+    manager = CameraManager(message_queue, max_concurrent=max_concurrent, clips_dir=clips_dir,
+                            alert_bus=alert_bus, thumbnails=thumbnails, heatmaps_dir=heatmaps_dir,
+                            processes=processes)
+    if alert_clip > 0:
+        alert_bus.add_sink(ClipTriggerSink(manager, alert_clip, alert_clip_targets))
+    started = manager.start(profiles)
+    if not started:
+        logger.error("Нет включённых профилей для запуска в %s", profiles_path)
+        return 1
+    logger.info("Запущены камеры: %s", ', '.join(started))
+
+    metrics_server = None
+    if metrics_port is not None:
+        try:
+            metrics_server = MetricsServer(manager, metrics_port, metrics_host)
+        except OSError as e:
+            logger.error("Не удалось открыть порт метрик %s:%s: %s", metrics_host, metrics_port, e)
+        else:
+            metrics_server.start()
+            logger.info("Метрики: http://%s:%s/metrics", metrics_host, metrics_server.port)
+
+    stop_event = threading.Event()
+
+    def request_stop(signum, frame):
+        logger.info("Получен сигнал %s, остановка...", signum)
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, request_stop)
+
+    next_stats = time.monotonic() + STATS_LOG_INTERVAL
+    next_metrics = time.monotonic()
+    next_poll = time.monotonic() + PROFILE_POLL_INTERVAL
+    while not stop_event.is_set():
+        if time.monotonic() >= next_poll:
+            try:
+                apply_profile_changes(manager, store.poll(), profile_names)
+            except (OSError, configparser.Error) as e:
+                logger.error("Не удалось перечитать файл профилей %s: %s", profiles_path, e)
+            next_poll = time.monotonic() + PROFILE_POLL_INTERVAL
+        if time.monotonic() >= next_stats:
+            log_stats(manager)
+            next_stats += STATS_LOG_INTERVAL
+        if metrics_file and time.monotonic() >= next_metrics:
+            dump_metrics(metrics_file, manager)
+            next_metrics += METRICS_FILE_INTERVAL
+        try:
+            msg_type, text = message_queue.get(timeout=0.5)
+        except Empty:
+            if not manager.is_running():
+                logger.error("Все камеры остановлены")
+                break
+            continue
+        if msg_type == 'motion':
+            text = f"[{text}] Обнаружено движение"
+        logger.log(MESSAGE_LEVELS.get(msg_type, logging.INFO), text.replace('\n', ' '))
+
+    manager.stop()
+    manager.join(timeout=5.0)
+    alert_bus.close()
+    if thumbnails is not None:
+        thumbnails.close(timeout=5.0)
+    if metrics_server is not None:
+        metrics_server.stop()
+    if metrics_file:
+        dump_metrics(metrics_file, manager)
+    if manager.clip_writer is not None:
+        manager.clip_writer.drain()
+    while not message_queue.empty():
+        msg_type, text = message_queue.get()
+        if msg_type != 'motion':
+            logger.log(MESSAGE_LEVELS.get(msg_type, logging.INFO), text.replace('\n', ' '))
+    return 0 if stop_event.is_set() else 1
@@ -0,0 +1,98 @@
+"""Тепловая карта активности камеры: где на кадре на самом деле бывает движение.
+
+Карта копит пороговую маску детектора (до наложения зон, в разрешении
+анализа) как сумму с экспоненциальным затуханием во времени: вклад кадра
+пропорционален его длительности, а старая активность убывает вдвое за
+half_life секунд. Обновление — один cv2.accumulateWeighted по кадру анализа
+(десятки микросекунд на 640×360). Карта периодически сохраняется в файл
+и накладывается на кадр в редакторе зон.
+"""
+import os
+import re
+import time
+
+import cv2
+import numpy as np
+
+DEFAULT_HALF_LIFE = 24 * 3600.0  # Активность забывается вдвое за сутки
+MAX_STEP = 1.0  # Больший промежуток между кадрами (обрыв, остановка) не считается временем наблюдения, секунды
+SAVE_INTERVAL = 60.0  # Период сохранения карты на диск, секунды
+HEATMAP_EXTENSION = '.npz'
+OVERLAY_OPACITY = 0.6
+
+
+def heatmap_path(directory, camera):
+    safe_name = re.sub(r'[^\w.-]+', '_', camera) or 'camera'
+    return os.path.join(directory, safe_name + HEATMAP_EXTENSION)
+
+
+def load_heatmap(path):
+    """Сохраненная карта (float32) или None."""
+    try:
+        with np.load(path) as saved:
+            return saved['data'].astype(np.float32)
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class MotionHeatmap:
+    """Накопитель тепловой карты одной камеры; обновляется только потоком детекции."""
+
+    def __init__(self, path=None, half_life=DEFAULT_HALF_LIFE):
+        self.path = path
+        self.half_life = half_life
+        self.data = load_heatmap(path) if path else None
+        self._updated = None
+        self._saved = time.monotonic()
+
+    def add(self, mask, timestamp=None, shape=None, origin=(0, 0)):
+        """Добавляет пороговую маску кадра (uint8, 0/255).
+
+        Если детекция анализирует только часть кадра, shape — размер всего
+        кадра анализа, а origin — (x, y) левого верхнего угла маски в нем;
+        карта за пределами этой части не меняется.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        shape = shape or mask.shape
+        data = self.data
+        if data is None or data.shape != shape:
+            # Новая камера или сменилось разрешение анализа — карта копится заново
+            data = self.data = np.zeros(shape, np.float32)
+        if self._updated is not None:
+            step = min(MAX_STEP, timestamp - self._updated)
+            if step > 0:
+                x, y = origin
+                region = data[y:y + mask.shape[0], x:x + mask.shape[1]]
+                cv2.accumulateWeighted(mask, region, 1.0 - 0.5 ** (step / self.half_life))
+        self._updated = timestamp
+        if self.path and time.monotonic() - self._saved >= SAVE_INTERVAL:
+            self.save()
+
+    def snapshot(self):
+        data = self.data
+        return None if data is None else data.copy()
+
+    def save(self):
+        """Атомарно записывает карту в файл; ошибки ввода-вывода пробрасываются."""
+        self._saved = time.monotonic()
+        if self.data is None or not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, data=self.data, saved=time.time())
+        os.replace(tmp_path, self.path)
+
+
+def overlay_heatmap(frame, data, opacity=OVERLAY_OPACITY):
+    """Кадр BGR с наложенной картой: непрозрачность растет с активностью, цвет — от синего к красному."""
+    if data is None or not data.size or float(data.max()) <= 0:
+        return frame
+    height, width = frame.shape[:2]
+    heat = cv2.resize(data, (width, height), interpolation=cv2.INTER_LINEAR)
+    heat = cv2.normalize(heat, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    colored = cv2.applyColorMap(heat, cv2.COLORMAP_JET)
+    weight = (heat.astype(np.float32) * (opacity / 255.0))[..., None]
+    return (frame * (1.0 - weight) + colored * weight).astype(np.uint8)
@@ -0,0 +1,209 @@
+"""Метрики стадий камер: скользящие гистограммы задержек и экспорт в формате Prometheus.
+
+Запись в гистограмму — поиск корзины и пара инкрементов без блокировок
+(у каждой гистограммы один пишущий поток — поток своей стадии), поэтому
+замеры включены всегда.
+"""
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+ROLLING_WINDOW = 10.0  # Секунд в окне скользящих перцентилей (хранятся два окна)
+PERCENTILES = (50, 90, 99)
+
+
+class StageHistogram:
+    """Гистограмма задержек одной стадии: накопительная для экспорта и скользящая для панели."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS, window=ROLLING_WINDOW):
+        self.buckets = buckets
+        self.window = window
+        self.counts = [0] * (len(buckets) + 1)  # Последняя корзина — больше всех границ
+        self.count = 0
+        self.sum = 0.0  # Секунды
+        self._current = [0] * (len(buckets) + 1)
+        self._previous = [0] * (len(buckets) + 1)
+        self._window_start = time.monotonic()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds * 1000.0)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        now = time.monotonic()
+        if now - self._window_start >= self.window:
+            self._previous = self._current if now - self._window_start < 2 * self.window else [0] * len(self.counts)
+            self._current = [0] * len(self.counts)
+            self._window_start = now
+        self._current[index] += 1
+
+    def recent_counts(self):
+        """Число замеров по корзинам за последние одно-два окна."""
+        return [a + b for a, b in zip(self._current, self._previous)]
+
+    def percentile(self, q, counts=None):
+        """Оценка перцентиля в миллисекундах (линейно внутри корзины) или None без данных."""
+        counts = self.recent_counts() if counts is None else counts
+        total = sum(counts)
+        if not total:
+            return None
+        rank = total * q / 100.0
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1] * 2
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return float(self.buckets[-1])
+
+    def snapshot(self):
+        """Перцентили за скользящее окно и общее число замеров."""
+        counts = self.recent_counts()
+        summary = {f'p{q}': self.percentile(q, counts) for q in PERCENTILES}
+        summary['count'] = self.count
+        return summary
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def render_prometheus(workers, alert_stats=None):
+    """Текст метрик в формате Prometheus по словарю {имя камеры: CameraWorker}.
+
+    alert_stats — счетчики приемников оповещений (AlertBus.stats()).
+    """
+    # Снимок словаря: камеры добавляются и удаляются на ходу (CameraManager.apply_profile) из другого потока
+    cameras = sorted(list(workers.items()))
+    lines = [
+        "# HELP nexora_stage_latency_seconds Время обработки кадра стадией",
+        "# TYPE nexora_stage_latency_seconds histogram",
+    ]
+    for name, worker in cameras:
+        for stage, histogram in worker.histograms.items():
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"nexora_stage_latency_seconds_bucket{{{_labels(camera=name, stage=stage, le=bound / 1000)}}}"
+                             f" {cumulative}")
+            lines.append(f"nexora_stage_latency_seconds_bucket{{{_labels(camera=name, stage=stage, le='+Inf')}}}"
+                         f" {histogram.count}")
+            lines.append(f"nexora_stage_latency_seconds_sum{{{_labels(camera=name, stage=stage)}}} {histogram.sum:.6f}")
+            lines.append(f"nexora_stage_latency_seconds_count{{{_labels(camera=name, stage=stage)}}} {histogram.count}")
+
+    counters = (
+        ('nexora_frames_total', "Кадров обработано стадией",
+         {'capture': 'captured', 'subcapture': 'sub_captured', 'detect': 'detected', 'display': 'displayed',
+          'record': 'recorded'}),
+        ('nexora_frames_dropped_total', "Кадров пропущено стадией из-за отставания",
+         {'detect': 'detect_dropped', 'display': 'display_dropped', 'record': 'record_dropped'}),
+        ('nexora_frames_idle_skipped_total', "Кадров пропущено в покое: без декодирования (grab) или без анализа",
+         {'capture': 'grabbed', 'subcapture': 'sub_grabbed', 'detect': 'idle_skipped'}),
+    )
+    for metric, help_text, keys in counters:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        for name, worker in cameras:
+            for stage, key in keys.items():
+                lines.append(f"{metric}{{{_labels(camera=name, stage=stage)}}} {worker.counters[key]}")
+
+    lines += ["# HELP nexora_motion_events_total Событий движения (после подавления дребезга)",
+              "# TYPE nexora_motion_events_total counter"]
+    lines += [f"nexora_motion_events_total{{{_labels(camera=name)}}} {worker.counters['events']}"
+              for name, worker in cameras]
+
+    lines += ["# HELP nexora_reconnects_total Переподключений к источнику", "# TYPE nexora_reconnects_total counter"]
+    lines += [f"nexora_reconnects_total{{{_labels(camera=name)}}} {worker.counters['reconnects']}"
+              for name, worker in cameras]
+
+    lines += ["# HELP nexora_outage_seconds_total Суммарная длительность завершившихся обрывов потока",
+              "# TYPE nexora_outage_seconds_total counter"]
+    lines += [f"nexora_outage_seconds_total{{{_labels(camera=name)}}} {worker.outage['total']:.3f}"
+              for name, worker in cameras]
+    lines += ["# HELP nexora_outage_last_seconds Длительность последнего обрыва потока",
+              "# TYPE nexora_outage_last_seconds gauge"]
+    lines += [f"nexora_outage_last_seconds{{{_labels(camera=name)}}} {worker.outage['last']:.3f}"
+              for name, worker in cameras]
+    lines += ["# HELP nexora_outage_current_seconds Длительность текущего обрыва (0 — поток идет)",
+              "# TYPE nexora_outage_current_seconds gauge"]
+    lines += [f"nexora_outage_current_seconds{{{_labels(camera=name)}}} {worker.outage_stats()['current']:.3f}"
+              for name, worker in cameras]
+
+    lines += ["# HELP nexora_substream_down Подпоток детекции оборван (1): детекция стоит, основной поток работает",
+              "# TYPE nexora_substream_down gauge"]
+    lines += [f"nexora_substream_down{{{_labels(camera=name)}}} {int(worker.substream_down)}"
+              for name, worker in cameras]
+
+    lines += ["# HELP nexora_capture_fps Частота захвата кадров", "# TYPE nexora_capture_fps gauge"]
+    lines += [f"nexora_capture_fps{{{_labels(camera=name)}}} {worker.fps:.3f}" for name, worker in cameras]
+
+    lines += ["# HELP nexora_cpu_percent Загрузка CPU потоком стадии", "# TYPE nexora_cpu_percent gauge"]
+    for name, worker in cameras:
+        for stage, cpu in sorted(worker.stage_cpu.items()):
+            lines.append(f"nexora_cpu_percent{{{_labels(camera=name, stage=stage)}}} {cpu:.3f}")
+
+    lines += ["# HELP nexora_cpu_saved_percent Оценка CPU, сэкономленного детекцией на частоте покоя",
+              "# TYPE nexora_cpu_saved_percent gauge"]
+    lines += [f"nexora_cpu_saved_percent{{{_labels(camera=name)}}} {worker.cpu_saved:.3f}"
+              for name, worker in cameras]
+
+    lines += ["# HELP nexora_up Камера работает", "# TYPE nexora_up gauge"]
+    lines += [f"nexora_up{{{_labels(camera=name)}}} {int(worker.is_alive())}" for name, worker in cameras]
+
+    if alert_stats:
+        lines += ["# HELP nexora_alerts_total Оповещений приемника: отправлено, подавлено паузой, отброшено, ошибки",
+                  "# TYPE nexora_alerts_total counter"]
+        for sink, counters in sorted(alert_stats.items()):
+            lines += [f"nexora_alerts_total{{{_labels(sink=sink, result=result)}}} {count}"
+                      for result, count in counters.items()]
+    return '\n'.join(lines) + '\n'
+
+
+def write_metrics_file(path, workers, alert_stats=None):
+    """Атомарно перезаписывает файл метрик (для node_exporter textfile collector и т. п.)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(render_prometheus(workers, alert_stats))
+    os.replace(tmp_path, path)
+
+
+class MetricsServer:
+    """HTTP-эндпоинт /metrics в фоновом потоке."""
+
+    def __init__(self, manager, port, host='127.0.0.1'):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = render_prometheus(manager.workers, manager.alert_bus.stats()).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True)
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
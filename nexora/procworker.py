@@ -0,0 +1,279 @@
+"""Камера в отдельном процессе: захват и детекция вне процесса интерфейса.
+
+В потоковом режиме все камеры делят один интерпретатор с Tk: части
+детекции, которые держат GIL (циклы по контурам, трекер, очереди), идут
+по очереди, и при нескольких камерах интерфейс подтормаживает. В режиме
+процессов захват и детекция каждой камеры работают в дочернем процессе
+(тот же CameraWorker, что и в потоковом режиме), а в процессе интерфейса
+остаются только отображение и запись клипов:
+
+- кадры основного потока дочерний процесс декодирует прямо в слоты
+  SharedFrameRing в разделяемой памяти — без сериализации;
+- события движения, ключевые кадры, журнал и раз в секунду статистика
+  идут обратно через multiprocessing.Queue;
+- новый снимок профиля и команда остановки — через вторую очередь.
+
+Аварийное завершение процесса (падение декодера на битом потоке) не
+задевает остальные камеры: процесс перезапускается с растущей паузой.
+"""
+import multiprocessing
+import threading
+import time
+
+import cv2
+
+from nexora.alerts import AlertBus
+from nexora.engine import (
+    STABLE_CONNECTION, STATS_INTERVAL, CameraWorker, CompiledProfile, DetectionScheduler, ReconnectBackoff
+)
+from nexora.framebuffer import FrameRing, SharedFrameRing
+from nexora.heatmap import heatmap_path, load_heatmap
+
+PROCESS_STOP_TIMEOUT = 5.0  # Дольше этого остановка не ждет процесс камеры, затем он завершается принудительно
+PROCESS_POLL_INTERVAL = 0.5
+# Счетчики, которые ведет дочерний процесс; после перезапуска процесса они продолжают расти от прежних значений
+CHILD_COUNTERS = ('captured', 'detected', 'sub_captured', 'detect_dropped', 'reconnects', 'grabbed', 'sub_grabbed',
+                  'idle_skipped')
+CHILD_STAGES = ('decode', 'subdecode', 'detect')
+
+
+class _KeyframeSender:
+    """Передает ключевые кадры событий в ThumbnailCache процесса интерфейса."""
+
+    def __init__(self, events):
+        self.events = events
+
+    def put(self, key, keyframe):
+        self.events.put(('keyframe', key, keyframe))
+
+
+class _ChildWorker(CameraWorker):
+    """Часть камеры внутри дочернего процесса: кадры — в общий буфер, события — родителю."""
+
+    def __init__(self, name, settings, scheduler, ring, events, publish_frames, heatmaps_dir, keyframes):
+        super().__init__(name, settings, scheduler, events, alert_bus=AlertBus(),
+                         thumbnails=_KeyframeSender(events) if keyframes else None, heatmaps_dir=heatmaps_dir)
+        self.ring = self.detect_ring = ring
+        self.publish_frames = publish_frames
+
+    def _publish_event(self, event):
+        self.message_queue.put(('event', dict(event)))
+
+    def state(self):
+        """Состояние для процесса интерфейса (см. ProcessCameraWorker._apply_state)."""
+        return {
+            'status': self.status,
+            'substream_down': self.substream_down,
+            'fps': self.fps,
+            'source_fps': self.source_fps,
+            'detect_fps': self.detect_fps,
+            'stage_cpu': dict(self.stage_cpu),
+            'idle': self.idle,
+            'cpu_saved': self.cpu_saved,
+            'counters': {key: self.counters[key] for key in CHILD_COUNTERS},
+            'histograms': {stage: self.histograms[stage] for stage in CHILD_STAGES},
+            'outage': dict(self.outage),
+        }
+
+
+def run_camera_process(name, settings, ring_name, events, control, publish_frames, heatmaps_dir, keyframes,
+                       threads, max_concurrent, slots):
+    """Точка входа дочернего процесса камеры.
+
+    slots — общий для процессов камер семафор DetectionScheduler: предел
+    одновременных детекций действует и в режиме процессов.
+    """
+    cv2.setNumThreads(threads)
+    ring = SharedFrameRing(ring_name)
+    scheduler = DetectionScheduler(max_concurrent, slots)
+    worker = _ChildWorker(name, settings, scheduler, ring, events, publish_frames, heatmaps_dir, keyframes)
+
+    def listen():
+        while True:
+            command, *args = control.get()
+            if command == 'settings':
+                worker.apply_settings(args[0])
+            elif command == 'stop':
+                worker.stop()
+                break
+
+    threading.Thread(target=listen, name=f"control-{name}", daemon=True).start()
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(STATS_INTERVAL)
+            events.put(('state', worker.state()))
+    finally:
+        events.put(('state', worker.state()))
+        ring.release()
+
+
+class ProcessCameraWorker(CameraWorker):
+    """Камера профиля, у которой захват и детекция работают в дочернем процессе.
+
+    Снаружи ведет себя как CameraWorker: те же stats(), счетчики, гистограммы
+    и методы управления. Отображение и запись читают кадры из SharedFrameRing
+    в потоках этого процесса. Процесс запускается методом spawn на всех
+    платформах — fork процесса с потоками и Tk небезопасен.
+    """
+
+    def __init__(self, name, settings, scheduler, message_queue, on_frame=None, clip_writer=None,
+                 display_fps=0, alert_bus=None, thumbnails=None, heatmaps_dir=None, threads=1):
+        super().__init__(name, settings, scheduler, message_queue, on_frame, clip_writer, display_fps, alert_bus,
+                         thumbnails)
+        self.heatmaps_dir = heatmaps_dir  # Карту копит и сохраняет дочерний процесс
+        self.threads = threads
+        self.process = None
+        self.counters['restarts'] = 0
+        self._control = None
+        self._counter_base = dict.fromkeys(CHILD_COUNTERS, 0)
+        self._stats_wall = time.perf_counter()
+        self._stats_cpu = {}
+
+    def stop(self):
+        super().stop()
+        control = self._control
+        if control is not None:
+            control.put(('stop',))
+
+    def _create_detector(self, heatmaps_dir):
+        return None  # Детектор и модель фона живут в дочернем процессе
+
+    def apply_settings(self, settings):
+        """Подменяет профиль здесь (запись) и в дочернем процессе (захват и детекция)."""
+        profile = CompiledProfile(settings)
+        if profile.restart_needed(self.profile):
+            return False
+        self.profile = profile
+        control = self._control
+        if control is not None:
+            control.put(('settings', dict(self.settings)))
+        return True
+
+    def heatmap(self):
+        """Тепловая карта, последней сохраненная дочерним процессом, или None."""
+        return load_heatmap(heatmap_path(self.heatmaps_dir, self.name)) if self.heatmaps_dir else None
+
+    def _capture_loop(self):
+        context = multiprocessing.get_context('spawn')
+        ring = SharedFrameRing()
+        self.ring = self.detect_ring = ring
+        events = context.Queue()
+        pump = threading.Thread(target=self._pump, args=(events,), name=f"events-{self.name}", daemon=True)
+        pump.start()
+        stages = []
+        try:
+            if self.on_frame is not None:
+                stages.append(self._start_stage("display", self._display_loop))
+            if self.clip_writer is not None:
+                stages.append(self._start_stage("record", self._record_loop))
+            backoff = ReconnectBackoff(self._stop_event)
+            while self.is_running:
+                started = time.monotonic()
+                exitcode = self._run_process(context, ring.name, events)
+                if not self.is_running or exitcode == 0:
+                    break
+                # Процесс упал (декодер, нехватка памяти) — остальные камеры работают, эту перезапускаем
+                self.counters['restarts'] += 1
+                self._counter_base = {key: self.counters[key] for key in CHILD_COUNTERS}
+                self.status = "перезапуск"
+                self.motion_detected = False
+                if time.monotonic() - started >= STABLE_CONNECTION:
+                    backoff.reset()
+                self._log("log", f"Процесс камеры завершился с кодом {exitcode}, "
+                                 f"перезапуск через {backoff.delay:.0f} с")
+                backoff.wait()
+        except Exception as e:
+            self.status = "ошибка"
+            self._log("error", f"Ошибка процесса камеры:\n{str(e)}")
+        finally:
+            self.is_running = False
+            ring.close()
+            for stage in stages:
+                stage.join()
+            events.put(None)
+            pump.join()
+            events.close()
+            # Последний кадр остается доступным (редактор зон) и после освобождения общей памяти
+            last_frame = ring.snapshot()
+            self.ring = self.detect_ring = FrameRing()
+            if last_frame is not None:
+                self.ring.publish(last_frame)
+            self.ring.close()
+            ring.release()
+            self.fps = 0.0
+            self.detect_fps = 0.0
+            self.cpu = 0.0
+            self.stage_cpu = {}
+            self.motion_detected = False
+            self.substream_down = False
+            if self.status in ("работает", "запуск", "перезапуск"):
+                self.status = "остановлена"
+
+    def _run_process(self, context, ring_name, events):
+        """Запускает процесс камеры и ждет его завершения; возвращает код выхода."""
+        self._control = context.Queue()
+        process = context.Process(
+            target=run_camera_process, name=f"camera-{self.name}", daemon=True,
+            args=(self.name, dict(self.settings), ring_name, events, self._control, self.publish_frames,
+                  self.heatmaps_dir, self.thumbnails is not None, self.threads, self.scheduler.max_concurrent,
+                  self.scheduler.process_slots()))
+        process.start()
+        self.process = process
+        if not self.is_running:  # stop() мог прийти до создания очереди команд
+            self._control.put(('stop',))
+        stop_requested = None
+        while True:
+            process.join(PROCESS_POLL_INTERVAL)
+            if not process.is_alive():
+                break
+            if not self.is_running:
+                stop_requested = stop_requested or time.monotonic()
+                if time.monotonic() - stop_requested > PROCESS_STOP_TIMEOUT:
+                    # Поток захвата завис в чтении мертвого источника — процесс можно просто завершить
+                    process.terminate()
+                    process.join()
+                    break
+        self._control = None
+        return process.exitcode
+
+    def _pump(self, events):
+        """Разбирает сообщения дочернего процесса."""
+        while True:
+            message = events.get()
+            if message is None:
+                break
+            kind = message[0]
+            if kind == 'event':
+                event = message[1]
+                self.motion_detected = event['end'] is None
+                self._publish_event(event)
+            elif kind == 'keyframe':
+                self.thumbnails.put(message[1], message[2])
+            elif kind == 'state':
+                self._apply_state(message[1])
+            else:
+                self.message_queue.put(message)
+
+    def _apply_state(self, state):
+        """Переносит статистику дочернего процесса и добавляет загрузку потоков отображения и записи."""
+        self.status = state['status']
+        self.substream_down = state['substream_down']
+        self.fps = state['fps']
+        self.source_fps = state['source_fps']
+        self.detect_fps = state['detect_fps']
+        self.idle = state['idle']
+        self.cpu_saved = state['cpu_saved']
+        self.outage = state['outage']
+        self.histograms.update(state['histograms'])
+        for key, value in state['counters'].items():
+            self.counters[key] = self._counter_base[key] + value
+        now = time.perf_counter()
+        elapsed = now - self._stats_wall
+        stage_cpu = dict(self._stage_cpu)
+        local_cpu = {stage: 100.0 * (cpu - self._stats_cpu.get(stage, 0.0)) / elapsed
+                     for stage, cpu in stage_cpu.items()} if elapsed > 0 else {}
+        self._stats_wall = now
+        self._stats_cpu = stage_cpu
+        self.stage_cpu = {**state['stage_cpu'], **local_cpu}
+        self.cpu = sum(self.stage_cpu.values())
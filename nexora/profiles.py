@@ -0,0 +1,349 @@
+"""Чтение и запись профилей камер в INI-файл без зависимости от GUI."""
+import configparser
+import logging
+import os
+import stat
+import tempfile
+
+from nexora.background import DEFAULT_BACKGROUND_MODEL, DEFAULT_LEARNING_RATE
+from nexora.capture import DEFAULT_CAPTURE_BACKEND
+from nexora.engine import (
+    DEFAULT_ANALYSIS_WIDTH, DEFAULT_DETECTION_FPS, DEFAULT_IDLE_DETECTION_FPS, DEFAULT_PRECHECK_THRESHOLD,
+    MOTION_DEFAULT_SENSITIVITY
+)
+from nexora.events import DEFAULT_EVENT_COOLDOWN, DEFAULT_EVENT_GAP, DEFAULT_MIN_DURATION, DEFAULT_TRIGGER_FRAMES
+from nexora.recorder import DEFAULT_POST_ROLL, DEFAULT_PRE_ROLL
+
+logger = logging.getLogger('nexora')
+
+PROFILE_SECTION_PREFIX = 'Profile_'
+PROFILE_POLL_INTERVAL = 1.0  # Период проверки файла профилей на правку извне, секунды
+CONFIG_KEY_CONNECTION_MODE = 'connection_mode'
+CONFIG_KEY_URL = 'url'
+CONFIG_KEY_IP = 'ip'
+CONFIG_KEY_PORT = 'port'
+CONFIG_KEY_USERNAME = 'username'
+CONFIG_KEY_PASSWORD = 'password'
+CONFIG_KEY_MOTION_SENSITIVITY = 'motion_sensitivity'
+CONFIG_KEY_STREAM_PATH = 'stream_path'
+CONFIG_KEY_SUBSTREAM_URL = 'substream_url'  # Подпоток для детекции (режим URL)
+CONFIG_KEY_SUBSTREAM_PATH = 'substream_path'  # Путь подпотока для детекции (режим параметров)
+CONFIG_KEY_CAPTURE_BACKEND = 'capture_backend'  # Бэкенд захвата OpenCV
+CONFIG_KEY_RTSP_TRANSPORT = 'rtsp_transport'  # Транспорт RTSP: tcp, udp или пусто
+CONFIG_KEY_CAPTURE_OPTIONS = 'capture_options'  # Параметры FFmpeg или конвейер GStreamer
+CONFIG_KEY_IGNORE_MASK = 'ignore_mask'  # Зоны игнорирования
+CONFIG_KEY_DETECTION_MASK = 'detection_mask'  # Зоны детекции
+CONFIG_KEY_IGNORE_POLYGONS = 'ignore_polygons'  # Многоугольные зоны игнорирования
+CONFIG_KEY_DETECTION_POLYGONS = 'detection_polygons'  # Многоугольные зоны детекции
+CONFIG_KEY_SOUND_FILE = 'sound_file'  # Звуковой файл
+CONFIG_KEY_ENABLED = 'enabled'  # Участвует ли профиль в одновременном запуске
+CONFIG_KEY_BACKGROUND_MODEL = 'background_model'  # Модель фона детектора
+CONFIG_KEY_LEARNING_RATE = 'learning_rate'  # Скорость обучения модели фона
+CONFIG_KEY_ANALYSIS_WIDTH = 'analysis_width'  # Ширина кадра для анализа движения
+CONFIG_KEY_DETECTION_FPS = 'detection_fps'  # Целевая частота детекции, кадров в секунду
+CONFIG_KEY_IDLE_DETECTION_FPS = 'idle_detection_fps'  # Частота детекции, пока в кадре ничего не движется
+CONFIG_KEY_PRECHECK_THRESHOLD = 'precheck_threshold'  # Изменившихся пикселей клетки предпроверки, %, без движения
+CONFIG_KEY_EVENT_TRIGGER_FRAMES = 'event_trigger_frames'  # Кадров с движением подряд для начала события
+CONFIG_KEY_EVENT_MIN_DURATION = 'event_min_duration'  # Минимальная длительность движения до события, секунды
+CONFIG_KEY_EVENT_GAP = 'event_gap'  # Пауза, завершающая событие, секунды
+CONFIG_KEY_EVENT_COOLDOWN = 'event_cooldown'  # Пауза после события без новых событий, секунды
+CONFIG_KEY_RECORD_CLIPS = 'record_clips'  # Сохранять клипы при движении
+CONFIG_KEY_PRE_ROLL = 'pre_roll'  # Секунд записи до движения
+CONFIG_KEY_POST_ROLL = 'post_roll'  # Секунд записи после движения
+
+
+def parse_mask(mask_str):
+    """Парсит строку маски в список прямоугольников."""
+    rects = []
+    if mask_str:
+        try:
+            for part in mask_str.split(';'):
+                if part.strip():
+                    coords = list(map(int, part.strip().split(',')))
+                    if len(coords) == 4:
+                        rects.append(tuple(coords))
+        except Exception as e:
+            logger.warning("Ошибка загрузки маски: %s", e)
+    return rects
+
+
+def serialize_mask(mask_list):
+    """Преобразует список прямоугольников в строку маски."""
+    return ';'.join(f"{x1},{y1},{x2},{y2}" for (x1, y1, x2, y2) in mask_list)
+
+
+def parse_polygons(polygons_str):
+    """Парсит строку вида "x,y x,y x,y;..." в список многоугольников."""
+    polygons = []
+    if polygons_str:
+        try:
+            for part in polygons_str.split(';'):
+                points = [tuple(map(int, point.split(','))) for point in part.split()]
+                if len(points) >= 3 and all(len(point) == 2 for point in points):
+                    polygons.append(points)
+        except Exception as e:
+            logger.warning("Ошибка загрузки многоугольных зон: %s", e)
+    return polygons
+
+
+def serialize_polygons(polygons):
+    """Преобразует список многоугольников в строку."""
+    return ';'.join(' '.join(f"{x},{y}" for (x, y) in polygon) for polygon in polygons)
+
+
+def _get_int(values, key, default):
+    value = values.get(key)
+    return int(value) if value else default
+
+
+def _get_float(values, key, default):
+    value = values.get(key)
+    return float(value) if value else default
+
+
+def _get_bool(values, key, default):
+    value = values.get(key)
+    if not value:
+        return default
+    try:
+        return configparser.ConfigParser.BOOLEAN_STATES[value.lower()]
+    except KeyError:
+        raise ValueError(f"Не логическое значение {key}: {value}") from None
+
+
+def read_profile(section):
+    """Настройки профиля из секции INI-файла (или словаря ее строковых значений).
+
+    Ошибочное число или логическое значение вызывает ValueError.
+    """
+    values = dict(section)
+    return {
+        'connection_mode': values.get(CONFIG_KEY_CONNECTION_MODE, 'url'),
+        'camera_url': values.get(CONFIG_KEY_URL, '0'),
+        'ip': values.get(CONFIG_KEY_IP, '192.168.1.64'),
+        'port': values.get(CONFIG_KEY_PORT, '554'),
+        'username': values.get(CONFIG_KEY_USERNAME, 'admin'),
+        'password': values.get(CONFIG_KEY_PASSWORD, ''),
+        'stream_path': values.get(CONFIG_KEY_STREAM_PATH, '/stream1'),
+        'substream_url': values.get(CONFIG_KEY_SUBSTREAM_URL, ''),
+        'substream_path': values.get(CONFIG_KEY_SUBSTREAM_PATH, ''),
+        'capture_backend': values.get(CONFIG_KEY_CAPTURE_BACKEND, DEFAULT_CAPTURE_BACKEND),
+        'rtsp_transport': values.get(CONFIG_KEY_RTSP_TRANSPORT, ''),
+        'capture_options': values.get(CONFIG_KEY_CAPTURE_OPTIONS, ''),
+        'motion_sensitivity': _get_int(values, CONFIG_KEY_MOTION_SENSITIVITY, MOTION_DEFAULT_SENSITIVITY),
+        'sound_file': values.get(CONFIG_KEY_SOUND_FILE, ''),
+        'enabled': _get_bool(values, CONFIG_KEY_ENABLED, True),
+        'background_model': values.get(CONFIG_KEY_BACKGROUND_MODEL, DEFAULT_BACKGROUND_MODEL),
+        'learning_rate': _get_float(values, CONFIG_KEY_LEARNING_RATE, DEFAULT_LEARNING_RATE),
+        'analysis_width': _get_int(values, CONFIG_KEY_ANALYSIS_WIDTH, DEFAULT_ANALYSIS_WIDTH),
+        'detection_fps': _get_float(values, CONFIG_KEY_DETECTION_FPS, DEFAULT_DETECTION_FPS),
+        'idle_detection_fps': _get_float(values, CONFIG_KEY_IDLE_DETECTION_FPS, DEFAULT_IDLE_DETECTION_FPS),
+        'precheck_threshold': _get_float(values, CONFIG_KEY_PRECHECK_THRESHOLD, DEFAULT_PRECHECK_THRESHOLD),
+        'event_trigger_frames': _get_int(values, CONFIG_KEY_EVENT_TRIGGER_FRAMES, DEFAULT_TRIGGER_FRAMES),
+        'event_min_duration': _get_float(values, CONFIG_KEY_EVENT_MIN_DURATION, DEFAULT_MIN_DURATION),
+        'event_gap': _get_float(values, CONFIG_KEY_EVENT_GAP, DEFAULT_EVENT_GAP),
+        'event_cooldown': _get_float(values, CONFIG_KEY_EVENT_COOLDOWN, DEFAULT_EVENT_COOLDOWN),
+        'record_clips': _get_bool(values, CONFIG_KEY_RECORD_CLIPS, False),
+        'pre_roll': _get_float(values, CONFIG_KEY_PRE_ROLL, DEFAULT_PRE_ROLL),
+        'post_roll': _get_float(values, CONFIG_KEY_POST_ROLL, DEFAULT_POST_ROLL),
+        'ignore_mask': parse_mask(values.get(CONFIG_KEY_IGNORE_MASK, '')),
+        'detection_mask': parse_mask(values.get(CONFIG_KEY_DETECTION_MASK, '')),
+        'ignore_polygons': parse_polygons(values.get(CONFIG_KEY_IGNORE_POLYGONS, '')),
+        'detection_polygons': parse_polygons(values.get(CONFIG_KEY_DETECTION_POLYGONS, '')),
+    }
+
+
+def default_profile():
+    """Профиль со значениями по умолчанию."""
+    return read_profile({})
+
+
+def profile_to_section(settings):
+    """Значения секции INI-файла для профиля."""
+    return {
+        CONFIG_KEY_CONNECTION_MODE: settings['connection_mode'],
+        CONFIG_KEY_URL: str(settings['camera_url']),
+        CONFIG_KEY_IP: str(settings['ip']),
+        CONFIG_KEY_PORT: str(settings['port']),
+        CONFIG_KEY_USERNAME: str(settings['username']),
+        CONFIG_KEY_PASSWORD: str(settings['password']),
+        CONFIG_KEY_STREAM_PATH: str(settings['stream_path']),
+        CONFIG_KEY_SUBSTREAM_URL: str(settings.get('substream_url', '')),
+        CONFIG_KEY_SUBSTREAM_PATH: str(settings.get('substream_path', '')),
+        CONFIG_KEY_CAPTURE_BACKEND: str(settings.get('capture_backend', DEFAULT_CAPTURE_BACKEND)),
+        CONFIG_KEY_RTSP_TRANSPORT: str(settings.get('rtsp_transport', '')),
+        CONFIG_KEY_CAPTURE_OPTIONS: str(settings.get('capture_options', '')),
+        CONFIG_KEY_MOTION_SENSITIVITY: str(settings['motion_sensitivity']),
+        CONFIG_KEY_SOUND_FILE: str(settings['sound_file']),
+        CONFIG_KEY_ENABLED: str(settings.get('enabled', True)),
+        CONFIG_KEY_BACKGROUND_MODEL: str(settings.get('background_model', DEFAULT_BACKGROUND_MODEL)),
+        CONFIG_KEY_LEARNING_RATE: str(settings.get('learning_rate', DEFAULT_LEARNING_RATE)),
+        CONFIG_KEY_ANALYSIS_WIDTH: str(settings.get('analysis_width', DEFAULT_ANALYSIS_WIDTH)),
+        CONFIG_KEY_DETECTION_FPS: str(settings.get('detection_fps', DEFAULT_DETECTION_FPS)),
+        CONFIG_KEY_IDLE_DETECTION_FPS: str(settings.get('idle_detection_fps', DEFAULT_IDLE_DETECTION_FPS)),
+        CONFIG_KEY_PRECHECK_THRESHOLD: str(settings.get('precheck_threshold', DEFAULT_PRECHECK_THRESHOLD)),
+        CONFIG_KEY_EVENT_TRIGGER_FRAMES: str(settings.get('event_trigger_frames', DEFAULT_TRIGGER_FRAMES)),
+        CONFIG_KEY_EVENT_MIN_DURATION: str(settings.get('event_min_duration', DEFAULT_MIN_DURATION)),
+        CONFIG_KEY_EVENT_GAP: str(settings.get('event_gap', DEFAULT_EVENT_GAP)),
+        CONFIG_KEY_EVENT_COOLDOWN: str(settings.get('event_cooldown', DEFAULT_EVENT_COOLDOWN)),
+        CONFIG_KEY_RECORD_CLIPS: str(settings.get('record_clips', False)),
+        CONFIG_KEY_PRE_ROLL: str(settings.get('pre_roll', DEFAULT_PRE_ROLL)),
+        CONFIG_KEY_POST_ROLL: str(settings.get('post_roll', DEFAULT_POST_ROLL)),
+        CONFIG_KEY_IGNORE_MASK: serialize_mask(settings['ignore_mask']),
+        CONFIG_KEY_DETECTION_MASK: serialize_mask(settings['detection_mask']),
+        CONFIG_KEY_IGNORE_POLYGONS: serialize_polygons(settings.get('ignore_polygons', [])),
+        CONFIG_KEY_DETECTION_POLYGONS: serialize_polygons(settings.get('detection_polygons', [])),
+    }
+
+
+def _stamp(path):
+    """Признак версии файла: время изменения, размер и inode; None, если файла нет."""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return info.st_mtime_ns, info.st_size, info.st_ino
+
+
+class ProfileStore:
+    """Файл профилей: атомарная запись, обновление отдельных профилей и слежение за правкой извне.
+
+    Разобранный файл (вместе с чужими секциями) хранится в памяти, поэтому
+    сохранение профиля не перечитывает файл, а профиль без изменений не
+    записывается вовсе. Файл пишется во временный рядом и подменяется
+    os.replace: читатель (другой процесс, внешний инструмент) видит либо
+    старую, либо новую версию целиком. poll() по времени изменения, размеру
+    и inode замечает правку файла извне (раз в PROFILE_POLL_INTERVAL
+    секунд — один os.stat) и возвращает только изменившиеся профили.
+
+    Методы вызываются из одного потока.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._config = configparser.ConfigParser(interpolation=None)  # Значения хранятся как есть, «%» допустим
+        self._sections = {}  # {имя профиля: значения секции} — по ним видно, какие профили изменились
+        self._profiles = {}
+        self._changes = {}  # Замеченные, но еще не отданные poll() изменения
+        self._stamp = None
+
+    def load(self):
+        """Читает файл целиком; возвращает {имя: настройки} (копию)."""
+        self._read()
+        self._changes = {}
+        return {name: dict(settings) for name, settings in self._profiles.items()}
+
+    def update(self, profiles):
+        """Сохраняет профили {имя: настройки}; остальные профили и секции файла не меняются.
+
+        Файл записывается, только если хотя бы один профиль изменился.
+        Ошибки ввода-вывода пробрасываются.
+        """
+        self._refresh()
+        changed = False
+        for name, settings in profiles.items():
+            self._changes.pop(name, None)  # Правка извне того же профиля перезаписывается этой
+            section = profile_to_section(settings)
+            if self._sections.get(name) == section:
+                continue
+            self._config[PROFILE_SECTION_PREFIX + name] = section
+            self._sections[name] = section
+            self._profiles[name] = read_profile(section)
+            changed = True
+        if changed:
+            self._write()
+        return changed
+
+    def remove(self, names):
+        """Удаляет профили из файла. Ошибки ввода-вывода пробрасываются."""
+        self._refresh()
+        changed = False
+        for name in names:
+            self._changes.pop(name, None)
+            if self._config.remove_section(PROFILE_SECTION_PREFIX + name):
+                del self._sections[name]
+                self._profiles.pop(name, None)
+                changed = True
+        if changed:
+            self._write()
+        return changed
+
+    def poll(self):
+        """Изменения файла извне с прошлого вызова: {имя: новые настройки или None, если профиль удален}."""
+        self._refresh()
+        changes, self._changes = self._changes, {}
+        return changes
+
+    def _refresh(self):
+        if _stamp(self.path) == self._stamp:
+            return
+        previous = self._sections
+        self._read()
+        for name in previous.keys() | self._sections.keys():
+            if previous.get(name) != self._sections.get(name):
+                settings = self._profiles.get(name)
+                self._changes[name] = None if settings is None else dict(settings)
+
+    def _read(self):
+        # Признак снимается до чтения: правка во время чтения будет замечена следующим poll()
+        self._stamp = _stamp(self.path)
+        config = configparser.ConfigParser(interpolation=None)
+        if self._stamp is not None:
+            config.read(self.path, encoding='utf-8')
+        sections, profiles = {}, {}
+        for section_name in config.sections():
+            if not section_name.startswith(PROFILE_SECTION_PREFIX):
+                continue
+            name = section_name[len(PROFILE_SECTION_PREFIX):]
+            values = dict(config.items(section_name, raw=True))
+            if self._sections.get(name) == values:
+                profiles[name] = self._profiles[name]  # Профиль не менялся — заново не разбирается
+            else:
+                try:
+                    profiles[name] = read_profile(values)
+                except ValueError as e:
+                    logger.warning("Ошибка в профиле '%s' в %s: %s", name, self.path, e)
+                    if name not in self._profiles:
+                        continue
+                    # Опечатка при правке извне не останавливает камеру: остается прежняя версия профиля
+                    profiles[name], values = self._profiles[name], self._sections[name]
+            sections[name] = values
+        self._config, self._sections, self._profiles = config, sections, profiles
+
+    def _write(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Уникальное имя временного файла: две программы, сохраняющие профили одновременно,
+        # не пишут в один и тот же файл
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(self.path)}.", suffix='.tmp',
+                                        dir=directory or '.')
+        try:
+            with open(fd, 'w', encoding='utf-8') as f:
+                if os.path.exists(self.path):
+                    # В файле пароли камер — права прежнего файла сохраняются; новый файл
+                    # остается доступным только владельцу, как его создает mkstemp
+                    os.chmod(tmp_path, stat.S_IMODE(os.stat(self.path).st_mode))
+                self._config.write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._stamp = _stamp(self.path)
+
+
+def load_profiles(path):
+    """Загружает профили из INI-файла: {имя: настройки}."""
+    return ProfileStore(path).load()
+
+
+def save_profiles(path, profiles):
+    """Сохраняет профили в INI-файл, не трогая остальные секции. Ошибки ввода-вывода пробрасываются."""
+    store = ProfileStore(path)
+    store.load()
+    store.update(profiles)
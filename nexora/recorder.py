@@ -0,0 +1,195 @@
+"""Запись клипов по движению: буфер предзаписи и фоновый писатель."""
+import os
+import re
+import threading
+import time
+from collections import deque
+from queue import Queue, Empty
+
+import cv2
+import numpy as np
+
+DEFAULT_PRE_ROLL = 5.0  # Секунд видео до начала движения
+DEFAULT_POST_ROLL = 5.0  # Секунд видео после окончания движения
+JPEG_QUALITY = 80
+CLIP_QUEUE_SIZE = 512  # Максимум кадров в очереди писателя; при переполнении клип отбрасывается
+CLIP_FOURCC = 'mp4v'
+CLIP_EXTENSION = '.mp4'
+FALLBACK_CLIP_FPS = 10.0
+
+
+def encode_frame(frame):
+    """Сжимает кадр в JPEG для хранения в памяти."""
+    ok, data = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    return data if ok else None
+
+
+class PreRollBuffer:
+    """Последние N секунд сжатых кадров потока."""
+
+    def __init__(self, seconds=DEFAULT_PRE_ROLL):
+        self.seconds = seconds
+        self._frames = deque()
+
+    def append(self, timestamp, data):
+        self._frames.append((timestamp, data))
+        while self._frames and timestamp - self._frames[0][0] > self.seconds:
+            self._frames.popleft()
+
+    def drain(self):
+        """Забирает все накопленные кадры, очищая буфер."""
+        frames = list(self._frames)
+        self._frames.clear()
+        return frames
+
+
+class Clip:
+    """Клип, который пишется фоновым писателем."""
+
+    def __init__(self, profile_name, path, fps):
+        self.profile_name = profile_name
+        self.path = path
+        self.fps = fps
+        self.dropped = False
+        self.started = time.time()
+
+
+class ClipWriter:
+    """Общий для всех камер фоновый поток записи клипов на диск.
+
+    Камеры кладут сжатые кадры в очередь и никогда не ждут диск: если в ней
+    уже queue_size элементов (медленный диск), текущий клип помечается
+    отброшенным, недописанный файл удаляется, а счетчик clips_dropped растет.
+    Закрытие клипа ставится в очередь сверх этого предела — без ожидания
+    и без потери.
+    """
+
+    def __init__(self, clips_dir, message_queue=None, queue_size=CLIP_QUEUE_SIZE):
+        self.clips_dir = clips_dir
+        self.message_queue = message_queue
+        self.queue_size = queue_size
+        self.clips_written = 0
+        self.clips_dropped = 0
+        self._queue = Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._last_stamp = {}  # {камера: (метка времени последнего клипа, сколько клипов с ней)}
+
+    def _log(self, msg_type, text):
+        if self.message_queue is not None:
+            self.message_queue.put((msg_type, text))
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="clip-writer", daemon=True)
+                self._thread.start()
+
+    def _put(self, clip, item):
+        if clip.dropped:
+            return False
+        if self._queue.qsize() >= self.queue_size:
+            clip.dropped = True
+            self.clips_dropped += 1
+            self._log("log", f"[{clip.profile_name}] Диск не успевает: клип {os.path.basename(clip.path)} отброшен")
+            return False
+        self._queue.put_nowait(item)
+        return True
+
+    def open_clip(self, profile_name, frames, fps=0.0):
+        """Начинает клип с кадров предзаписи [(время, jpeg), ...]; возвращает Clip.
+
+        Частота клипа оценивается по предзаписи; если в ней меньше двух
+        кадров, берется fps — частота потока камеры (0 — неизвестна).
+        """
+        self._ensure_thread()
+        path = self._clip_path(profile_name, frames[0][0] if frames else time.time())
+        fps = fps or FALLBACK_CLIP_FPS
+        if len(frames) > 1 and frames[-1][0] > frames[0][0]:
+            fps = (len(frames) - 1) / (frames[-1][0] - frames[0][0])
+        clip = Clip(profile_name, path, fps)
+        if self._put(clip, ('open', clip, None)):
+            for _, data in frames:
+                if not self._put(clip, ('frame', clip, data)):
+                    break
+        return clip
+
+    def _clip_path(self, profile_name, started):
+        """Имя файла клипа по времени начала с точностью до миллисекунды.
+
+        Клипы одной камеры с одинаковой меткой (файл еще ждет писателя или уже
+        лежит на диске от прежнего запуска) получают суффикс _1, _2, ...
+        и не перезаписывают друг друга.
+        """
+        safe_name = re.sub(r'[^\w.-]+', '_', profile_name) or 'camera'
+        stamp = f"{time.strftime('%Y%m%d_%H%M%S', time.localtime(started))}_{int(started * 1000) % 1000:03d}"
+        base = os.path.join(self.clips_dir, safe_name, f"{safe_name}_{stamp}")
+
+        def numbered(count):
+            return f"{base}_{count}{CLIP_EXTENSION}" if count else base + CLIP_EXTENSION
+
+        with self._lock:
+            last_stamp, count = self._last_stamp.get(safe_name, ('', 0))
+            count = count + 1 if stamp == last_stamp else 0
+            while os.path.exists(numbered(count)):
+                count += 1
+            self._last_stamp[safe_name] = (stamp, count)
+        return numbered(count)
+
+    def write(self, clip, data):
+        return self._put(clip, ('frame', clip, data))
+
+    def close_clip(self, clip):
+        """Завершает клип без ожидания писателя; отброшенный клип писатель удалит сам."""
+        if not clip.dropped:
+            self._queue.put_nowait(('close', clip, None))
+
+    def drain(self, timeout=10.0):
+        """Ждет, пока писатель обработает очередь (при завершении программы)."""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.05)
+
+    def _discard_dropped(self, writers):
+        for clip in [clip for clip in writers if clip.dropped]:
+            writer = writers.pop(clip)
+            if writer is not None:
+                writer.release()
+            if os.path.exists(clip.path):
+                os.remove(clip.path)
+
+    def _run(self):
+        writers = {}  # {клип: cv2.VideoWriter или None до первого кадра}
+        while True:
+            try:
+                action, clip, data = self._queue.get(timeout=1.0)
+            except Empty:
+                self._discard_dropped(writers)
+                continue
+            try:
+                if action == 'open':
+                    writers[clip] = None
+                elif action == 'frame':
+                    if clip.dropped or clip not in writers:
+                        continue
+                    frame = cv2.imdecode(np.asarray(data), cv2.IMREAD_COLOR)
+                    writer = writers[clip]
+                    if writer is None:
+                        os.makedirs(os.path.dirname(clip.path), exist_ok=True)
+                        height, width = frame.shape[:2]
+                        writer = cv2.VideoWriter(clip.path, cv2.VideoWriter_fourcc(*CLIP_FOURCC), clip.fps,
+                                                 (width, height))
+                        writers[clip] = writer
+                    writer.write(frame)
+                elif action == 'close':
+                    writer = writers.pop(clip, None)
+                    if writer is not None:
+                        writer.release()
+                        self.clips_written += 1
+                        self._log("log", f"[{clip.profile_name}] Сохранен клип: {clip.path}")
+            except Exception as e:
+                clip.dropped = True
+                self._log("log", f"[{clip.profile_name}] Ошибка записи клипа: {e}")
+            finally:
+                self._queue.task_done()
+            self._discard_dropped(writers)
@@ -0,0 +1,183 @@
+"""Миниатюры и ключевые кадры событий: снимок в момент пика и LRU-кэш на диске и в памяти.
+
+Детекция уменьшает кадр с наибольшей площадью движения до KEYFRAME_WIDTH
+(не чаще KEYFRAME_INTERVAL на событие) и по окончании события передает
+его кэшу. Сжатие в JPEG, миниатюра и запись на диск выполняются в фоновом
+потоке кэша. Каталог ограничен по объему: при превышении удаляются
+давно не открывавшиеся события. Миниатюры последних просмотренных событий
+держатся в памяти, поэтому страница из сотни превью открывается без чтения
+диска и без декодирования клипов.
+"""
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from queue import Full, Queue
+
+import cv2
+
+logger = logging.getLogger('nexora')
+
+KEYFRAME_WIDTH = 640  # Ширина ключевого кадра события
+THUMBNAIL_WIDTH = 160  # Ширина миниатюры в списке событий
+KEYFRAME_INTERVAL = 0.5  # Не чаще этого ключевой кадр события обновляется при росте пика, секунды
+JPEG_QUALITY = 80
+DEFAULT_DISK_LIMIT = 256 * 1024 * 1024  # Байт на диске под миниатюры и ключевые кадры
+DEFAULT_MEMORY_ITEMS = 1000  # Миниатюр в памяти
+WRITE_QUEUE_SIZE = 64
+KEYFRAME_SUFFIX = '.jpg'
+THUMBNAIL_SUFFIX = '_t.jpg'
+
+
+def make_keyframe(frame, width=KEYFRAME_WIDTH):
+    """Уменьшенная копия кадра для ключевого кадра события."""
+    height, frame_width = frame.shape[:2]
+    if frame_width <= width:
+        return frame.copy()
+    return cv2.resize(frame, (width, max(1, round(height * width / frame_width))), interpolation=cv2.INTER_AREA)
+
+
+def event_key(camera, start):
+    """Имя файлов события: камера и время начала в миллисекундах."""
+    safe_name = re.sub(r'[^\w.-]+', '_', camera) or 'camera'
+    return f"{safe_name}_{int(start * 1000)}"
+
+
+def _encode(image):
+    ok, data = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    return data.tobytes() if ok else None
+
+
+class ThumbnailCache:
+    """Ключевые кадры и миниатюры событий в каталоге с ограничением объема (LRU)."""
+
+    def __init__(self, directory, disk_limit=DEFAULT_DISK_LIMIT, memory_items=DEFAULT_MEMORY_ITEMS):
+        self.directory = directory
+        self.disk_limit = disk_limit
+        self.memory_items = memory_items
+        self.dropped = 0
+        self._memory = OrderedDict()  # {ключ: JPEG миниатюры}
+        self._disk = OrderedDict()  # {ключ: байт на диске}, от давно не открывавшихся к недавним
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._queue = Queue(WRITE_QUEUE_SIZE)
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+        self._thread = threading.Thread(target=self._run, name="thumbnails", daemon=True)
+        self._thread.start()
+
+    def put(self, key, keyframe):
+        """Ставит ключевой кадр события в очередь записи; при переполнении кадр отбрасывается."""
+        try:
+            self._queue.put_nowait((key, keyframe))
+        except Full:
+            self.dropped += 1
+
+    def thumbnail(self, key):
+        """JPEG миниатюры события или None."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                return data
+        data = self._read(key, THUMBNAIL_SUFFIX)
+        if data is not None:
+            with self._lock:
+                self._remember(key, data)
+                self._touch(key)
+        return data
+
+    def keyframe(self, key):
+        """JPEG ключевого кадра события или None."""
+        data = self._read(key, KEYFRAME_SUFFIX)
+        if data is not None:
+            with self._lock:
+                self._touch(key)
+        return data
+
+    def close(self, timeout=None):
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+    def _read(self, key, suffix):
+        try:
+            with open(self._path(key, suffix), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _scan(self):
+        """Восстанавливает порядок LRU по времени изменения файлов (обращение обновляет его)."""
+        entries = {}
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(THUMBNAIL_SUFFIX):
+                key = entry.name[:-len(THUMBNAIL_SUFFIX)]
+            elif entry.name.endswith(KEYFRAME_SUFFIX):
+                key = entry.name[:-len(KEYFRAME_SUFFIX)]
+            else:
+                continue
+            stat = entry.stat()
+            size, mtime = entries.get(key, (0, 0.0))
+            entries[key] = (size + stat.st_size, max(mtime, stat.st_mtime))
+        for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _touch(self, key):
+        """Отмечает событие как недавно открытое (под блокировкой)."""
+        if key in self._disk:
+            self._disk.move_to_end(key)
+            try:
+                os.utime(self._path(key, THUMBNAIL_SUFFIX))
+            except OSError:
+                pass
+
+    def _remember(self, key, data):
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _store(self, key, keyframe):
+        height, width = keyframe.shape[:2]
+        thumbnail = cv2.resize(keyframe, (THUMBNAIL_WIDTH, max(1, round(height * THUMBNAIL_WIDTH / width))),
+                               interpolation=cv2.INTER_AREA) if width > THUMBNAIL_WIDTH else keyframe
+        keyframe_data, thumbnail_data = _encode(keyframe), _encode(thumbnail)
+        if keyframe_data is None or thumbnail_data is None:
+            return
+        # Миниатюра пишется последней: ее время изменения — время обращения для LRU
+        for suffix, data in ((KEYFRAME_SUFFIX, keyframe_data), (THUMBNAIL_SUFFIX, thumbnail_data)):
+            with open(self._path(key, suffix), 'wb') as f:
+                f.write(data)
+        evicted = []
+        with self._lock:
+            self._disk_bytes += len(keyframe_data) + len(thumbnail_data) - self._disk.pop(key, 0)
+            self._disk[key] = len(keyframe_data) + len(thumbnail_data)
+            self._remember(key, thumbnail_data)
+            while self._disk_bytes > self.disk_limit and len(self._disk) > 1:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                self._memory.pop(old_key, None)
+                evicted.append(old_key)
+        for old_key in evicted:
+            for suffix in (KEYFRAME_SUFFIX, THUMBNAIL_SUFFIX):
+                try:
+                    os.remove(self._path(old_key, suffix))
+                except OSError:
+                    pass
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._store(*item)
+            except OSError as e:
+                logger.warning("Не удалось сохранить миниатюру события %s: %s", item[0], e)
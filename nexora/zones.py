@@ -0,0 +1,67 @@
+"""Компиляция зон детекции и игнорирования в битовую маску кадра анализа."""
+import cv2
+import numpy as np
+
+# Ключи профиля с зонами: прямоугольники (x1, y1, x2, y2) и многоугольники [(x, y), ...]
+ZONE_KEYS = ('detection_mask', 'ignore_mask', 'detection_polygons', 'ignore_polygons')
+
+
+def has_zones(settings):
+    """True, если в профиле задана хотя бы одна зона."""
+    return any(settings.get(key) for key in ZONE_KEYS)
+
+
+def _fill_zones(mask, rects, polygons, scale, value):
+    scale_x, scale_y = scale
+    for (x1, y1, x2, y2) in rects:
+        cv2.rectangle(
+            mask,
+            (int(x1 * scale_x), int(y1 * scale_y)),
+            (int(round(x2 * scale_x)), int(round(y2 * scale_y))),
+            value, thickness=-1,
+        )
+    if polygons:
+        factors = np.array([scale_x, scale_y], dtype=np.float32)
+        points = [np.round(np.asarray(polygon, dtype=np.float32) * factors).astype(np.int32)
+                  for polygon in polygons if len(polygon) >= 3]
+        if points:
+            cv2.fillPoly(mask, points, value)
+
+
+def zone_bounds(mask, margin=0):
+    """Рамка (x1, y1, x2, y2) анализируемых пикселей маски, расширенная на margin.
+
+    Возвращает None, если рамка занимает весь кадр или маска пуста, — тогда
+    обрезать нечего.
+    """
+    x, y, w, h = cv2.boundingRect(mask)
+    if not w or not h:
+        return None
+    height, width = mask.shape[:2]
+    bounds = (max(0, x - margin), max(0, y - margin), min(width, x + w + margin), min(height, y + h + margin))
+    return None if bounds == (0, 0, width, height) else bounds
+
+
+def compile_zone_mask(size, scale, settings):
+    """Собирает маску uint8 размера size=(ширина, высота) в разрешении анализа.
+
+    255 — пиксель анализируется, 0 — отброшен. Если заданы зоны детекции,
+    анализируются только они; зоны игнорирования вырезаются поверх.
+    Координаты зон в профиле заданы в исходном кадре и умножаются на scale —
+    число или пару (по x, по y), если пропорции кадров различаются.
+    Возвращает None, если зон нет и маска не нужна.
+    """
+    if not has_zones(settings):
+        return None
+    if not isinstance(scale, tuple):
+        scale = (scale, scale)
+    width, height = size
+    detection_rects = settings.get('detection_mask') or []
+    detection_polygons = settings.get('detection_polygons') or []
+    if detection_rects or detection_polygons:
+        mask = np.zeros((height, width), dtype=np.uint8)
+        _fill_zones(mask, detection_rects, detection_polygons, scale, 255)
+    else:
+        mask = np.full((height, width), 255, dtype=np.uint8)
+    _fill_zones(mask, settings.get('ignore_mask') or [], settings.get('ignore_polygons') or [], scale, 0)
+    return mask
@@ -0,0 +1,42 @@
+"""Ограничение частоты приемников оповещений: пауза по камере действует только на начало события."""
+from nexora.alerts import AlertSink, motion_event
+
+
+class ListSink(AlertSink):
+    name = "список"
+    event_types = None
+
+    def __init__(self, **kwargs):
+        self.events = []
+        super().__init__(**kwargs)
+
+    def handle(self, event):
+        self.events.append(event['type'])
+
+
+def deliver(sink, *events):
+    for event in events:
+        sink.offer(event)
+    sink.close(timeout=5.0)
+    return sink.events
+
+
+def test_short_event_end_is_not_suppressed_by_cooldown():
+    sink = ListSink(cooldown=5.0)
+    events = deliver(sink, motion_event('cam'), motion_event('cam', type='motion_end'))
+    assert events == ['motion', 'motion_end']
+    assert sink.counters['suppressed'] == 0
+
+
+def test_end_of_suppressed_start_is_suppressed():
+    sink = ListSink(cooldown=5.0)
+    events = deliver(sink, motion_event('cam'), motion_event('cam', type='motion_end'),
+                     motion_event('cam'), motion_event('cam', type='motion_end'))
+    assert events == ['motion', 'motion_end']
+    assert sink.counters['suppressed'] == 2
+
+
+def test_cooldown_is_per_camera():
+    sink = ListSink(cooldown=5.0)
+    events = deliver(sink, motion_event('a'), motion_event('b'), motion_event('b', type='motion_end'))
+    assert events == ['motion', 'motion', 'motion_end']
@@ -0,0 +1,65 @@
+"""Модели фона на синтетических кадрах: движущийся блок на неподвижной сцене."""
+import numpy as np
+import pytest
+
+from nexora.background import BACKGROUND_MODEL_NAMES, BACKGROUND_STATIC, create_background_model
+
+WARMUP_FRAMES = 20  # KNN набирает выборку несколько кадров; остальным хватает одного
+BLOCK = 10
+
+
+def scene(block_x=None, block_y=20):
+    """Кадр 64x48 с горизонтальным градиентом и, при block_x, светлым блоком BLOCKxBLOCK."""
+    frame = np.tile(np.linspace(40, 160, 64, dtype=np.uint8), (48, 1))
+    if block_x is not None:
+        frame[block_y:block_y + BLOCK, block_x:block_x + BLOCK] = 240
+    return frame
+
+
+def warmed_up(kind):
+    model = create_background_model(kind)
+    assert model.apply(scene()) is None  # Первый кадр только задает фон
+    masks = [model.apply(scene()) for _ in range(WARMUP_FRAMES)]
+    return model, masks[-1]
+
+
+@pytest.mark.parametrize('kind', BACKGROUND_MODEL_NAMES)
+def test_static_scene_settles(kind):
+    _, mask = warmed_up(kind)
+    assert mask.shape == (48, 64)
+    assert not mask.any()
+
+
+@pytest.mark.parametrize('kind', BACKGROUND_MODEL_NAMES)
+def test_moving_block_is_flagged(kind):
+    model, _ = warmed_up(kind)
+    for x in range(5, 45, 8):
+        mask = model.apply(scene(x))
+        # Блок на новом месте найден почти целиком, края кадра вдали от блока чистые
+        assert np.count_nonzero(mask[20:20 + BLOCK, x:x + BLOCK]) >= 0.8 * BLOCK * BLOCK
+        assert not mask[:15].any() and not mask[35:].any()
+
+
+@pytest.mark.parametrize('kind', sorted(set(BACKGROUND_MODEL_NAMES) - {BACKGROUND_STATIC}))
+def test_stopped_object_becomes_background(kind):
+    model, _ = warmed_up(kind)
+    masks = [model.apply(scene(40)) for _ in range(150)]
+    assert masks[0].any()
+    assert not masks[-1].any()
+
+
+def test_static_model_keeps_first_frame():
+    model, _ = warmed_up(BACKGROUND_STATIC)
+    masks = [model.apply(scene(40)) for _ in range(150)]
+    assert np.count_nonzero(masks[-1]) == BLOCK * BLOCK
+
+
+@pytest.mark.parametrize('kind', BACKGROUND_MODEL_NAMES)
+def test_resolution_change_restarts_model(kind):
+    model, _ = warmed_up(kind)
+    assert model.apply(np.zeros((24, 32), np.uint8)) is None
+
+
+def test_unknown_model_is_rejected():
+    with pytest.raises(ValueError):
+        create_background_model('median')
@@ -0,0 +1,49 @@
+"""Пакетный анализ файла: конец события при анализе каждого step-го кадра."""
+import cv2
+import numpy as np
+import pytest
+
+from nexora.background import BACKGROUND_STATIC
+from nexora.batch import analyze_file
+from nexora.profiles import default_profile
+
+FPS = 25.0
+FRAMES = 100
+
+
+def write_video(path, motion):
+    """Видео FRAMES кадров, в кадрах motion (range) по сцене едет светлый блок."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), FPS, (160, 120))
+    for index in range(FRAMES):
+        frame = np.full((120, 160, 3), 60, np.uint8)
+        if index in motion:
+            x = 10 + (index - motion.start) * 4 % 120
+            frame[40:80, x:x + 30] = 230
+        writer.write(frame)
+    writer.release()
+    return str(path)
+
+
+def analyze(path, step):
+    settings = dict(default_profile(), motion_sensitivity=100, background_model=BACKGROUND_STATIC)
+    result = analyze_file(path, settings, step)
+    assert result['error'] is None and result['frames'] == FRAMES
+    return result['events']
+
+
+@pytest.mark.parametrize('step', [1, 2, 5, 7])
+def test_event_end_covers_skipped_frames(tmp_path, step):
+    path = write_video(tmp_path / 'clip.avi', range(20, 50))
+    [event] = analyze(path, step)
+    # Последний проанализированный кадр движения стоит за step кадров: конец не раньше настоящего
+    assert 49 <= event['end_frame'] < 49 + step
+    assert event['end'] == round((event['end_frame'] + 1) / FPS, 3)
+    if step == 1:
+        assert (event['start_frame'], event['end_frame']) == (20, 49)
+
+
+def test_event_end_stops_at_last_frame(tmp_path):
+    path = write_video(tmp_path / 'clip.avi', range(80, FRAMES))
+    [event] = analyze(path, 7)
+    assert event['end_frame'] == FRAMES - 1
+    assert event['end'] == FRAMES / FPS
@@ -0,0 +1,127 @@
+"""Геометрия детекции: маска зон, обрезка до рамки зон и сетка предпроверки."""
+import numpy as np
+import pytest
+
+from nexora.background import BACKGROUND_STATIC
+from nexora.engine import PRECHECK_CELL, DetectionGeometry, MotionDetector, reduce_cells
+from nexora.profiles import default_profile
+from nexora.zones import compile_zone_mask, zone_bounds
+
+FRAME_SHAPE = (480, 640, 3)
+ZONE = (200, 120, 520, 400)  # Зона детекции в координатах исходного кадра
+
+
+def frame(*blocks):
+    """Серый кадр с горизонтальным градиентом и светлыми блоками (x, y, ширина, высота)."""
+    image = np.tile(np.linspace(30, 150, FRAME_SHAPE[1], dtype=np.uint8), (FRAME_SHAPE[0], 1))
+    for x, y, w, h in blocks:
+        image[y:y + h, x:x + w] = 250
+    return np.dstack([image] * 3)
+
+
+def detector(analysis_width=320, precheck_threshold=0.0, zones=True):
+    settings = dict(default_profile(), motion_sensitivity=100, analysis_width=analysis_width,
+                    background_model=BACKGROUND_STATIC, precheck_threshold=precheck_threshold,
+                    detection_mask=[ZONE] if zones else [])
+    result = MotionDetector(settings)
+    assert result.measure(frame()) == (0.0, None)  # Первый кадр становится опорным
+    return result
+
+
+def test_reduce_cells_matches_direct_computation():
+    rng = np.random.default_rng(1)
+    image = rng.integers(0, 2, (37, 50), dtype=np.uint8) * 255
+    rows = list(range(0, 37, PRECHECK_CELL)) + [37]
+    cols = list(range(0, 50, PRECHECK_CELL)) + [50]
+    expected_sum = [[int(image[r1:r2, c1:c2].sum()) for c1, c2 in zip(cols, cols[1:])]
+                    for r1, r2 in zip(rows, rows[1:])]
+    expected_max = [[int(image[r1:r2, c1:c2].max()) for c1, c2 in zip(cols, cols[1:])]
+                    for r1, r2 in zip(rows, rows[1:])]
+    assert reduce_cells(image, np.add, np.uint16).tolist() == expected_sum
+    assert reduce_cells(image, np.maximum).tolist() == expected_max
+
+
+def test_zone_mask_and_bounds():
+    settings = {'detection_mask': [(10, 20, 50, 60)], 'ignore_mask': [(30, 30, 40, 40)]}
+    mask = compile_zone_mask((100, 80), 0.5, settings)
+    assert mask.shape == (80, 100)
+    assert mask[15, 10] == 255 and mask[17, 17] == 0 and mask[5, 5] == 0  # Зона, вырезанная зона, вне зон
+    assert zone_bounds(mask) == (5, 10, 26, 31)
+    assert zone_bounds(mask, margin=8) == (0, 2, 34, 39)  # Запас не выходит за кадр
+    assert zone_bounds(np.full((80, 100), 255, np.uint8)) is None  # Рамка во весь кадр — обрезать нечего
+    assert compile_zone_mask((100, 80), 0.5, {}) is None
+
+
+def test_geometry_maps_roi_back_to_source_frame():
+    geometry = detector().geometry
+    x1, y1, x2, y2 = geometry.roi
+    # Рамка зон в кадре анализа (масштаб 0,5) с запасом на размытие и расширение, срез исходного кадра — вдвое больше
+    margin = geometry.blur_size[0] // 2 + 2
+    assert geometry.roi == (100 - margin, 60 - margin, 261 + margin, 201 + margin)
+    assert geometry.source_roi == (2 * x1, 2 * y1, 2 * x2, 2 * y2)
+    assert geometry.crop_size == (x2 - x1, y2 - y1)
+    assert geometry.zone_mask.shape == (y2 - y1, x2 - x1)
+
+
+def full_frame_regions(analysis_width, block):
+    """Площадь и рамка движения при анализе всего кадра с той же маской зон, но без обрезки."""
+    full = detector(analysis_width, zones=False)
+    thresh = full.background.apply(full.prepare(frame(block)))
+    mask = full.motion_mask(thresh)
+    geometry = full.geometry
+    mask &= compile_zone_mask(geometry.full_size, geometry.zone_scale, {'detection_mask': [ZONE]})
+    return full.motion_regions(mask)
+
+
+@pytest.mark.parametrize('analysis_width', [0, 320])
+@pytest.mark.parametrize('block', [(300, 200, 60, 40), (190, 110, 40, 40), (500, 380, 40, 40)])
+def test_crop_gives_same_regions_as_full_frame(analysis_width, block):
+    """Движение в зоне, в том числе на ее границе, дает те же площадь и рамку, что и анализ всего кадра."""
+    cropped = detector(analysis_width)
+    assert cropped.geometry.roi is not None
+    area, bbox = cropped.measure(frame(block))
+    assert bbox is not None
+    assert (area, bbox) == full_frame_regions(analysis_width, block)
+
+
+@pytest.mark.parametrize('precheck_threshold', [0.0, 5.0])
+def test_precheck_skips_quiet_frame(monkeypatch, precheck_threshold):
+    motion = detector(precheck_threshold=precheck_threshold)
+
+    def fail(*args):
+        raise AssertionError("Тихий кадр дошел до расширения маски")
+
+    monkeypatch.setattr(motion, 'motion_mask', fail)
+    assert motion.measure(frame()) == (0.0, None)
+    # Движение вдали от зоны не попадает даже в срез анализа
+    assert motion.measure(frame((20, 20, 60, 60))) == (0.0, None)
+
+
+def test_precheck_skips_motion_that_cannot_reach_zones():
+    settings = dict(default_profile(), motion_sensitivity=100, analysis_width=320, background_model=BACKGROUND_STATIC,
+                    detection_mask=[ZONE], ignore_mask=[(250, 170, 470, 350)])
+    motion = MotionDetector(settings)
+    motion.measure(frame())
+    thresh = motion.background.apply(motion.prepare(frame((330, 230, 40, 40))))
+    assert thresh.any()  # Движение в срезе есть, но только в вырезанной части зоны
+    assert motion.changed_cells(thresh) is None
+
+
+@pytest.mark.parametrize('block', [(300, 200, 60, 40), (205, 125, 30, 30)])
+def test_precheck_still_catches_motion_in_zone(block):
+    reference = detector()
+    expected = reference.measure(frame(block))
+    assert expected[1] is not None
+    assert detector(precheck_threshold=5.0).measure(frame(block)) == expected
+    # Расширение только рамки изменившихся клеток дает ту же рамку, что и расширение всего изображения
+    whole = detector()
+    thresh = whole.background.apply(whole.prepare(frame(block)))
+    assert whole.motion_regions(whole.motion_mask(thresh)) == expected
+
+
+def test_geometry_is_reused_for_same_frame_shape():
+    motion = detector()
+    geometry = motion.geometry
+    motion.measure(frame())
+    assert motion.geometry is geometry
+    assert isinstance(geometry, DetectionGeometry)
@@ -0,0 +1,68 @@
+"""Трекер событий движения на синтетических последовательностях кадров (время, площадь)."""
+from nexora.events import MotionEventTracker
+
+STEP = 0.25  # Шаг между кадрами, секунды (точно представим в float)
+
+
+def frames(start, end, area):
+    """Кадры с шагом STEP на отрезке [start, end); area=0 — кадры без движения."""
+    count = round((end - start) / STEP)
+    return [(start + i * STEP, area) for i in range(count)]
+
+
+def run(settings, *sequences):
+    """Прогоняет кадры через трекер; возвращает начала и концы событий в порядке появления."""
+    tracker = MotionEventTracker(settings)
+    started, finished = [], []
+    for sequence in sequences:
+        for timestamp, area in sequence:
+            for event in tracker.update(timestamp, area, (0, 0, 10, 10) if area else None):
+                (started if event['end'] is None else finished).append(event)
+    finished += tracker.finish()
+    return started, finished
+
+
+def test_event_start_and_end_times():
+    started, finished = run({'event_trigger_frames': 2, 'event_gap': 1.0},
+                            frames(0.0, 1.0, 0), frames(1.0, 3.0, 50.0), frames(3.0, 6.0, 0))
+    assert [event['start'] for event in started] == [1.0]
+    assert len(finished) == 1
+    event = finished[0]
+    assert event['start'] == 1.0
+    assert event['end'] == 3.0 - STEP  # Последний кадр с движением, а не момент истечения паузы
+    assert event['frames'] == 8
+    assert event['peak_area'] == 50.0
+
+
+def test_single_noisy_frame_does_not_start_event():
+    started, finished = run({'event_trigger_frames': 2}, [(0.0, 0), (STEP, 80.0), (2 * STEP, 0)], frames(1.0, 5.0, 0))
+    assert started == [] and finished == []
+
+
+def test_min_duration_filters_short_motion():
+    settings = {'event_trigger_frames': 1, 'event_min_duration': 1.0, 'event_gap': 0.5}
+    started, finished = run(settings, frames(0.0, 0.75, 30.0), frames(0.75, 3.0, 0))
+    assert started == [] and finished == []
+
+    started, finished = run(settings, frames(0.0, 2.0, 30.0), frames(2.0, 4.0, 0))
+    assert len(started) == 1 and len(finished) == 1
+    assert finished[0]['start'] == 0.0  # Начало события — первый кадр серии, а не момент прохождения фильтра
+    assert finished[0]['end'] == 2.0 - STEP
+
+
+def test_pause_shorter_than_gap_merges_motion_into_one_event():
+    started, finished = run({'event_trigger_frames': 1, 'event_gap': 1.0},
+                            frames(0.0, 1.0, 20.0), frames(1.0, 1.5, 0), frames(1.5, 2.5, 70.0),
+                            frames(2.5, 5.0, 0))
+    assert len(started) == 1 and len(finished) == 1
+    event = finished[0]
+    assert (event['start'], event['end']) == (0.0, 2.5 - STEP)
+    assert event['peak_area'] == 70.0 and event['peak_time'] == 1.5
+
+
+def test_pause_longer_than_gap_splits_events():
+    started, finished = run({'event_trigger_frames': 1, 'event_gap': 1.0},
+                            frames(0.0, 1.0, 20.0), frames(1.0, 3.0, 0), frames(3.0, 4.0, 20.0),
+                            frames(4.0, 6.0, 0))
+    assert len(started) == 2
+    assert [(event['start'], event['end']) for event in finished] == [(0.0, 1.0 - STEP), (3.0, 4.0 - STEP)]
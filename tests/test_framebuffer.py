@@ -0,0 +1,116 @@
+"""Кольцевые буферы кадров: смена разрешения, рваное чтение и освобождение общей памяти."""
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from nexora import framebuffer
+from nexora.framebuffer import FrameRing, SharedFrameRing
+
+SHAPES = ((48, 64, 3), (96, 128, 3))
+
+
+def test_resize_publishes_new_frame():
+    ring = FrameRing()
+    ring.publish(np.full(SHAPES[0], 1, np.uint8), timestamp=1.0)
+    ring.publish(np.full(SHAPES[1], 2, np.uint8), timestamp=2.0)
+    seq, frame, timestamp = ring.read_latest()
+    assert (seq, timestamp) == (2, 2.0)
+    assert frame.shape == SHAPES[1] and (frame == 2).all()
+
+
+def test_reader_never_sees_unpublished_slot_during_resize():
+    ring = FrameRing()
+    frames = [np.full(shape, 7, np.uint8) for shape in SHAPES]
+    bad = []
+
+    def read():
+        seq, out = 0, None
+        while not ring.closed:
+            seq, out, timestamp = ring.read_latest(out, seq, timeout=0.1)
+            if timestamp is not None and not (out == 7).all():
+                bad.append(seq)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    for i in range(2000):
+        ring.publish(frames[i % 2])  # Каждый кадр меняет разрешение и пересоздает слоты
+    ring.close()
+    reader.join(timeout=5.0)
+    assert not bad
+
+
+@pytest.fixture
+def shared_rings():
+    """Владелец (читатель, как процесс интерфейса) и подключенный к нему писатель (как процесс камеры)."""
+    owner = SharedFrameRing()
+    writer = SharedFrameRing(owner.name)
+    yield owner, writer
+    if writer._header is not None:
+        writer.release()
+    if owner._header is not None:
+        owner.release()
+
+
+def segment_exists(name):
+    try:
+        shared_memory.SharedMemory(name=name).close()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def test_shared_ring_follows_resolution_change(shared_rings):
+    owner, writer = shared_rings
+    assert writer.next_slot() is None  # Размер кадра еще неизвестен
+    writer.publish(np.full(SHAPES[0], 1, np.uint8), timestamp=1.0)
+    seq, frame, timestamp = owner.read_latest(timeout=1.0)
+    assert (seq, timestamp, frame.shape) == (1, 1.0, SHAPES[0]) and (frame == 1).all()
+
+    writer.publish(np.full(SHAPES[1], 2, np.uint8), timestamp=2.0)
+    assert not segment_exists(f"{owner.name}_1")  # Сегмент прежнего разрешения писатель удалил
+    seq, frame, timestamp = owner.read_latest(frame, seq, timeout=1.0)
+    assert (seq, timestamp, frame.shape) == (2, 2.0, SHAPES[1]) and (frame == 2).all()
+    assert owner.read_latest(frame, seq, timeout=0.05)[2] is None  # Новых кадров нет
+
+
+def test_shared_ring_retries_torn_read(monkeypatch, shared_rings):
+    owner, writer = shared_rings
+    for value in range(1, 4):
+        writer.publish(np.full(SHAPES[0], value, np.uint8))
+    owner.read_latest(timeout=1.0)  # Читатель подключается к сегменту слотов
+
+    copies = []
+
+    class Numpy:
+        """numpy, в котором писатель успевает обойти кольцо, пока читатель копирует слот."""
+
+        def __getattr__(self, name):
+            return getattr(np, name)
+
+        @staticmethod
+        def copyto(dst, src):
+            np.copyto(dst, src)
+            if not copies and np.shares_memory(src, owner._slots):  # Копирование слота читателем
+                copies.append(int(src[0, 0, 0]))
+                for value in range(10, 10 + owner.capacity):
+                    writer.publish(np.full(SHAPES[0], value, np.uint8))
+
+    monkeypatch.setattr(framebuffer, 'np', Numpy())
+    seq, frame, _ = owner.read_latest(timeout=1.0)
+    assert copies == [3]  # Первая копия — кадр, который писатель перезаписывал
+    assert seq == 3 + owner.capacity
+    assert (frame == 9 + owner.capacity).all()
+
+
+def test_shared_ring_release_unlinks_segments(shared_rings):
+    owner, writer = shared_rings
+    writer.publish(np.zeros(SHAPES[0], np.uint8))
+    owner.read_latest(timeout=1.0)
+    names = [owner.name, f"{owner.name}_1"]
+    assert all(segment_exists(name) for name in names)
+    writer.release()
+    assert all(segment_exists(name) for name in names)  # Последний кадр остается владельцу
+    owner.release()
+    assert not any(segment_exists(name) for name in names)
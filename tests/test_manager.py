@@ -0,0 +1,60 @@
+"""CameraManager.apply_profile: камеры профилей, добавленных или включенных во время работы."""
+import time
+from queue import Queue
+
+import cv2
+import numpy as np
+import pytest
+
+from nexora.engine import CameraManager
+from nexora.profiles import default_profile
+
+
+@pytest.fixture
+def video(tmp_path):
+    """Видеофайл на несколько секунд воспроизведения — камера успевает поработать."""
+    path = str(tmp_path / 'clip.avi')
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 25.0, (64, 48))
+    for i in range(200):
+        writer.write(np.full((48, 64, 3), i % 256, np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def manager():
+    manager = CameraManager(Queue())
+    yield manager
+    manager.stop()
+    manager.join(5.0)
+
+
+def wait_alive(worker, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not worker.is_alive() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return worker.is_alive()
+
+
+def test_added_profile_starts_while_running(manager, video):
+    profile = dict(default_profile(), camera_url=video)
+    assert manager.start({'A': profile}) == ['A']
+
+    assert manager.apply_profile('B', profile) == 'started'
+    assert wait_alive(manager.workers['B'])
+    assert manager.workers['A'].is_alive()
+
+
+def test_enabled_profile_starts_while_running(manager, video):
+    profile = dict(default_profile(), camera_url=video)
+    assert manager.start({'A': profile, 'B': dict(profile, enabled=False)}) == ['A']
+
+    assert manager.apply_profile('B', dict(profile, enabled=False)) is None
+    assert 'B' not in manager.workers
+    assert manager.apply_profile('B', profile) == 'started'
+    assert wait_alive(manager.workers['B'])
+
+
+def test_profile_not_started_when_manager_stopped(manager, video):
+    assert manager.apply_profile('B', dict(default_profile(), camera_url=video)) is None
+    assert not manager.workers
@@ -0,0 +1,23 @@
+"""Метрики Prometheus снимаются, даже если камеры добавляются и удаляются во время отрисовки."""
+from queue import Queue
+
+from nexora.engine import CameraWorker, DetectionScheduler
+from nexora.metrics import render_prometheus
+from nexora.profiles import default_profile
+
+
+def test_render_survives_cameras_changed_during_scrape():
+    scheduler = DetectionScheduler()
+    workers = {name: CameraWorker(name, default_profile(), scheduler, Queue()) for name in ('a', 'b', 'c')}
+    outage_stats = workers['a'].outage_stats
+
+    def remove_camera():
+        # Как apply_profile из потока интерфейса посреди отрисовки метрик
+        workers.pop('c', None)
+        workers['d'] = workers['b']
+        return outage_stats()
+
+    workers['a'].outage_stats = remove_camera
+    text = render_prometheus(workers)
+    assert 'nexora_up{camera="c"} 0' in text  # Отрисовка целиком по снимку, взятому в начале
+    assert 'camera="d"' not in text
@@ -0,0 +1,39 @@
+"""Запись файла профилей: права прежнего файла и уникальный временный файл."""
+import os
+import stat
+import threading
+
+from nexora.profiles import ProfileStore, default_profile, load_profiles, save_profiles
+
+
+def test_save_keeps_permissions_and_leaves_no_temp_files(tmp_path):
+    path = tmp_path / 'profiles.ini'
+    save_profiles(str(path), {'cam': default_profile()})
+    os.chmod(path, 0o640)
+    save_profiles(str(path), {'cam': dict(default_profile(), motion_sensitivity=123)})
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    assert load_profiles(str(path))['cam']['motion_sensitivity'] == 123
+    assert os.listdir(tmp_path) == ['profiles.ini']
+
+
+def test_concurrent_saves_do_not_share_temp_file(tmp_path):
+    path = str(tmp_path / 'profiles.ini')
+    errors = []
+
+    def save(name):
+        try:
+            for i in range(20):
+                store = ProfileStore(path)
+                store.load()
+                store.update({name: dict(default_profile(), motion_sensitivity=i + 1)})
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(f"cam{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert load_profiles(path)  # Файл цел и читается
+    assert os.listdir(tmp_path) == ['profiles.ini']
@@ -0,0 +1,60 @@
+"""Обрыв подпотока детекции не меняет состояние камеры по основному потоку."""
+import threading
+from queue import Queue
+
+import pytest
+
+from nexora import engine
+from nexora.engine import CameraWorker, DetectionScheduler, ReconnectBackoff
+from nexora.profiles import default_profile
+
+
+class FakeCapture:
+    def __init__(self, opened):
+        self.opened = opened
+
+    def isOpened(self):
+        return self.opened
+
+    def release(self):
+        pass
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    monkeypatch.setattr(engine, 'RECONNECT_INITIAL_DELAY', 0.01)
+    worker = CameraWorker('cam', dict(default_profile(), camera_url='rtsp://camera/main'), DetectionScheduler(),
+                          Queue())
+    worker.is_running = True
+    worker.status = "работает"
+    worker.motion_detected = True
+    worker.fps = 25.0
+    worker.detect_fps = 5.0
+    return worker
+
+
+def reconnect(monkeypatch, worker, primary):
+    """Переподключается со второй попытки; возвращает состояние камеры во время неудачной попытки."""
+    seen = []
+
+    def open_capture(url, settings):
+        seen.append((worker.status, worker.substream_down, worker.motion_detected))
+        return FakeCapture(opened=len(seen) > 1)
+
+    monkeypatch.setattr(engine, 'open_capture', open_capture)
+    cap = worker._reconnect('rtsp://camera/sub', ReconnectBackoff(threading.Event()), primary=primary)
+    assert cap is not None
+    return seen[1]
+
+
+def test_substream_outage_keeps_main_stream_state(monkeypatch, worker):
+    assert reconnect(monkeypatch, worker, primary=False) == ("работает", True, True)
+    assert worker.stats()['substream_down'] is False  # Подпоток вернулся
+    assert (worker.status, worker.motion_detected, worker.fps, worker.detect_fps) == ("работает", True, 25.0, 5.0)
+    assert worker.outage['count'] == 0  # Простоем основного потока обрыв подпотока не считается
+
+
+def test_main_stream_outage_resets_state(monkeypatch, worker):
+    assert reconnect(monkeypatch, worker, primary=True) == ("переподключение", False, False)
+    assert (worker.status, worker.fps, worker.detect_fps) == ("работает", 0.0, 0.0)
+    assert worker.outage['count'] == 1
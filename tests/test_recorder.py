@@ -0,0 +1,31 @@
+"""Имена клипов: клипы одной камеры, начатые в одну и ту же секунду, не перезаписывают друг друга."""
+import os
+
+import numpy as np
+
+from nexora.recorder import ClipWriter, encode_frame
+
+
+def test_clips_started_in_same_second_get_distinct_files(tmp_path):
+    writer = ClipWriter(str(tmp_path))
+    data = encode_frame(np.full((48, 64, 3), 128, np.uint8))
+    started = 1700000000.25
+    clips = [writer.open_clip('cam 1', [(started, data), (started + 0.1, data)]),
+             writer.open_clip('cam 1', [(started, data)]),
+             writer.open_clip('cam 1', [(started + 0.5, data)])]
+    for clip in clips:
+        writer.close_clip(clip)
+    writer.drain(timeout=5.0)
+
+    paths = [clip.path for clip in clips]
+    assert len(set(paths)) == 3
+    assert all(os.path.exists(path) for path in paths)
+    assert writer.clips_written == 3
+
+
+def test_existing_clip_file_is_not_overwritten(tmp_path):
+    writer = ClipWriter(str(tmp_path))
+    first = writer._clip_path('cam', 1700000000.0)
+    os.makedirs(os.path.dirname(first))
+    open(first, 'wb').close()
+    assert ClipWriter(str(tmp_path))._clip_path('cam', 1700000000.0) != first